@@ -0,0 +1,439 @@
+"""
+Offline stand-in for Telegram and MongoDB used by replay benchmark.
+MemoryDatabase implement the motor collection method we use (enough query and
+update operator for our database modules) and count every call, FakeClient
+replace API method of real Client with recorder so handler run without network.
+"""
+import asyncio
+import inspect
+import itertools
+from collections import Counter
+from copy import deepcopy
+from datetime import datetime
+from types import SimpleNamespace
+
+import pyrogram
+from pyrogram import enums
+from pyrogram.types import CallbackQuery, Chat, ChatMember, ChatPrivileges, InlineQuery, Message, MessageEntity, User
+from pyrogram.types.messages_and_media.message import Str
+
+_MISSING = object()
+
+
+def _get(doc, key: str):
+    for part in key.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return _MISSING
+        doc = doc[part]
+    return doc
+
+
+def _compare(func):
+    def op(value, arg):
+        if value is _MISSING:
+            return False
+        try:
+            return func(value, arg)
+        except TypeError:
+            return False
+
+    return op
+
+
+OPERATORS = {
+    "$eq": lambda value, arg: value == arg,
+    "$ne": lambda value, arg: value != arg,
+    "$gt": _compare(lambda value, arg: value > arg),
+    "$gte": _compare(lambda value, arg: value >= arg),
+    "$lt": _compare(lambda value, arg: value < arg),
+    "$lte": _compare(lambda value, arg: value <= arg),
+    "$in": lambda value, arg: value in arg,
+    "$nin": lambda value, arg: value not in arg,
+    "$exists": lambda value, arg: (value is not _MISSING) == bool(arg),
+}
+
+
+def match(doc: dict, query: dict) -> bool:
+    for key, cond in (query or {}).items():
+        if key == "$or":
+            if not any(match(doc, sub) for sub in cond):
+                return False
+            continue
+        if key == "$and":
+            if not all(match(doc, sub) for sub in cond):
+                return False
+            continue
+        value = _get(doc, key)
+        if isinstance(cond, dict) and cond and all(op.startswith("$") for op in cond):
+            if not all(OPERATORS[op](value, arg) for op, arg in cond.items()):
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _parent(doc: dict, key: str):
+    *path, last = key.split(".")
+    for part in path:
+        doc = doc.setdefault(part, {})
+    return doc, last
+
+
+def apply_update(doc: dict, update: dict, insert: bool = False):
+    if not any(key.startswith("$") for key in update):
+        # replacement document
+        _id = doc.get("_id")
+        doc.clear()
+        doc.update(deepcopy(update))
+        doc["_id"] = _id
+        return
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not insert:
+            continue
+        for key, value in fields.items():
+            parent, last = _parent(doc, key)
+            if op in ("$set", "$setOnInsert"):
+                parent[last] = deepcopy(value)
+            elif op == "$unset":
+                parent.pop(last, None)
+            elif op == "$inc":
+                parent[last] = parent.get(last, 0) + value
+            elif op == "$max":
+                parent[last] = value if last not in parent else max(parent[last], value)
+            elif op == "$min":
+                parent[last] = value if last not in parent else min(parent[last], value)
+            elif op == "$push":
+                parent.setdefault(last, []).append(deepcopy(value))
+            elif op == "$addToSet":
+                if value not in parent.setdefault(last, []):
+                    parent[last].append(deepcopy(value))
+            elif op == "$pull":
+                parent[last] = [item for item in parent.get(last, []) if item != value]
+            else:
+                raise NotImplementedError(f"Update operator {op} not supported by MemoryDatabase")
+
+
+class MemoryCursor:
+    def __init__(self, collection, docs: list):
+        self.collection = collection
+        self.docs = docs
+
+    def sort(self, key, direction: int = 1):
+        if isinstance(key, list):
+            for name, way in reversed(key):
+                self.sort(name, way)
+            return self
+        self.docs.sort(key=lambda doc: (_get(doc, key) is _MISSING, str(_get(doc, key))), reverse=direction < 0)
+        return self
+
+    def skip(self, count: int):
+        self.docs = self.docs[count:]
+        return self
+
+    def limit(self, count: int):
+        if count:
+            self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length: int = None):
+        self.collection.count("find")
+        return [deepcopy(doc) for doc in self.docs[:length]]
+
+    async def _iterate(self):
+        self.collection.count("find")
+        for doc in self.docs:
+            yield deepcopy(doc)
+
+    def __aiter__(self):
+        return self._iterate()
+
+
+class MemoryCollection:
+    def __init__(self, database, name: str):
+        self.database = database
+        self.name = name
+        self.docs = []
+        self._ids = itertools.count(1)
+
+    def count(self, op: str):
+        self.database.calls[(self.name, op)] += 1
+
+    def _find(self, query: dict) -> list:
+        return [doc for doc in self.docs if match(doc, query)]
+
+    def _upsert_doc(self, query: dict, update: dict) -> dict:
+        doc = {key: deepcopy(value) for key, value in (query or {}).items() if not key.startswith("$") and not isinstance(value, dict)}
+        doc["_id"] = next(self._ids)
+        apply_update(doc, update, insert=True)
+        self.docs.append(doc)
+        return doc
+
+    async def find_one(self, query: dict = None, *args, **kwargs):
+        self.count("find_one")
+        docs = self._find(query)
+        return deepcopy(docs[0]) if docs else None
+
+    def find(self, query: dict = None, *args, **kwargs) -> MemoryCursor:
+        return MemoryCursor(self, self._find(query))
+
+    async def count_documents(self, query: dict = None, *args, **kwargs) -> int:
+        self.count("count_documents")
+        return len(self._find(query))
+
+    async def insert_one(self, doc: dict, *args, **kwargs):
+        self.count("insert_one")
+        doc.setdefault("_id", next(self._ids))
+        self.docs.append(deepcopy(doc))
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs: list, *args, **kwargs):
+        self.count("insert_many")
+        for doc in docs:
+            doc.setdefault("_id", next(self._ids))
+            self.docs.append(deepcopy(doc))
+        return SimpleNamespace(inserted_ids=[doc["_id"] for doc in docs])
+
+    def _update(self, query: dict, update: dict, upsert: bool, many: bool):
+        docs = self._find(query)
+        if not many:
+            docs = docs[:1]
+        for doc in docs:
+            apply_update(doc, update)
+        upserted = self._upsert_doc(query, update)["_id"] if upsert and not docs else None
+        return SimpleNamespace(matched_count=len(docs), modified_count=len(docs), upserted_id=upserted)
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False, *args, **kwargs):
+        self.count("update_one")
+        return self._update(query, update, upsert, False)
+
+    async def update_many(self, query: dict, update: dict, upsert: bool = False, *args, **kwargs):
+        self.count("update_many")
+        return self._update(query, update, upsert, True)
+
+    async def replace_one(self, query: dict, doc: dict, upsert: bool = False, *args, **kwargs):
+        self.count("replace_one")
+        return self._update(query, doc, upsert, False)
+
+    async def find_one_and_update(self, query: dict, update: dict, upsert: bool = False, *args, **kwargs):
+        self.count("find_one_and_update")
+        docs = self._find(query)
+        before = deepcopy(docs[0]) if docs else None
+        self._update(query, update, upsert, False)
+        return before
+
+    def _delete(self, query: dict, many: bool) -> int:
+        docs = self._find(query)
+        if not many:
+            docs = docs[:1]
+        ids = {id(doc) for doc in docs}
+        self.docs = [doc for doc in self.docs if id(doc) not in ids]
+        return len(docs)
+
+    async def delete_one(self, query: dict, *args, **kwargs):
+        self.count("delete_one")
+        return SimpleNamespace(deleted_count=self._delete(query, False))
+
+    async def delete_many(self, query: dict, *args, **kwargs):
+        self.count("delete_many")
+        return SimpleNamespace(deleted_count=self._delete(query, True))
+
+    async def bulk_write(self, requests: list, *args, **kwargs):
+        self.count("bulk_write")
+        for request in requests:
+            kind = type(request).__name__
+            if kind == "InsertOne":
+                self.docs.append(deepcopy(request._doc))
+            elif kind in ("UpdateOne", "UpdateMany", "ReplaceOne"):
+                self._update(request._filter, request._doc, request._upsert, kind == "UpdateMany")
+            elif kind in ("DeleteOne", "DeleteMany"):
+                self._delete(request._filter, kind == "DeleteMany")
+        return SimpleNamespace(acknowledged=True)
+
+    async def create_index(self, *args, **kwargs):
+        return "index"
+
+
+class MemoryDatabase:
+    def __init__(self, calls: Counter = None):
+        self.collections = {}
+        # share counter when bot use more than one database
+        self.calls = Counter() if calls is None else calls
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self.collections:
+            self.collections[name] = MemoryCollection(self, name)
+        return self.collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, *args, **kwargs):
+        self.calls[("db", "command")] += 1
+        return {"ok": 1, "dataSize": 0}
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+
+class FakeClient:
+    """
+    Record every API call of real client instead of sending it.
+    Ex:
+        fake = FakeClient(app, factory)
+        fake.install()
+    """
+
+    # Client method that don't talk to Telegram or needed by harness
+    KEEP = {"start", "stop", "restart", "initialize", "terminate", "run", "handle_updates"}
+
+    def __init__(self, client, factory: "UpdateFactory" = None):
+        self.client = client
+        self.factory = factory
+        self.calls = Counter()
+        self.admins = set()
+        self.owner = None
+
+    def install(self):
+        for name, attr in inspect.getmembers(pyrogram.Client):
+            if name.startswith("_") or name in self.KEEP:
+                continue
+            if inspect.isasyncgenfunction(attr):
+                setattr(self.client, name, self._generator(name))
+            elif inspect.iscoroutinefunction(attr):
+                setattr(self.client, name, self._recorder(name))
+        return self
+
+    def _recorder(self, name: str):
+        async def record(*args, **kwargs):
+            self.calls[name] += 1
+            return self.result(name, args, kwargs)
+
+        return record
+
+    def _generator(self, name: str):
+        async def record(*args, **kwargs):
+            self.calls[name] += 1
+            if name == "get_chat_members":
+                for user_id in sorted(self.admins):
+                    yield self.member(user_id)
+
+        return record
+
+    def member(self, user_id: int) -> ChatMember:
+        user = self.factory.user(user_id)
+        if user_id == self.owner:
+            return ChatMember(client=self.client, status=enums.ChatMemberStatus.OWNER, user=user)
+        if user_id in self.admins:
+            privileges = ChatPrivileges(
+                can_manage_chat=True,
+                can_delete_messages=True,
+                can_manage_video_chats=True,
+                can_restrict_members=True,
+                can_promote_members=True,
+                can_change_info=True,
+                can_post_messages=True,
+                can_edit_messages=True,
+                can_invite_users=True,
+                can_pin_messages=True,
+            )
+            return ChatMember(client=self.client, status=enums.ChatMemberStatus.ADMINISTRATOR, user=user, privileges=privileges)
+        return ChatMember(client=self.client, status=enums.ChatMemberStatus.MEMBER, user=user)
+
+    def result(self, name: str, args: tuple, kwargs: dict):
+        factory = self.factory
+        if name.startswith(("send_", "edit_message", "copy_message")) or name in ("get_messages", "stop_poll"):
+            chat_id = kwargs.get("chat_id", args[0] if args else factory.chat_id)
+            text = kwargs.get("text", args[1] if len(args) > 1 and isinstance(args[1], str) else "")
+            return factory.message(text or "", user=factory.bot, chat_id=chat_id if isinstance(chat_id, int) else factory.chat_id)
+        if name == "forward_messages":
+            return [factory.message("", user=factory.bot)]
+        if name == "get_users":
+            ids = kwargs.get("user_ids", args[0] if args else 0)
+            if isinstance(ids, (list, tuple)):
+                return [factory.user(i) for i in ids]
+            return factory.user(ids)
+        if name == "get_me":
+            return self.client.me
+        if name == "get_chat_member":
+            user_id = kwargs.get("user_id", args[1] if len(args) > 1 else 0)
+            return self.member(user_id)
+        if name == "get_chat":
+            return factory.chat()
+        if name == "download_media":
+            return "downloads/fake"
+        return True
+
+
+class UpdateFactory:
+    """Build synthetic update bound to client, user id start from 1000."""
+
+    def __init__(self, client, chat_id: int = -1001234567890, bot: User = None):
+        self.client = client
+        self.chat_id = chat_id
+        self.bot = bot or client.me
+        self._ids = itertools.count(1)
+
+    def user(self, user_id: int, **kwargs) -> User:
+        if isinstance(user_id, str):
+            user_id = int(user_id) if user_id.lstrip("-").isdigit() else 1000
+        return User(
+            client=self.client,
+            id=user_id,
+            is_self=False,
+            is_bot=False,
+            first_name=kwargs.get("first_name", f"User {user_id}"),
+            last_name=kwargs.get("last_name"),
+            username=kwargs.get("username", f"user{user_id}"),
+        )
+
+    def chat(self, chat_id: int = None) -> Chat:
+        return Chat(client=self.client, id=chat_id or self.chat_id, type=enums.ChatType.SUPERGROUP, title="Replay Benchmark")
+
+    def message(self, text: str, user: User = None, reply_to: Message = None, chat_id: int = None) -> Message:
+        entities = None
+        if text.startswith("/"):
+            command = text.split(maxsplit=1)[0]
+            entities = [MessageEntity(client=self.client, type=enums.MessageEntityType.BOT_COMMAND, offset=0, length=len(command))]
+        return Message(
+            client=self.client,
+            id=next(self._ids),
+            from_user=user or self.user(1000),
+            chat=self.chat(chat_id),
+            date=datetime.now(),
+            text=Str(text).init(entities) if text else None,
+            entities=entities,
+            reply_to_message=reply_to,
+            outgoing=False,
+        )
+
+    def callback_query(self, data: str, user: User = None, message: Message = None) -> CallbackQuery:
+        return CallbackQuery(
+            client=self.client,
+            id=str(next(self._ids)),
+            from_user=user or self.user(1000),
+            chat_instance="replay",
+            message=message or self.message("callback", user=self.bot),
+            data=data,
+        )
+
+    def inline_query(self, query: str, user: User = None, offset: str = "") -> InlineQuery:
+        return InlineQuery(client=self.client, id=str(next(self._ids)), from_user=user or self.user(1000), query=query, offset=offset)
+
+
+def offline_start(bot_id: int = 42, username: str = "ReplayBot"):
+    """Patch Client.start so importing misskaty doesn't connect to Telegram."""
+
+    async def start(self):
+        self.me = User(client=self, id=bot_id, is_self=True, is_bot=True, first_name=self.name, username=username)
+        return self
+
+    pyrogram.Client.start = start
+
+
+async def settle():
+    # pyrogram add handler in background task
+    for _ in range(3):
+        await asyncio.sleep(0)
@@ -0,0 +1,295 @@
+"""
+Replay benchmark for message handling pipeline.
+Synthetic update dispatched to handler registered by the real plugins the same
+way pyrogram dispatcher does, with Telegram replaced by FakeClient and MongoDB
+by MemoryDatabase. Report updates/sec, p50/p99 latency and DB/API call per
+update, compare with baseline to catch regression in CI. Exit 1 on regression or
+handler error.
+
+Run from repo root:
+    python -m benchmarks.replay --updates 2000
+    python -m benchmarks.replay --json result.json --baseline benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import os
+import random
+import sys
+import time
+import traceback
+from collections import defaultdict
+
+from benchmarks.fakes import FakeClient, MemoryDatabase, UpdateFactory, offline_start, settle
+
+PLUGINS = ["afk", "filters", "karma", "sangmata", "notes", "admin"]
+CHAT_ID = -1001234567890
+# user id range used by scenario
+ADMINS = range(1000, 1100)
+AFK_USERS = range(1100, 1110)
+MEMBERS = range(2000, 3000)
+
+
+def prepare_env():
+    # dummy config, nothing connect anywhere
+    os.environ.setdefault("API_ID", "1")
+    os.environ.setdefault("API_HASH", "0" * 32)
+    os.environ.setdefault("BOT_TOKEN", "1:replay")
+    os.environ.setdefault("DATABASE_URI", "mongodb://127.0.0.1:27017")
+    os.environ.setdefault("DATABASE_NAME", "replay")
+    os.environ["METRICS_PORT"] = "0"
+    os.environ["TRACE_SAMPLE_RATE"] = "0"
+
+
+def load(plugins: list):
+    """Import bot offline with fake database, must run before event loop started."""
+    prepare_env()
+    offline_start()
+    import database
+
+    memory = MemoryDatabase()
+    database.dbname = memory
+    from database import users_chats_db
+
+    users_db = MemoryDatabase(memory.calls)
+    users_chats_db.db.db = users_db
+    users_chats_db.db.col = users_db.users
+    users_chats_db.db.grp = users_db.groups
+
+    from misskaty import app
+
+    factory = UpdateFactory(app, CHAT_ID)
+    fake = FakeClient(app, factory).install()
+    for plugin in plugins:
+        importlib.import_module(f"misskaty.plugins.{plugin}")
+    return app, memory, fake, factory
+
+
+class Replayer:
+    def __init__(self, client):
+        from pyrogram import ContinuePropagation, StopPropagation
+        from pyrogram.handlers import CallbackQueryHandler, InlineQueryHandler, MessageHandler
+        from pyrogram.types import CallbackQuery, InlineQuery, Message
+
+        self.client = client
+        self.handler_types = {Message: MessageHandler, CallbackQuery: CallbackQueryHandler, InlineQuery: InlineQueryHandler}
+        self.stop, self.cont = StopPropagation, ContinuePropagation
+        self.errors = []
+
+    async def dispatch(self, update):
+        """Same flow as pyrogram Dispatcher.handler_worker."""
+        handler_type = self.handler_types[type(update)]
+        loop = asyncio.get_running_loop()
+        try:
+            for group in self.client.dispatcher.groups.values():
+                for handler in group:
+                    if not isinstance(handler, handler_type):
+                        continue
+                    try:
+                        if await handler.check(self.client, update):
+                            if inspect.iscoroutinefunction(handler.callback):
+                                await handler.callback(self.client, update)
+                            else:
+                                await loop.run_in_executor(None, handler.callback, self.client, update)
+                            break
+                    except self.stop:
+                        raise
+                    except self.cont:
+                        continue
+                    except Exception:
+                        self.errors.append(traceback.format_exc())
+                        break
+        except self.stop:
+            pass
+
+
+async def seed(fake: FakeClient):
+    from database.afk_db import add_afk, cleanmode_off
+    from database.filters_db import save_filter
+    from database.karma_db import karma_on
+    from database.notes_db import save_note
+    from database.sangmata_db import sangmata_on
+    from database.warn_db import add_warn
+    from misskaty.helper.functions import int_to_alpha
+
+    fake.admins = set(ADMINS)
+    fake.owner = ADMINS[0]
+    await cleanmode_off(CHAT_ID)
+    await karma_on(CHAT_ID)
+    await sangmata_on(CHAT_ID)
+    for word in ("hello", "rules", "download", "help me"):
+        await save_filter(CHAT_ID, word, {"type": "text", "data": f"Auto reply for {word}"})
+    for name in ("rules", "faq", "links"):
+        await save_note(CHAT_ID, name, {"type": "text", "data": f"Content of note {name}"})
+    for user_id in AFK_USERS:
+        await add_afk(user_id, {"type": "text_reason", "time": time.time(), "data": None, "reason": "sleeping"})
+    for user_id in list(MEMBERS)[:50]:
+        await add_warn(CHAT_ID, await int_to_alpha(user_id), {"warns": 1})
+
+
+def scenarios(factory: UpdateFactory, rnd: random.Random) -> dict:
+    def member():
+        return factory.user(rnd.choice(MEMBERS))
+
+    def admin():
+        return factory.user(rnd.choice(ADMINS))
+
+    def chatter():
+        return factory.message(f"just chatting about movie number {rnd.randint(1, 10000)}", user=member())
+
+    def afk_reply():
+        afk_msg = factory.message("zzz", user=factory.user(rnd.choice(AFK_USERS)))
+        return factory.message("are you there?", user=member(), reply_to=afk_msg)
+
+    def filter_hit():
+        return factory.message("hello everyone, any download link?", user=member())
+
+    def note_get():
+        return factory.message(f"#{rnd.choice(['rules', 'faq', 'links'])}", user=member())
+
+    def karma_up():
+        target = factory.message("here is the link", user=member())
+        return factory.message(rnd.choice(["+1", "thanks", "makasih"]), user=member(), reply_to=target)
+
+    def warns():
+        target = factory.message("spam spam", user=member())
+        return factory.message("/warns", user=admin(), reply_to=target)
+
+    def delete():
+        target = factory.message("spam spam", user=member())
+        return factory.message("/del", user=admin(), reply_to=target)
+
+    def unwarn():
+        user_id = rnd.choice(list(MEMBERS)[:50])
+        target = factory.message("spam", user=factory.user(user_id))
+        warned = factory.message("User has 1/3 warnings.", user=factory.bot, reply_to=target)
+        return factory.callback_query(f"unwarn_{user_id}", user=admin(), message=warned)
+
+    # name: (weight, builder)
+    return {
+        "chatter": (50, chatter),
+        "afk_reply": (8, afk_reply),
+        "filter_hit": (10, filter_hit),
+        "note_get": (8, note_get),
+        "karma_up": (10, karma_up),
+        "warns": (5, warns),
+        "del": (5, delete),
+        "unwarn_cb": (4, unwarn),
+    }
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    latencies = [x[0] for x in samples]
+    count = max(len(samples), 1)
+    return {
+        "updates": len(samples),
+        "updates_per_sec": round(len(samples) / elapsed, 1) if elapsed else 0,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "db_calls_per_update": round(sum(x[1] for x in samples) / count, 3),
+        "api_calls_per_update": round(sum(x[2] for x in samples) / count, 3),
+    }
+
+
+async def run(args) -> dict:
+    app, memory, fake, factory = load(args.plugins)
+    await settle()
+    await seed(fake)
+    rnd = random.Random(args.seed)
+    table = scenarios(factory, rnd)
+    names = [name for name in table if not args.only or name in args.only]
+    weights = [table[name][0] for name in names]
+    plan = rnd.choices(names, weights, k=args.warmup + args.updates)
+    # build all update first so builder cost not measured
+    updates = [(name, table[name][1]()) for name in plan]
+    replayer = Replayer(app)
+    for _, update in updates[: args.warmup]:
+        await replayer.dispatch(update)
+    warmup_errors = len(replayer.errors)
+
+    samples = defaultdict(list)
+    start = time.perf_counter()
+    for name, update in updates[args.warmup :]:
+        db_before, api_before = memory.total_calls, sum(fake.calls.values())
+        began = time.perf_counter()
+        await replayer.dispatch(update)
+        took = time.perf_counter() - began
+        samples[name].append((took, memory.total_calls - db_before, sum(fake.calls.values()) - api_before))
+    elapsed = time.perf_counter() - start
+
+    result = summarize([x for rows in samples.values() for x in rows], elapsed)
+    result["errors"] = len(replayer.errors) - warmup_errors
+    result["scenarios"] = {name: summarize(rows, sum(x[0] for x in rows)) for name, rows in sorted(samples.items())}
+    if args.verbose and replayer.errors:
+        print(replayer.errors[-1], file=sys.stderr)
+    return result
+
+
+def print_report(result: dict):
+    print(f"{'scenario':<12} {'count':>6} {'upd/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'db/upd':>7} {'api/upd':>8}")
+    for name, row in list(result["scenarios"].items()) + [("TOTAL", result)]:
+        print(f"{name:<12} {row['updates']:>6} {row['updates_per_sec']:>9} {row['p50_ms']:>8} {row['p99_ms']:>8} {row['db_calls_per_update']:>7} {row['api_calls_per_update']:>8}")
+    print(f"handler errors: {result['errors']}")
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Return list of regression, DB and API call count is deterministic so any increase count."""
+    problems = []
+    rows = [("TOTAL", result, baseline)] + [(name, row, baseline.get("scenarios", {}).get(name)) for name, row in result["scenarios"].items()]
+    for name, row, base in rows:
+        if not base:
+            continue
+        for key in ("db_calls_per_update", "api_calls_per_update"):
+            if row[key] > base[key] + 0.01:
+                problems.append(f"{name}: {key} {base[key]} -> {row[key]}")
+        if row["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p99 {base['p99_ms']}ms -> {row['p99_ms']}ms")
+    if result["updates_per_sec"] < baseline["updates_per_sec"] * (1 - tolerance):
+        problems.append(f"TOTAL: updates/sec {baseline['updates_per_sec']} -> {result['updates_per_sec']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay synthetic update through registered handler offline.")
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--plugins", nargs="+", default=PLUGINS)
+    parser.add_argument("--only", nargs="+", help="run only these scenario")
+    parser.add_argument("--json", help="write result to this file")
+    parser.add_argument("--baseline", help="fail when result regress from this result file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown for timing, default 25%%")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    # pyrogram schedule handler registration on the loop that exist when Client created
+    loop = asyncio.get_event_loop()
+    result = loop.run_until_complete(run(args))
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    problems = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(result, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+    if result["errors"]:
+        # broken handler must fail the run even without baseline
+        print(f"FAILED {result['errors']} handler errors, rerun with --verbose for the last traceback")
+    if problems or result["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Scraper benchmark on recorded HTTP fixture.
+Every case fetch its page from fixture through the shared httpx client, time
+the page parser alone (median of --repeat run) with peak memory, then run the
+real scraper function end to end (fixture read, parse and result text render).
+
+Record fixture once with network, then run offline:
+    python -m benchmarks.scrapers --record
+    python -m benchmarks.scrapers --repeat 20 --json scrapers.json
+Detail page url taken from first search result, or given with --url name=URL.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+from benchmarks.replay import load
+
+QUERY = "avengers"
+ANIME_QUERY = "naruto"
+IMDB_ID = "0848228"
+PLUGINS = ["web_scraper", "pypi_search", "anime", "imdb_search"]
+
+
+class FakeMsg:
+    """Message that scraper edit when there is no result."""
+
+    ids = itertools.count(1)
+
+    def __init__(self):
+        self.id = next(self.ids)
+        self.text = None
+
+    async def edit(self, text, **kwargs):
+        self.text = text
+
+
+class Case:
+    def __init__(self, name: str, parse, url: str = None, fetch=None, render=None, link_from: str = None):
+        self.name = name
+        self.parse = parse
+        self.url = url
+        self.fetch = fetch
+        self.render = render
+        # take url from first result of other case
+        self.link_from = link_from
+
+
+def build_cases() -> list:
+    from misskaty.helper.http import http
+    from misskaty.helper.imdb_helper import get_imdb_title, imdb_cache, parse_title
+    from misskaty.helper.kuso_utils import kusonimeBypass, parse_kusonime
+    from misskaty.helper.localization import default_language, get_locale_string, langdict
+    from misskaty.helper.subscene_helper import parse_down_page
+    from misskaty.plugins import anime, pypi_search
+    from misskaty.plugins import web_scraper as ws
+
+    strings = partial(get_locale_string, langdict[default_language].get("web_scraper", {}), default_language, "web_scraper")
+
+    def page(func, *args):
+        """Run getData* with fresh message, return rendered text."""
+
+        async def run():
+            msg = FakeMsg()
+            try:
+                result = await func(msg, QUERY, 1, *args, strings)
+            finally:
+                ws.SCRAP_DICT.pop(msg.id, None)
+            return result[0] or msg.text
+
+        return run
+
+    async def pypi_page():
+        msg = FakeMsg()
+        try:
+            return (await pypi_search.getDataPypi(msg, QUERY, 1, 0))[0] or msg.text
+        finally:
+            pypi_search.PYPI_DICT.pop(msg.id, None)
+
+    def detail(parser):
+        async def run(url):
+            return parser((await http.get(url, headers=ws.headers)).text)
+
+        return run
+
+    async def imdb_title():
+        imdb_cache.clear()
+        return await get_imdb_title(IMDB_ID)
+
+    async def anime_fetch():
+        return (await anime.get_anime({"search": ANIME_QUERY})).decode()
+
+    api = "https://yasirapi.eu.org"
+    return [
+        Case("terbit21", json.loads, f"{api}/terbit21?q={QUERY}", render=page(ws.getDataTerbit21)),
+        Case("lk21", json.loads, f"{api}/lk21?q={QUERY}", render=page(ws.getDatalk21)),
+        Case("pahe", json.loads, f"{api}/pahe?q={QUERY}", render=page(ws.getDataPahe)),
+        Case("kusonime", ws.parse_kuso_search, f"https://kusonime.com/?s={QUERY}", render=page(ws.getDataKuso, 0)),
+        Case("movieku", ws.parse_movieku_search, f"https://107.152.37.223/?s={QUERY}", render=page(ws.getDataMovieku)),
+        Case("savefilm21", ws.parse_savefilm21_search, f"https://savefilm21.pro/?s={QUERY}", render=page(ws.getDataSavefilm21, 0)),
+        Case("lendrive", ws.parse_lendrive_search, f"https://lendrive.web.id/?s={QUERY}", render=page(ws.getDataLendrive, 0)),
+        Case("melong", ws.parse_melong_search, f"https://melongmovie.info/?s={QUERY}", render=page(ws.getDataMelong, 0)),
+        Case("gomov", ws.parse_gomov_search, f"https://gomov.cfd/?s={QUERY}", render=page(ws.getDataGomov, 0)),
+        Case("kusonime_dl", parse_kusonime, link_from="kusonime", render=kusonimeBypass),
+        Case("movieku_dl", ws.parse_movieku_links, link_from="movieku", render=detail(ws.parse_movieku_links)),
+        Case("savefilm21_dl", ws.parse_savefilm21_links, link_from="savefilm21", render=detail(ws.parse_savefilm21_links)),
+        Case("lendrive_dl", ws.parse_lendrive_links, link_from="lendrive", render=detail(ws.parse_lendrive_links)),
+        Case("melong_dl", ws.parse_melong_links, link_from="melong", render=detail(ws.parse_melong_links)),
+        Case("gomov_dl", ws.parse_gomov_links, link_from="gomov", render=detail(ws.parse_gomov_links)),
+        Case("pypi", json.loads, f"{api}/pypi?q={QUERY}", render=pypi_page),
+        Case("imdb_title", parse_title, f"https://www.imdb.com/title/tt{IMDB_ID}/", render=imdb_title),
+        Case("anime", json.loads, fetch=anime_fetch, render=anime_fetch),
+        # subscene fetched with cfscrape, give page url with --url subscene=URL
+        Case("subscene", parse_down_page),
+    ]
+
+
+def measure(func, body: str, repeat: int) -> tuple:
+    tracemalloc.start()
+    result = func(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    took = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(body)
+        took.append(time.perf_counter() - start)
+    return result, statistics.median(took), peak
+
+
+async def measure_async(func, repeat: int, *args) -> float:
+    took = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func(*args)
+        took.append(time.perf_counter() - start)
+    return statistics.median(took)
+
+
+def first_link(result) -> str:
+    if isinstance(result, list) and result:
+        return result[0].get("link")
+    return None
+
+
+async def run(args) -> dict:
+    load(PLUGINS)
+    from misskaty.helper.http import http
+    from misskaty.plugins.web_scraper import headers
+
+    urls = dict(item.split("=", 1) for item in args.url)
+    parsed, results = {}, {}
+    for case in build_cases():
+        if args.only and case.name not in args.only:
+            continue
+        url = urls.get(case.name) or case.url or first_link(parsed.get(case.link_from))
+        if not url and not case.fetch:
+            results[case.name] = {"skipped": "no url"}
+            continue
+        try:
+            body = await case.fetch() if case.fetch else (await http.get(url, headers=headers, follow_redirects=True)).text
+            result, parse_time, peak = measure(case.parse, body, args.repeat)
+        except Exception as e:
+            results[case.name] = {"skipped": f"{type(e).__name__}: {e}"}
+            continue
+        parsed[case.name] = result
+        row = {
+            "bytes": len(body.encode()),
+            "items": len(result) if isinstance(result, (list, dict)) else 1,
+            "parse_ms": round(parse_time * 1000, 3),
+            "peak_kb": round(peak / 1024, 1),
+        }
+        if case.render:
+            try:
+                render_args = (url,) if case.link_from else ()
+                row["e2e_ms"] = round(await measure_async(case.render, args.repeat, *render_args) * 1000, 3)
+            except Exception as e:
+                row["e2e_error"] = f"{type(e).__name__}: {e}"
+        results[case.name] = row
+    return {"mode": os.environ["HTTP_FIXTURES"], "repeat": args.repeat, "cases": results}
+
+
+def print_report(result: dict):
+    print(f"{'case':<14} {'KB':>8} {'items':>6} {'parse ms':>9} {'peak KB':>9} {'e2e ms':>9}")
+    for name, row in result["cases"].items():
+        if "skipped" in row:
+            print(f"{name:<14} skipped ({row['skipped']})")
+            continue
+        e2e = row.get("e2e_ms", "error" if "e2e_error" in row else "-")
+        print(f"{name:<14} {row['bytes'] / 1024:>8.1f} {row['items']:>6} {row['parse_ms']:>9} {row['peak_kb']:>9} {e2e:>9}")
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    problems = []
+    for name, row in result["cases"].items():
+        base = baseline.get("cases", {}).get(name, {})
+        for key in ("parse_ms", "e2e_ms", "peak_kb"):
+            if key in row and key in base and row[key] > base[key] * (1 + tolerance):
+                problems.append(f"{name}: {key} {base[key]} -> {row[key]}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper parser on recorded HTTP fixture.")
+    parser.add_argument("--record", action="store_true", help="fetch from network and save fixture")
+    parser.add_argument("--fixtures", default="benchmarks/fixtures/http")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--url", nargs="*", default=[], help="override page url, name=URL")
+    parser.add_argument("--only", nargs="+")
+    parser.add_argument("--json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    # must be set before shared http client created
+    os.environ["HTTP_FIXTURES"] = "record" if args.record else "replay"
+    os.environ["HTTP_FIXTURES_DIR"] = args.fixtures
+    if args.record:
+        # no point timing network, record once
+        args.repeat = 1
+    loop = asyncio.get_event_loop()
+    result = loop.run_until_complete(run(args))
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline and not args.record:
+        with open(args.baseline) as f:
+            problems = compare(result, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
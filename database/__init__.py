@@ -7,7 +7,8 @@
 """
 from motor.motor_asyncio import AsyncIOMotorClient as MongoClient
 
+from misskaty.core.metrics import mongo_listener
 from misskaty.vars import DATABASE_URI
 
-mongo = MongoClient(DATABASE_URI)
+mongo = MongoClient(DATABASE_URI, event_listeners=[mongo_listener])
 dbname = mongo.MissKatyDB
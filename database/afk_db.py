@@ -12,6 +12,8 @@ from database import dbname
 
 usersdb = dbname.users
 cleandb = dbname.cleanmode
+# pending cleanmode deletion when running sharded, drained by leader shard
+cleanqueuedb = dbname.cleanmode_queue
 cleanmode = {}
 
 
@@ -41,6 +43,18 @@ async def cleanmode_off(chat_id: int):
         return await cleandb.insert_one({"chat_id": chat_id})
 
 
+async def queue_cleanmode(chat_id: int, msg_id: int, after):
+    await cleanqueuedb.insert_one({"chat_id": chat_id, "msg_id": msg_id, "after": after})
+
+
+async def get_due_cleanmode(now) -> list:
+    return await cleanqueuedb.find({"after": {"$lte": now}}).to_list(length=1000)
+
+
+async def remove_cleanmode(ids: list):
+    await cleanqueuedb.delete_many({"_id": {"$in": ids}})
+
+
 async def is_afk(user_id: int) -> bool:
     user = await usersdb.find_one({"user_id": user_id})
     return (True, user["reason"]) if user else (False, {})
@@ -0,0 +1,26 @@
+from database import dbname
+
+broadcastdb = dbname.broadcast
+
+
+async def create_broadcast(data: dict):
+    data["status"] = "running"
+    data["last_id"] = None
+    data["stats"] = {"done": 0, "success": 0, "blocked": 0, "deleted": 0, "failed": 0}
+    return (await broadcastdb.insert_one(data)).inserted_id
+
+
+async def get_broadcast(job_id):
+    return await broadcastdb.find_one({"_id": job_id})
+
+
+async def get_running_broadcast():
+    return await broadcastdb.find_one({"status": "running"}, sort=[("_id", -1)])
+
+
+async def save_broadcast_checkpoint(job_id, last_id, stats: dict):
+    await broadcastdb.update_one({"_id": job_id}, {"$set": {"last_id": last_id, "stats": stats}})
+
+
+async def set_broadcast_status(job_id, status: str):
+    await broadcastdb.update_one({"_id": job_id}, {"$set": {"status": status}})
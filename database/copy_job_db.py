@@ -0,0 +1,22 @@
+from database import dbname
+
+copyjobdb = dbname.copy_job
+
+
+async def create_copy_job(data: dict):
+    data["status"] = "running"
+    data["next_id"] = data["start"]
+    data["stats"] = {"done": 0, "sent": 0, "skipped": 0}
+    return (await copyjobdb.insert_one(data)).inserted_id
+
+
+async def get_running_copy_job(user_id: int):
+    return await copyjobdb.find_one({"user_id": user_id, "status": "running"}, sort=[("_id", -1)])
+
+
+async def save_copy_checkpoint(job_id, next_id: int, stats: dict):
+    await copyjobdb.update_one({"_id": job_id}, {"$set": {"next_id": next_id, "stats": stats}})
+
+
+async def set_copy_status(job_id, status: str):
+    await copyjobdb.update_one({"_id": job_id}, {"$set": {"status": status}})
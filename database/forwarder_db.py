@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+from database import dbname
+
+fwdoffsetdb = dbname.forward_offset
+forwardeddb = dbname.forwarded_files
+# Remember forwarded file for 30 days
+FORWARDED_EXPIRE = 30 * 24 * 60 * 60
+_index_created = False
+
+
+async def _ensure_index():
+    global _index_created
+    if not _index_created:
+        await forwardeddb.create_index("date", expireAfterSeconds=FORWARDED_EXPIRE)
+        _index_created = True
+
+
+async def get_forward_offset(chat_id: int) -> int:
+    offset = await fwdoffsetdb.find_one({"chat_id": chat_id})
+    return offset["last_id"] if offset else 0
+
+
+async def save_forward_offset(chat_id: int, last_id: int):
+    # $max so out of order finished message never move offset backward
+    await fwdoffsetdb.update_one({"chat_id": chat_id}, {"$max": {"last_id": last_id}}, upsert=True)
+
+
+async def filter_new_files(file_ids: list) -> list:
+    """Return file_unique_id that never forwarded before."""
+    old = {i["_id"] async for i in forwardeddb.find({"_id": {"$in": file_ids}}, {"_id": 1})}
+    return [i for i in file_ids if i not in old]
+
+
+async def mark_forwarded(file_ids: list):
+    if not file_ids:
+        return
+    await _ensure_index()
+    now = datetime.utcnow()
+    try:
+        await forwardeddb.insert_many([{"_id": i, "date": now} for i in file_ids], ordered=False)
+    except BulkWriteError:
+        # already marked by another run
+        pass
@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+from database import dbname
+
+leaderdb = dbname.leader
+
+
+async def acquire_lease(name: str, owner: str, ttl: int) -> bool:
+    """Take or renew lease, False when other owner still hold it."""
+    now = datetime.now()
+    try:
+        await leaderdb.update_one(
+            {"_id": name, "$or": [{"owner": owner}, {"expires": {"$lt": now}}]},
+            {"$set": {"owner": owner, "expires": now + timedelta(seconds=ttl)}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        # lease exist and held by other, upsert try insert same _id
+        return False
+
+
+async def release_lease(name: str, owner: str):
+    await leaderdb.delete_one({"_id": name, "owner": owner})
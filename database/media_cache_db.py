@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from database import dbname
+
+mediacachedb = dbname.media_cache
+# Unused cached file_id will be removed by mongo after 30 days
+MEDIA_CACHE_EXPIRE = 30 * 24 * 60 * 60
+_index_created = False
+
+
+async def _ensure_index():
+    global _index_created
+    if not _index_created:
+        await mediacachedb.create_index("key", unique=True)
+        await mediacachedb.create_index("last_used", expireAfterSeconds=MEDIA_CACHE_EXPIRE)
+        _index_created = True
+
+
+async def get_cached_media(key: str):
+    await _ensure_index()
+    media = await mediacachedb.find_one({"key": key})
+    return media["file_id"] if media else None
+
+
+async def save_cached_media(key: str, file_id: str):
+    await _ensure_index()
+    await mediacachedb.update_one({"key": key}, {"$set": {"file_id": file_id, "last_used": datetime.utcnow()}}, upsert=True)
+
+
+async def touch_cached_media(key: str):
+    await _ensure_index()
+    await mediacachedb.update_one({"key": key}, {"$set": {"last_used": datetime.utcnow()}})
+
+
+async def delete_cached_media(key: str):
+    await mediacachedb.delete_one({"key": key})
@@ -0,0 +1,15 @@
+from database import dbname
+
+scandb = dbname.member_scan
+
+
+async def get_scan_checkpoint(chat_id: int, action: str):
+    return await scandb.find_one({"chat_id": chat_id, "action": action})
+
+
+async def save_scan_checkpoint(chat_id: int, action: str, offset: int, stats: dict):
+    await scandb.update_one({"chat_id": chat_id, "action": action}, {"$set": {"offset": offset, "stats": stats}}, upsert=True)
+
+
+async def clear_scan_checkpoint(chat_id: int, action: str):
+    await scandb.delete_one({"chat_id": chat_id, "action": action})
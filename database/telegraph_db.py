@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from database import dbname
+
+telegraphdb = dbname.telegraph
+
+
+async def get_telegraph_token():
+    account = await telegraphdb.find_one({"_id": "account"})
+    return account["token"] if account else None
+
+
+async def save_telegraph_token(token: str):
+    await telegraphdb.update_one({"_id": "account"}, {"$set": {"token": token}}, upsert=True)
+
+
+async def get_telegraph_page(key: str):
+    page = await telegraphdb.find_one({"_id": key})
+    return page["url"] if page else None
+
+
+async def save_telegraph_page(key: str, url: str):
+    await telegraphdb.update_one({"_id": key}, {"$set": {"url": url, "date": datetime.utcnow()}}, upsert=True)
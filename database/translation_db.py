@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from database import dbname
+
+translationdb = dbname.translations
+# Unused translation removed by mongo after 30 days
+TRANSLATION_EXPIRE = 30 * 24 * 60 * 60
+_index_created = False
+
+
+async def _ensure_index():
+    global _index_created
+    if not _index_created:
+        await translationdb.create_index("last_used", expireAfterSeconds=TRANSLATION_EXPIRE)
+        _index_created = True
+
+
+async def get_translations(keys: list) -> dict:
+    return {i["_id"]: i["text"] async for i in translationdb.find({"_id": {"$in": keys}})}
+
+
+async def save_translations(items: dict):
+    if not items:
+        return
+    await _ensure_index()
+    now = datetime.utcnow()
+    await translationdb.bulk_write([UpdateOne({"_id": key}, {"$set": {"text": text, "last_used": now}}, upsert=True) for key, text in items.items()], ordered=False)
@@ -1,4 +1,5 @@
 import motor.motor_asyncio
+from pymongo import DeleteMany
 
 from misskaty.vars import DATABASE_NAME, DATABASE_URI
 
@@ -60,6 +61,16 @@ class Database:
     async def delete_user(self, user_id):
         await self.col.delete_many({"id": int(user_id)})
 
+    async def delete_users(self, user_ids):
+        if not user_ids:
+            return 0
+        res = await self.col.bulk_write([DeleteMany({"id": int(user_id)}) for user_id in user_ids], ordered=False)
+        return res.deleted_count
+
+    def get_users_after(self, last_id=None, limit=500):
+        query = {"_id": {"$gt": last_id}} if last_id else {}
+        return self.col.find(query, {"id": 1}).sort("_id", 1).limit(limit)
+
     async def get_banned(self):
         users = self.col.find({"ban_status.is_banned": True})
         chats = self.grp.find({"chat_status.is_disabled": True})
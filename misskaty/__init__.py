@@ -1,6 +1,8 @@
+import asyncio
 import os
 import time
-from logging import ERROR, INFO, FileHandler, StreamHandler, basicConfig, getLogger, handlers
+from contextlib import contextmanager
+from logging import ERROR, getLogger
 
 import pyromod.listen
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -8,15 +10,26 @@ from apscheduler.jobstores.mongodb import MongoDBJobStore
 from pymongo import MongoClient
 from pyrogram import Client
 
-from misskaty.vars import API_HASH, API_ID, BOT_TOKEN, DATABASE_URI, USER_SESSION, TZ
-
-basicConfig(filename="MissKatyLogs.txt", format="%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s", level=INFO)
+from misskaty.core.log import setup_logging
+from misskaty.core.snapshot import register
+from misskaty.core.userbot_ipc import UserbotProxy, serve
+from misskaty.vars import (
+    API_HASH,
+    API_ID,
+    BOT_TOKEN,
+    BOT_WORKERS,
+    CONFIG_LOAD_TIME,
+    DATABASE_URI,
+    PROCESS_ROLE,
+    SHARD_COUNT,
+    SHARD_ID,
+    TZ,
+    USER_SESSION,
+    USERBOT_MODE,
+    USERBOT_WORKERS,
+)
 
-logger = getLogger()
-# handler logging dengan batasan 100 baris
-handler = handlers.RotatingFileHandler("MissKatyLogs.txt", maxBytes=1024 * 1024)
-handler.setLevel(INFO)
-logger.addHandler(handler)
+log_listener = setup_logging()
 getLogger("pyrogram").setLevel(ERROR)
 getLogger("openai").setLevel(ERROR)
 
@@ -24,21 +37,62 @@ MOD_LOAD = []
 MOD_NOLOAD = ["subscene_dl"]
 HELPABLE = {}
 cleanmode = {}
+if SHARD_COUNT <= 1:
+    # sharded cleanmode queue live in MongoDB
+    register("cleanmode", cleanmode)
 botStartTime = time.time()
+# Duration of every startup phase, shown in startup report
+STARTUP_TIMES = {"config": CONFIG_LOAD_TIME}
+
+
+@contextmanager
+def startup_phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMES[name] = time.perf_counter() - start
+
+
+def startup_report() -> str:
+    report = "\n".join(f"{name:<10}: {took:.2f}s" for name, took in STARTUP_TIMES.items())
+    return f"{report}\n{'total':<10}: {time.time() - botStartTime + CONFIG_LOAD_TIME:.2f}s"
+
+
+IS_USERBOT = PROCESS_ROLE == "userbot"
+USERBOT_SPLIT = USERBOT_MODE == "split"
 
-# Pyrogram Bot Client
+if IS_USERBOT:
+    bot_name = "MissKatyBot-userbot"
+elif SHARD_ID is not None:
+    bot_name = f"MissKatyBot-shard{SHARD_ID}"
+else:
+    bot_name = "MissKatyBot"
+
+# Pyrogram Bot Client, shard worker get update from front process instead of Telegram
+# and userbot process only use it to send message
 app = Client(
-    "MissKatyBot",
+    bot_name,
     api_id=API_ID,
     api_hash=API_HASH,
     bot_token=BOT_TOKEN,
+    workers=BOT_WORKERS,
+    no_updates=SHARD_ID is not None or IS_USERBOT,
 )
 
-# Pyrogram UserBot Client
-user = Client(
-    "YasirUBot",
-    session_string=USER_SESSION,
-)
+IS_FRONT = SHARD_COUNT > 1 and SHARD_ID is None
+
+if IS_USERBOT or not USERBOT_SPLIT and SHARD_ID in (None, 0) and not IS_FRONT:
+    # Pyrogram UserBot Client, only one process log in with USER_SESSION
+    user = Client(
+        "YasirUBot",
+        session_string=USER_SESSION,
+        # USERBOT_WORKERS only for split userbot process, pyrogram default otherwise
+        workers=USERBOT_WORKERS if IS_USERBOT else Client.WORKERS,
+    )
+else:
+    # userbot run in userbot process (split) or shard 0, spawned by front or single bot process
+    user = UserbotProxy(spawn=USERBOT_SPLIT and SHARD_ID is None)
 
 pymonclient = MongoClient(DATABASE_URI)
 
@@ -46,11 +100,24 @@ jobstores = {"default": MongoDBJobStore(client=pymonclient, database="MissKatyDB
 
 scheduler = AsyncIOScheduler(jobstores=jobstores, timezone=TZ)
 
-app.start()
-user.start()
+
+async def start_clients():
+    if IS_FRONT and not USERBOT_SPLIT:
+        # userbot belong to shard 0 which front spawn later
+        return await app.start()
+    # Bot and userbot login is independent, start both at once
+    await asyncio.gather(app.start(), user.start())
+    if SHARD_ID == 0 and not USERBOT_SPLIT:
+        # other shard reach userbot through shard 0
+        await serve(user)
+
+
+with startup_phase("clients"):
+    asyncio.get_event_loop().run_until_complete(start_clients())
+
 BOT_ID = app.me.id
 BOT_NAME = app.me.first_name
 BOT_USERNAME = app.me.username
-UBOT_ID = user.me.id
-UBOT_NAME = user.me.first_name
-UBOT_USERNAME = user.me.username
+UBOT_ID = user.me.id if user.me else None
+UBOT_NAME = user.me.first_name if user.me else None
+UBOT_USERNAME = user.me.username if user.me else None
@@ -9,37 +9,123 @@ import asyncio
 import importlib
 import os
 import pickle
+import time
 import traceback
 from logging import getLogger
 
-from pyrogram import __version__, idle
+from pyrogram import Client, __version__, idle
 from pyrogram.raw.all import layer
 
 from misskaty import (
     BOT_NAME,
     BOT_USERNAME,
     HELPABLE,
+    IS_USERBOT,
     UBOT_NAME,
     app,
-    scheduler
+    scheduler,
+    startup_phase,
+    startup_report,
+    user,
 )
-from misskaty.plugins import ALL_MODULES
-from misskaty.vars import SUDO
+from misskaty.core.metrics import instrument, start_metrics_server
+from misskaty.core.snapshot import load_snapshot, save_snapshot, snapshot_loop
+from misskaty.core.sharding import IS_FRONT, SHARDED, Front, Leader, Worker
+from misskaty.core.userbot_ipc import serve
+from misskaty.helper.forward_helper import ForwardPipeline
+from misskaty.helper.scratch import scratch, scratch_janitor
+from misskaty.helper.telegraph_helper import telegraph
+from misskaty.plugins import ALL_MODULES, USERBOT_MODULES
+from misskaty.vars import METRICS_HOST, METRICS_PORT, SUDO
 from utils import auto_clean
 
 LOGGER = getLogger(__name__)
 loop = asyncio.get_event_loop()
 
+
+async def send_online_status(bot_modules: str, report: str):
+    LOGGER.info("[INFO]: SENDING ONLINE STATUS")
+    results = await asyncio.gather(
+        *[
+            app.send_message(
+                i,
+                f"USERBOT AND BOT STARTED with Pyrogram v{__version__}..\nUserBot: {UBOT_NAME}\nBot: {BOT_NAME}\n\nwith Pyrogram v{__version__} (Layer {layer}) started on @{BOT_USERNAME}.\n\n<code>{bot_modules}</code>\n\n<b>Startup time:</b>\n<code>{report}</code>",
+            )
+            for i in SUDO
+        ],
+        return_exceptions=True,
+    )
+    for err in results:
+        if isinstance(err, Exception):
+            LOGGER.error(str(err))
+
+
+def start_leader_jobs():
+    """Scheduler and cleanmode only run on leader shard."""
+    scheduler.start(paused=True)
+    clean_task = None
+
+    def elected():
+        nonlocal clean_task
+        scheduler.resume()
+        clean_task = asyncio.create_task(auto_clean())
+
+    def lost():
+        scheduler.pause()
+        clean_task.cancel()
+
+    # job added by other shard only seen when scheduler wake up
+    asyncio.create_task(Leader("scheduler").run(elected, lost, on_renew=scheduler.wakeup))
+
+
+async def start_front():
+    front = Front(app)
+    await front.start()
+    asyncio.create_task(send_online_status(f"Front process with {front.count} shards", startup_report()))
+    asyncio.create_task(start_metrics_server(METRICS_HOST, METRICS_PORT))
+    await idle()
+    await front.stop()
+
+
+async def start_userbot():
+    instrument(user)
+    for module in USERBOT_MODULES:
+        importlib.import_module(f"misskaty.plugins.{module}")
+    server = await serve(user)
+    LOGGER.info(f"[INFO]: USERBOT PROCESS STARTED AS {UBOT_NAME} with {', '.join(USERBOT_MODULES)}")
+    asyncio.create_task(ForwardPipeline.backfill_all())
+    asyncio.create_task(start_metrics_server(METRICS_HOST, METRICS_PORT))
+    await idle()
+    server.close()
+
+
 # Run Bot
 async def start_bot():
     global HELPABLE
 
-    for module in ALL_MODULES:
-        imported_module = importlib.import_module(f"misskaty.plugins.{module}")
-        if hasattr(imported_module, "__MODULE__") and imported_module.__MODULE__:
-            imported_module.__MODULE__ = imported_module.__MODULE__
-            if hasattr(imported_module, "__HELP__") and imported_module.__HELP__:
-                HELPABLE[imported_module.__MODULE__.lower()] = imported_module
+    # temp cleanup only touch disk, run it while importing plugin
+    cleanup = loop.run_in_executor(None, scratch.cleanup_startup)
+    # wrap handler for metrics when plugin register it
+    # state restored before plugin handler registered, store registered later get it on register
+    with startup_phase("snapshot"):
+        load_snapshot()
+    instrument(app)
+    if isinstance(user, Client):
+        # proxy when userbot live in other process
+        instrument(user)
+    import_times = {}
+    with startup_phase("plugins"):
+        # Imported one by one, handler registration is not thread safe
+        for module in ALL_MODULES:
+            start = time.perf_counter()
+            imported_module = importlib.import_module(f"misskaty.plugins.{module}")
+            import_times[module] = time.perf_counter() - start
+            if hasattr(imported_module, "__MODULE__") and imported_module.__MODULE__:
+                imported_module.__MODULE__ = imported_module.__MODULE__
+                if hasattr(imported_module, "__HELP__") and imported_module.__HELP__:
+                    HELPABLE[imported_module.__MODULE__.lower()] = imported_module
+    with startup_phase("cleanup"):
+        await cleanup
     bot_modules = ""
     j = 1
     for i in ALL_MODULES:
@@ -55,28 +141,41 @@ async def start_bot():
     LOGGER.info(bot_modules)
     LOGGER.info("+===============+===============+===============+===============+")
     LOGGER.info(f"[INFO]: BOT STARTED AS @{BOT_USERNAME}!")
+    slowest = sorted(import_times.items(), key=lambda x: x[1], reverse=True)[:5]
+    LOGGER.info(f"[INFO]: Slowest plugins: {', '.join(f'{name} {took:.2f}s' for name, took in slowest)}")
+    report = startup_report()
+    for line in report.splitlines():
+        LOGGER.info(f"[STARTUP] {line}")
 
-    try:
-        LOGGER.info("[INFO]: SENDING ONLINE STATUS")
-        for i in SUDO:
-            await app.send_message(
-                i,
-                f"USERBOT AND BOT STARTED with Pyrogram v{__version__}..\nUserBot: {UBOT_NAME}\nBot: {BOT_NAME}\n\nwith Pyrogram v{__version__} (Layer {layer}) started on @{BOT_USERNAME}.\n\n<code>{bot_modules}</code>",
-            )
-    except Exception as e:
-        LOGGER.error(str(e))
-    scheduler.start()
+    if SHARDED:
+        await Worker(app).start()
+        start_leader_jobs()
+    else:
+        # don't hold startup while sending online status
+        asyncio.create_task(send_online_status(bot_modules, report))
+        scheduler.start()
+        asyncio.create_task(auto_clean())
     if os.path.exists("restart.pickle"):
         with open('restart.pickle', 'rb') as status:
             chat_id, message_id = pickle.load(status)
         os.remove("restart.pickle")
         await app.edit_message_text(chat_id=chat_id, message_id=message_id, text="<b>Bot restarted successfully!</b>")
-    asyncio.create_task(auto_clean())
+    asyncio.create_task(scratch_janitor())
+    if isinstance(user, Client):
+        # userbot update only handled by shard 0 or userbot process
+        asyncio.create_task(ForwardPipeline.backfill_all())
+    asyncio.create_task(telegraph.warmup())
+    asyncio.create_task(start_metrics_server(METRICS_HOST, METRICS_PORT))
+    asyncio.create_task(snapshot_loop())
     await idle()
+    LOGGER.info(f"[SNAPSHOT] Saved {save_snapshot()} bytes")
 
 if __name__ == "__main__":
     try:
-        loop.run_until_complete(start_bot())
+        if IS_USERBOT:
+            loop.run_until_complete(start_userbot())
+        else:
+            loop.run_until_complete(start_front() if IS_FRONT else start_bot())
     except KeyboardInterrupt:
         pass
     except Exception:
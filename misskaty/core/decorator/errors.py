@@ -1,12 +1,12 @@
 import asyncio
-import traceback
 from functools import wraps
 
-from pyrogram.errors.exceptions.flood_420 import FloodWait
+from pyrogram import enums
 from pyrogram.errors.exceptions.forbidden_403 import ChatWriteForbidden
+from pyrogram.types import Message
 
 from misskaty import app
-from misskaty.vars import LOG_CHANNEL
+from misskaty.core.error_digest import errors
 
 
 def asyncify(func):
@@ -44,22 +44,23 @@ def capture_err(func):
         except ChatWriteForbidden:
             return await app.leave_chat(message.chat.id)
         except Exception as err:
-            exc = traceback.format_exc()
-            error_feedback = split_limits(
-                "**ERROR** | `{}` | `{}`\n\n```{}```\n\n```{}```\n".format(
-                    message.from_user.id if message.from_user else 0,
-                    message.chat.id if message.chat else 0,
-                    message.text or message.caption,
-                    exc,
-                )
+            text = getattr(message, "text", None) or getattr(message, "caption", None) or getattr(message, "data", None)
+            chat = getattr(message, "chat", None) or getattr(getattr(message, "message", None), "chat", None)
+            context = "user {} | chat {} | {}".format(
+                message.from_user.id if message.from_user else 0,
+                chat.id if chat else 0,
+                str(text)[:200],
             )
-
-            for x in error_feedback:
+            # traceback go to digest, user only get short notice
+            entry = errors.add(f"{func.__module__}.{func.__qualname__}", err, context)
+            if isinstance(message, Message):
                 try:
-                    await app.send_message(LOG_CHANNEL, x)
-                    await message.reply(x)
-                except FloodWait as e:
-                    await asyncio.sleep(e.value)
+                    await message.reply(
+                        f"ERROR {type(err).__name__}: {str(err)[:500]}\n\nReported to bot owner, error id {entry.fid}.",
+                        parse_mode=enums.ParseMode.DISABLED,
+                    )
+                except Exception:
+                    pass
             raise err
 
     return capture
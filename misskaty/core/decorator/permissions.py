@@ -10,6 +10,7 @@ from ...helper.localization import default_language, get_lang, get_locale_string
 from pyrogram.types import Message, CallbackQuery
 
 from misskaty import app
+from misskaty.core.snapshot import register
 from misskaty.vars import SUDO
 
 
@@ -152,6 +153,7 @@ async def check_perms(
 
 
 admins_in_chat = {}
+register("admins_in_chat", admins_in_chat)
 
 
 async def list_admins(chat_id: int):
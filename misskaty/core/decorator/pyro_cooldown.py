@@ -2,7 +2,10 @@ from pyrogram import filters
 from misskaty.core.message_utils import *
 import asyncio
 
+from misskaty.core.snapshot import register
+
 data = {}
+register("cooldown", data)
 
 
 async def task(msg, warn=False, sec=None):
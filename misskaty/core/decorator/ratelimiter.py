@@ -1,11 +1,13 @@
 from cachetools import TTLCache
 from functools import wraps
 from ..ratelimiter_func import RateLimiter
+from ..snapshot import register
 from typing import Callable, Union
 from pyrogram import Client
 from pyrogram.types import CallbackQuery, Message
 
 ratelimit = RateLimiter()
+register("ratelimit", dump=ratelimit.snapshot, load=ratelimit.restore)
 # storing spammy user in cache for 1minute before allowing them to use commands again.
 warned_users = TTLCache(maxsize=128, ttl=60)
 warning_message = "Spam detected! ignoring your all requests for few minutes."
@@ -0,0 +1,125 @@
+"""
+Error digest for capture_err.
+Exception grouped by (handler, exception type, top frame) and counted, every
+ERROR_DIGEST_INTERVAL seconds one digest sent to LOG_CHANNEL instead of full
+traceback per error. Full traceback kept in ring buffer for SUDO /errors.
+"""
+import asyncio
+import hashlib
+import html
+import time
+import traceback
+from collections import OrderedDict, deque
+from logging import getLogger
+
+from pyrogram import enums
+from pyrogram.errors import FloodWait
+
+from misskaty import app
+from misskaty.vars import ERROR_BUFFER, ERROR_DIGEST_INTERVAL, LOG_CHANNEL
+
+LOGGER = getLogger(__name__)
+
+# max distinct error kept, oldest seen forgotten first
+MAX_ENTRIES = 500
+
+
+class ErrorEntry:
+    __slots__ = ("fid", "handler", "exc_type", "frame", "total", "window", "first", "last", "reported", "context")
+
+    def __init__(self, fid: str, handler: str, exc_type: str, frame: str):
+        self.fid = fid
+        self.handler = handler
+        self.exc_type = exc_type
+        self.frame = frame
+        self.total = 0
+        # count since last digest
+        self.window = 0
+        self.first = self.last = time.time()
+        self.reported = False
+        self.context = ""
+
+
+class ErrorDigest:
+    def __init__(self, interval: float = ERROR_DIGEST_INTERVAL, size: int = ERROR_BUFFER):
+        self.interval = interval
+        self.entries = OrderedDict()
+        self.tracebacks = deque(maxlen=size)
+        self.task = None
+
+    @staticmethod
+    def fingerprint(handler: str, err: BaseException) -> tuple:
+        frames = traceback.extract_tb(err.__traceback__)
+        frame = f"{frames[-1].filename.rsplit('/', 1)[-1]}:{frames[-1].lineno} {frames[-1].name}" if frames else "?"
+        exc_type = type(err).__name__
+        fid = hashlib.sha1(f"{handler}|{exc_type}|{frame}".encode()).hexdigest()[:8]
+        return fid, exc_type, frame
+
+    def add(self, handler: str, err: BaseException, context: str = "") -> ErrorEntry:
+        fid, exc_type, frame = self.fingerprint(handler, err)
+        entry = self.entries.pop(fid, None) or ErrorEntry(fid, handler, exc_type, frame)
+        self.entries[fid] = entry
+        if len(self.entries) > MAX_ENTRIES:
+            self.entries.popitem(last=False)
+        entry.total += 1
+        entry.window += 1
+        entry.last = time.time()
+        entry.context = context
+        self.tracebacks.append((entry.last, fid, context, "".join(traceback.format_exception(type(err), err, err.__traceback__))))
+        LOGGER.error(f"[{fid}] {handler}: {exc_type}: {err}")
+        if self.task is None and LOG_CHANNEL:
+            self.task = asyncio.create_task(self._run())
+        return entry
+
+    def get(self, fid: str):
+        """Latest traceback and context of given error id."""
+        return next(((ts, context, tb) for ts, _fid, context, tb in reversed(self.tracebacks) if _fid == fid), None)
+
+    def digest(self) -> tuple:
+        """HTML digest of error since last digest and its entries, (None, []) when nothing happened."""
+        pending = sorted((x for x in self.entries.values() if x.window), key=lambda x: x.window, reverse=True)
+        if not pending:
+            return None, []
+        lines = [f"<b>Error digest</b> (last {self.interval:.0f}s)"]
+        for entry in pending:
+            new = "" if entry.reported else " NEW"
+            lines.append(f"<code>{entry.fid}</code>{new} <b>{entry.window}x</b> (total {entry.total}) <code>{html.escape(entry.exc_type)}</code> in <code>{html.escape(entry.handler)}</code>")
+            lines.append(f"  at <code>{html.escape(entry.frame)}</code>")
+            if not entry.reported:
+                lines.append(f"  last: {html.escape(' '.join(entry.context.split()))}")
+        lines.append("\nFull traceback: <code>/errors &lt;id&gt;</code>")
+        return "\n".join(lines), [(entry, entry.window) for entry in pending]
+
+    @staticmethod
+    def mark_reported(sent: list):
+        for entry, window in sent:
+            # error added while sending stay for next digest
+            entry.window -= window
+            entry.reported = True
+
+    def recent(self, limit: int = 15) -> list:
+        return sorted(self.entries.values(), key=lambda x: x.last, reverse=True)[:limit]
+
+    async def _run(self):
+        from misskaty.core.decorator.errors import split_limits
+
+        while True:
+            await asyncio.sleep(self.interval)
+            text, sent = self.digest()
+            if not text:
+                continue
+            try:
+                for part in split_limits(text):
+                    try:
+                        await app.send_message(LOG_CHANNEL, part, parse_mode=enums.ParseMode.HTML)
+                    except FloodWait as e:
+                        await asyncio.sleep(e.value)
+                        await app.send_message(LOG_CHANNEL, part, parse_mode=enums.ParseMode.HTML)
+            except Exception as e:
+                # count kept, sent again with next digest
+                LOGGER.warning(f"Failed to send error digest: {e}")
+                continue
+            self.mark_reported(sent)
+
+
+errors = ErrorDigest()
@@ -0,0 +1,32 @@
+"""
+Local IPC between MissKaty processes.
+Length prefixed pickle frame over unix socket, only used between our own
+process on the same host so pickle is fine here.
+"""
+import asyncio
+import pickle
+import struct
+
+HEADER = struct.Struct(">I")
+
+
+async def send(writer: asyncio.StreamWriter, obj):
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    writer.write(HEADER.pack(len(data)) + data)
+    await writer.drain()
+
+
+async def receive(reader: asyncio.StreamReader):
+    """Read one frame, raise IncompleteReadError when other side gone."""
+    (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    return pickle.loads(await reader.readexactly(length))
+
+
+async def connect(path: str, retries: int = 30) -> tuple:
+    """Open unix connection, waiting for server to come up."""
+    for _ in range(retries):
+        try:
+            return await asyncio.open_unix_connection(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            await asyncio.sleep(1)
+    return await asyncio.open_unix_connection(path)
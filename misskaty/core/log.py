@@ -0,0 +1,115 @@
+"""
+Queued logging.
+Record only put to queue on the event loop, formatted and written to rotating
+log file by QueueListener thread. Chatty logger can be sampled below WARNING
+with LOG_SAMPLE, and LOG_FORMAT=json write one JSON object per line.
+"""
+import atexit
+import json
+import queue
+import random
+from collections import Counter
+from copy import copy
+from logging import INFO, WARNING, Filter, Formatter, getLogger, handlers
+
+from misskaty.vars import LOG_BACKUPS, LOG_FILE, LOG_FORMAT, LOG_MAX_SIZE, LOG_QUEUE_SIZE, LOG_SAMPLE
+
+TEXT_FORMAT = "%(asctime)s - %(name)s.%(funcName)s - %(levelname)s - %(message)s"
+
+
+class JsonFormatter(Formatter):
+    def format(self, record) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "func": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SampleFilter(Filter):
+    """Keep only given fraction of record below WARNING from matching logger."""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        # longest prefix match first, "pyrogram.session" before "pyrogram"
+        self.rates = sorted(rates.items(), key=lambda x: len(x[0]), reverse=True)
+        self.dropped = Counter()
+
+    def filter(self, record) -> bool:
+        if record.levelno >= WARNING:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(f"{prefix}."):
+                if random.random() < rate:
+                    return True
+                self.dropped[prefix] += 1
+                return False
+        return True
+
+
+class QueueHandler(handlers.QueueHandler):
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.overflow = 0
+
+    def prepare(self, record):
+        # message and traceback rendered here, args may change before writer thread see them
+        record = copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # never block the loop because disk is slow
+            self.overflow += 1
+
+
+def parse_sample(value: str) -> dict:
+    """Parse LOG_SAMPLE, ex: pyrogram.session=0.1 httpx=0.2"""
+    rates = {}
+    for item in value.split():
+        name, _, rate = item.partition("=")
+        rates[name] = float(rate)
+    return rates
+
+
+def setup_logging(level: int = INFO) -> handlers.QueueListener:
+    file_handler = handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_SIZE, backupCount=LOG_BACKUPS, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else Formatter(TEXT_FORMAT))
+    queue_handler = QueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    queue_handler.addFilter(SampleFilter(parse_sample(LOG_SAMPLE)))
+    root = getLogger()
+    root.setLevel(level)
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+    root.addHandler(queue_handler)
+    listener = handlers.QueueListener(queue_handler.queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_logging, listener)
+    return listener
+
+
+def stop_logging(listener: handlers.QueueListener):
+    # flush what left in queue, stop() fail when already stopped
+    if listener._thread:
+        listener.stop()
+
+
+def log_stats() -> dict:
+    for handler in getLogger().handlers:
+        if isinstance(handler, QueueHandler):
+            sampled = next((f.dropped for f in handler.filters if isinstance(f, SampleFilter)), {})
+            return {"queued": handler.queue.qsize(), "overflow": handler.overflow, "sampled_out": dict(sampled)}
+    return {}
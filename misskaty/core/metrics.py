@@ -0,0 +1,295 @@
+"""
+Handler, MongoDB and HTTP metrics.
+Every registered handler wrapped to record call, error and latency histogram
+per handler and update type, MongoDB command timed with pymongo command listener
+and outgoing HTTP request timed from httpx transport and aiohttp trace.
+Exposed in Prometheus text format on local /metrics and summarized by /perf.
+"""
+import inspect
+import re
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from logging import getLogger
+
+from aiohttp import web
+from pymongo import monitoring
+from pyrogram import ContinuePropagation, StopPropagation
+
+from misskaty.core.tracing import record, trace_client, traced_handler
+
+LOGGER = getLogger(__name__)
+
+# Histogram upper bound in seconds, same as Prometheus client default plus some slow one
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LABELS = {
+    "handler": ("client", "handler", "update"),
+    "mongo": ("command", "collection"),
+    "http": ("client", "method", "host"),
+    "ipc": ("side", "method"),
+}
+HELP = {
+    "handler": "Pyrogram handler latency",
+    "mongo": "MongoDB command latency",
+    "http": "Outgoing HTTP request latency until response headers",
+    "ipc": "Call between bot and userbot process",
+}
+
+
+class Histogram:
+    __slots__ = ("count", "errors", "total", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        # last bucket is +Inf
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds: float, error: bool = False):
+        self.count += 1
+        self.total += seconds
+        if error:
+            self.errors += 1
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimated from bucket, return the upper bound of bucket that hold q."""
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= target:
+                return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+        return 0.0
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _ms(seconds: float) -> str:
+    return "inf" if seconds == float("inf") else f"{seconds * 1000:.0f}ms"
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.time()
+        self.series = {}
+        # mongo listener called from motor worker thread
+        self._lock = threading.Lock()
+
+    def observe(self, metric: str, labels: tuple, seconds: float, error: bool = False):
+        key = (metric, labels)
+        with self._lock:
+            hist = self.series.get(key)
+            if hist is None:
+                hist = self.series[key] = Histogram()
+            hist.observe(seconds, error)
+
+    def reset(self):
+        with self._lock:
+            self.series.clear()
+        self.started = time.time()
+
+    def _snapshot(self, metric: str = None) -> list:
+        with self._lock:
+            items = [(key, hist) for key, hist in self.series.items() if metric is None or key[0] == metric]
+            snap = []
+            for (name, labels), hist in items:
+                copy = Histogram()
+                copy.count, copy.errors, copy.total, copy.buckets = hist.count, hist.errors, hist.total, list(hist.buckets)
+                snap.append((name, labels, copy))
+        return snap
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = [
+            "# HELP misskaty_uptime_seconds Bot uptime",
+            "# TYPE misskaty_uptime_seconds gauge",
+            f"misskaty_uptime_seconds {time.time() - self.started:.0f}",
+        ]
+        snap = self._snapshot()
+        for metric, names in LABELS.items():
+            rows = [(labels, hist) for name, labels, hist in snap if name == metric]
+            if not rows:
+                continue
+            base = f"misskaty_{metric}_seconds"
+            lines.append(f"# HELP {base} {HELP[metric]}")
+            lines.append(f"# TYPE {base} histogram")
+            for labels, hist in rows:
+                label = ",".join(f'{key}="{_escape(value)}"' for key, value in zip(names, labels))
+                cumulative = 0
+                for bound, n in zip(BUCKETS + ("+Inf",), hist.buckets):
+                    cumulative += n
+                    lines.append(f'{base}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f"{base}_sum{{{label}}} {hist.total:.6f}")
+                lines.append(f"{base}_count{{{label}}} {hist.count}")
+            lines.append(f"# TYPE misskaty_{metric}_errors_total counter")
+            for labels, hist in rows:
+                label = ",".join(f'{key}="{_escape(value)}"' for key, value in zip(names, labels))
+                lines.append(f"misskaty_{metric}_errors_total{{{label}}} {hist.errors}")
+        return "\n".join(lines) + "\n"
+
+    def top(self, metric: str, group_by: tuple = None, limit: int = 10) -> list:
+        """Return [(name, Histogram)] sorted by total time, grouped by label index."""
+        merged = {}
+        for _, labels, hist in self._snapshot(metric):
+            name = " ".join(str(labels[i]) for i in group_by) if group_by else " ".join(map(str, labels))
+            if name not in merged:
+                merged[name] = Histogram()
+            acc = merged[name]
+            acc.count += hist.count
+            acc.errors += hist.errors
+            acc.total += hist.total
+            acc.buckets = [a + b for a, b in zip(acc.buckets, hist.buckets)]
+        return sorted(merged.items(), key=lambda x: x[1].total, reverse=True)[:limit]
+
+    def summary(self, limit: int = 8) -> str:
+        uptime = max(time.time() - self.started, 1)
+        sections = (
+            ("Handlers", "handler", (1,)),
+            ("Update types", "handler", (2,)),
+            ("MongoDB", "mongo", (1, 0)),
+            ("HTTP", "http", (2,)),
+            ("Userbot IPC", "ipc", (0, 1)),
+        )
+        msg = f"<b>Uptime:</b> <code>{uptime / 60:.0f} min</code>\n"
+        for title, metric, group_by in sections:
+            rows = self.top(metric, group_by, limit)
+            if not rows:
+                continue
+            msg += f"\n<b>{title}</b> (by total time)\n"
+            for name, hist in rows:
+                msg += f"<code>{name}</code>: {hist.count} ({hist.count / uptime * 60:.1f}/min), avg {_ms(hist.total / hist.count)}, p50 {_ms(hist.quantile(0.5))}, p99 {_ms(hist.quantile(0.99))}, {hist.errors} err\n"
+        return msg
+
+
+metrics = Metrics()
+
+
+def _update_name(handler) -> str:
+    # MessageHandler -> message, CallbackQueryHandler -> callback_query
+    name = type(handler).__name__.replace("Handler", "")
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def _handler_name(callback) -> str:
+    return f"{callback.__module__.rsplit('.', 1)[-1]}.{callback.__name__}"
+
+
+def timed_handler(callback, client_name: str, update: str):
+    labels = (client_name, _handler_name(callback), update)
+
+    if inspect.iscoroutinefunction(callback):
+
+        @wraps(callback)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            error = False
+            try:
+                return await callback(*args, **kwargs)
+            except (StopPropagation, ContinuePropagation):
+                raise
+            except BaseException:
+                error = True
+                raise
+            finally:
+                metrics.observe("handler", labels, time.perf_counter() - start, error)
+
+    else:
+        # sync handler run by dispatcher in executor, keep it sync
+        @wraps(callback)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            error = False
+            try:
+                return callback(*args, **kwargs)
+            except (StopPropagation, ContinuePropagation):
+                raise
+            except BaseException:
+                error = True
+                raise
+            finally:
+                metrics.observe("handler", labels, time.perf_counter() - start, error)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def timed_elsewhere(callback):
+    """Mark handler that hand off its work and record the latency itself, ex: inline coordinator."""
+    callback.__instrumented__ = True
+    return callback
+
+
+def _wrap(client, handler):
+    if not getattr(handler.callback, "__instrumented__", False):
+        update = _update_name(handler)
+        callback = traced_handler(handler.callback, _handler_name(handler.callback), update)
+        handler.callback = timed_handler(callback, client.name, update)
+    return handler
+
+
+def instrument(client):
+    """
+    Time every handler of client. Call before plugin imported, handler added
+    later by decorator wrapped when registered.
+    """
+    trace_client(client)
+    for group in client.dispatcher.groups.values():
+        for handler in group:
+            _wrap(client, handler)
+    add_handler = client.add_handler
+
+    def timed_add_handler(handler, group: int = 0):
+        return add_handler(_wrap(client, handler), group)
+
+    client.add_handler = timed_add_handler
+
+
+class MongoListener(monitoring.CommandListener):
+    """Pass to motor client with event_listeners=[mongo_listener]."""
+
+    def __init__(self):
+        self._started = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            # getMore has cursor id there
+            collection = event.command.get("collection", "")
+        self._started[event.request_id] = collection
+
+    def succeeded(self, event):
+        collection = self._started.pop(event.request_id, "")
+        metrics.observe("mongo", (event.command_name, collection), event.duration_micros / 1e6)
+        # motor copy contextvars to its thread, so span of the caller is visible here
+        record("mongo", event.duration_micros / 1e6, command=event.command_name, collection=collection)
+
+    def failed(self, event):
+        collection = self._started.pop(event.request_id, "")
+        metrics.observe("mongo", (event.command_name, collection), event.duration_micros / 1e6, True)
+        record("mongo", event.duration_micros / 1e6, command=event.command_name, collection=collection, error=True)
+
+
+mongo_listener = MongoListener()
+
+
+async def _metrics_view(request):
+    return web.Response(body=metrics.render().encode(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+
+async def start_metrics_server(host: str, port: int):
+    if not port:
+        return
+    webapp = web.Application()
+    webapp.router.add_get("/metrics", _metrics_view)
+    runner = web.AppRunner(webapp, access_log=None)
+    try:
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        LOGGER.info(f"Metrics endpoint running on http://{host}:{port}/metrics")
+    except Exception as e:
+        LOGGER.error(f"Failed to start metrics endpoint: {e}")
@@ -1,3 +1,5 @@
+import asyncio
+import time
 from typing import Union
 
 from pyrate_limiter import BucketFullException, Duration, Limiter, MemoryListBucket, RequestRate
@@ -41,3 +43,62 @@ class RateLimiter:
             return False
         except BucketFullException:
             return True
+
+    def snapshot(self) -> dict:
+        """Age of every request per userid, limiter clock is monotonic so timestamp can't be saved as is."""
+        now = self.limiter.time_function()
+        ages = {userid: [now - item for item in bucket.all_items() if now - item < 86400] for userid, bucket in self.limiter.bucket_group.items()}
+        return {"time": time.time(), "ages": ages}
+
+    def restore(self, state: dict) -> None:
+        now = self.limiter.time_function()
+        # time passed while bot was down count too
+        elapsed = max(0, time.time() - state["time"])
+        maxsize = max(rate.limit for rate in (self.minute_rate, self.hourly_rate, self.daily_rate))
+        for userid, ages in state["ages"].items():
+            ages = [age + elapsed for age in ages if age + elapsed < 86400]
+            if not ages:
+                continue
+            bucket = self.limiter.bucket_group[userid] = MemoryListBucket(maxsize=maxsize, identity=userid)
+            for age in sorted(ages, reverse=True):
+                bucket.put(now - age)
+
+
+class TokenBucket:
+    """
+    Simple async token bucket to keep outgoing request
+    under Telegram flood limit, shared by all worker.
+    """
+
+    def __init__(self, rate: float, capacity: int = None) -> None:
+        # token added per second
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Wait until one token available.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop all worker when got FloodWait.
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
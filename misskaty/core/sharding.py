@@ -0,0 +1,190 @@
+"""
+Multi process mode.
+With SHARD_COUNT > 1 the front process only receive update and send raw update
+to worker process chosen by chat id hash over unix socket. Worker log in with
+its own bot session without update, run all plugin and feed received update to
+pyrogram dispatcher. Shared state stay in MongoDB, per chat cache stay local
+since one chat always handled by the same shard. One shard elected leader with
+MongoDB lease to run scheduler and cleanmode.
+"""
+import asyncio
+import os
+import signal
+import sys
+import time
+import zlib
+from collections import Counter
+from io import BytesIO
+from logging import getLogger
+
+from pyrogram import utils
+from pyrogram.raw.core import TLObject
+
+from database.leader_db import acquire_lease, release_lease
+from misskaty.core import ipc
+from misskaty.vars import LEADER_TTL, SHARD_COUNT, SHARD_ID, SHARD_QUEUE, SHARD_SOCKET
+
+LOGGER = getLogger(__name__)
+
+SHARDED = SHARD_COUNT > 1
+IS_FRONT = SHARDED and SHARD_ID is None
+
+
+def update_chat_id(update) -> int:
+    """Chat id of raw update, user id for update without chat (inline query)."""
+    peer = getattr(getattr(update, "message", None), "peer_id", None) or getattr(update, "peer", None)
+    if peer is not None:
+        return utils.get_peer_id(peer)
+    if getattr(update, "channel_id", None):
+        return utils.get_channel_id(update.channel_id)
+    if getattr(update, "chat_id", None):
+        return -update.chat_id
+    return getattr(update, "user_id", 0) or 0
+
+
+def shard_of(chat_id: int, count: int = SHARD_COUNT) -> int:
+    return zlib.crc32(str(chat_id).encode()) % count
+
+
+class Front:
+    def __init__(self, client, count: int = SHARD_COUNT):
+        self.client = client
+        self.count = count
+        self.queues = [asyncio.Queue(SHARD_QUEUE) for _ in range(count)]
+        self.processes = {}
+        self.sent = Counter()
+        self.dropped = Counter()
+        self.server = None
+
+    async def start(self):
+        if os.path.exists(SHARD_SOCKET):
+            os.remove(SHARD_SOCKET)
+        self.server = await asyncio.start_unix_server(self._connected, SHARD_SOCKET)
+        for shard in range(self.count):
+            asyncio.create_task(self._supervise(shard))
+        # front run no handler, stop handler worker started by app.start() before
+        # taking their queue. Client.handle_updates put raw update here after that
+        dispatcher = self.client.dispatcher
+        for _ in dispatcher.handler_worker_tasks:
+            dispatcher.updates_queue.put_nowait(None)
+        await asyncio.gather(*dispatcher.handler_worker_tasks)
+        dispatcher.handler_worker_tasks.clear()
+        dispatcher.updates_queue = self
+        LOGGER.info(f"[SHARD] Front started with {self.count} shards")
+
+    async def stop(self):
+        for proc in self.processes.values():
+            if proc.returncode is None:
+                proc.terminate()
+        await asyncio.gather(*(proc.wait() for proc in self.processes.values()), return_exceptions=True)
+        self.server.close()
+
+    def put_nowait(self, packet: tuple):
+        if packet is None:
+            # stop signal from Dispatcher.stop, no handler worker here
+            return
+        update, users, chats = packet
+        shard = shard_of(update_chat_id(update), self.count)
+        packet = (update.write(), [x.write() for x in users.values()], [c.write() for c in chats.values()])
+        try:
+            self.queues[shard].put_nowait(packet)
+        except asyncio.QueueFull:
+            # shard down or too slow, don't let it hold other shard
+            self.dropped[shard] += 1
+
+    async def _connected(self, reader, writer):
+        shard = await ipc.receive(reader)
+        LOGGER.info(f"[SHARD] Shard {shard} connected")
+        queue = self.queues[shard]
+        try:
+            while True:
+                packet = await queue.get()
+                await ipc.send(writer, packet)
+                self.sent[shard] += 1
+        except (ConnectionError, RuntimeError) as e:
+            LOGGER.warning(f"[SHARD] Shard {shard} disconnected: {e}")
+        finally:
+            writer.close()
+
+    async def _supervise(self, shard: int):
+        env = {**os.environ, "SHARD_ID": str(shard)}
+        while True:
+            proc = await asyncio.create_subprocess_exec(sys.executable, "-m", "misskaty", env=env)
+            self.processes[shard] = proc
+            code = await proc.wait()
+            LOGGER.error(f"[SHARD] Shard {shard} exited with code {code}, restarting in 5s")
+            await asyncio.sleep(5)
+
+    def stats(self) -> dict:
+        return {shard: {"queued": self.queues[shard].qsize(), "sent": self.sent[shard], "dropped": self.dropped[shard]} for shard in range(self.count)}
+
+
+class Worker:
+    def __init__(self, client, shard: int = SHARD_ID):
+        self.client = client
+        self.shard = shard
+
+    async def start(self):
+        # client started with no_updates so dispatcher didn't start handler worker
+        dispatcher = self.client.dispatcher
+        for _ in range(self.client.workers):
+            lock = asyncio.Lock()
+            dispatcher.locks_list.append(lock)
+            dispatcher.handler_worker_tasks.append(asyncio.create_task(dispatcher.handler_worker(lock)))
+        reader, writer = await ipc.connect(SHARD_SOCKET)
+        await ipc.send(writer, self.shard)
+        asyncio.create_task(self._receive(reader))
+        LOGGER.info(f"[SHARD] Shard {self.shard} connected to front")
+
+    async def _receive(self, reader):
+        try:
+            while True:
+                data, users, chats = await ipc.receive(reader)
+                update = TLObject.read(BytesIO(data))
+                users = {x.id: x for x in (TLObject.read(BytesIO(u)) for u in users)}
+                chats = {x.id: x for x in (TLObject.read(BytesIO(c)) for c in chats)}
+                # same as Client.handle_updates, peer needed to resolve user and chat later
+                await self.client.fetch_peers(list(users.values()) + list(chats.values()))
+                self.client.dispatcher.updates_queue.put_nowait((update, users, chats))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            LOGGER.error(f"[SHARD] Front gone, stopping shard {self.shard}")
+            # idle() return on SIGTERM
+            os.kill(os.getpid(), signal.SIGTERM)
+
+
+class Leader:
+    """MongoDB lease, only one shard hold it at a time."""
+
+    def __init__(self, name: str, ttl: int = LEADER_TTL):
+        self.name = name
+        self.owner = f"shard{SHARD_ID}-{os.getpid()}"
+        self.ttl = ttl
+        self.is_leader = False
+        self.renewed = 0
+
+    async def run(self, on_elected, on_lost, on_renew=None):
+        try:
+            while True:
+                try:
+                    held = await acquire_lease(self.name, self.owner, self.ttl)
+                except Exception as e:
+                    LOGGER.warning(f"[LEADER] Lease renew failed: {e}")
+                    # keep leading until lease surely expired
+                    held = self.is_leader and time.monotonic() - self.renewed < self.ttl
+                else:
+                    if held:
+                        self.renewed = time.monotonic()
+                if held and not self.is_leader:
+                    LOGGER.info(f"[LEADER] {self.owner} elected for {self.name}")
+                    self.is_leader = True
+                    on_elected()
+                elif not held and self.is_leader:
+                    LOGGER.warning(f"[LEADER] {self.owner} lost {self.name}")
+                    self.is_leader = False
+                    on_lost()
+                elif held and on_renew:
+                    on_renew()
+                await asyncio.sleep(self.ttl / 3)
+        finally:
+            if self.is_leader:
+                await release_lease(self.name, self.owner)
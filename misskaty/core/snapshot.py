@@ -0,0 +1,118 @@
+"""
+Warm restart.
+In memory state (pagination session, cleanmode queue, rate limiter, cooldown,
+admin cache, whisper message) registered as named store. All store saved to
+SNAPSHOT_FILE on shutdown, before /update restart and every SNAPSHOT_INTERVAL,
+then loaded at startup before plugin imported so button keep working after
+restart. Store registered after load get its value when registered.
+"""
+import asyncio
+import os
+import pickle
+import time
+import zlib
+from logging import getLogger
+
+from misskaty.vars import SNAPSHOT_FILE, SNAPSHOT_INTERVAL, SNAPSHOT_MAX_AGE
+
+LOGGER = getLogger(__name__)
+
+VERSION = 1
+stores = {}
+# loaded value waiting for its store to be registered
+_restored = {}
+
+
+class StateStore:
+    __slots__ = ("name", "dump", "load")
+
+    def __init__(self, name: str, dump, load):
+        self.name = name
+        self.dump = dump
+        self.load = load
+
+
+def register(name: str, obj=None, dump=None, load=None):
+    """
+    Register dict to snapshot, or give dump/load callable for other object.
+    Return obj so it can wrap module level assignment.
+    """
+    if obj is not None:
+        dump = dump or (lambda: dict(obj))
+        load = load or obj.update
+    store = stores[name] = StateStore(name, dump, load)
+    if name in _restored:
+        _apply(store, _restored.pop(name))
+    return obj
+
+
+def _apply(store: StateStore, value):
+    try:
+        store.load(value)
+    except Exception as e:
+        LOGGER.warning(f"[SNAPSHOT] Failed to restore {store.name}: {e}")
+
+
+def collect() -> dict:
+    """Pickle every store, run on the loop so store (and nested value) aren't changed meanwhile."""
+    pickled = {}
+    for name, store in stores.items():
+        try:
+            # pickled one by one so broken store don't lose the others
+            pickled[name] = pickle.dumps(store.dump(), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            LOGGER.warning(f"[SNAPSHOT] Failed to save {name}: {e}")
+    return pickled
+
+
+def write_snapshot(pickled: dict, path: str = SNAPSHOT_FILE) -> int:
+    """Write pickled store, return file size."""
+    blob = zlib.compress(pickle.dumps({"version": VERSION, "time": time.time(), "stores": pickled}, protocol=pickle.HIGHEST_PROTOCOL))
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(blob)
+    os.replace(tmp, path)
+    return len(blob)
+
+
+def save_snapshot(path: str = SNAPSHOT_FILE) -> int:
+    return write_snapshot(collect(), path)
+
+
+def load_snapshot(path: str = SNAPSHOT_FILE) -> int:
+    """Restore registered store now and stage the rest, return store count."""
+    try:
+        with open(path, "rb") as f:
+            snap = pickle.loads(zlib.decompress(f.read()))
+    except FileNotFoundError:
+        return 0
+    except Exception as e:
+        LOGGER.warning(f"[SNAPSHOT] Ignoring broken snapshot: {e}")
+        return 0
+    age = time.time() - snap.get("time", 0)
+    if snap.get("version") != VERSION or age > SNAPSHOT_MAX_AGE:
+        LOGGER.info(f"[SNAPSHOT] Ignoring snapshot from {age:.0f}s ago")
+        return 0
+    for name, raw in snap["stores"].items():
+        try:
+            value = pickle.loads(raw)
+        except Exception as e:
+            LOGGER.warning(f"[SNAPSHOT] Failed to read {name}: {e}")
+            continue
+        if name in stores:
+            _apply(stores[name], value)
+        else:
+            _restored[name] = value
+    LOGGER.info(f"[SNAPSHOT] Loaded {len(snap['stores'])} stores saved {age:.0f}s ago")
+    return len(snap["stores"])
+
+
+async def snapshot_loop(interval: float = SNAPSHOT_INTERVAL):
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            # compress and write off the loop
+            await loop.run_in_executor(None, write_snapshot, collect())
+        except Exception as e:
+            LOGGER.warning(f"[SNAPSHOT] Periodic save failed: {e}")
@@ -0,0 +1,132 @@
+"""
+Lightweight per-update tracing.
+Sampled handler call open a root span, Telegram RPC, MongoDB command, HTTP
+request and subprocess made while handling it recorded as child span. Trace
+slower than TRACE_SLOW_MS kept in ring buffer for SUDO /traces. When sample
+rate is 0 handler and client aren't wrapped, child span helper only do one
+contextvar lookup.
+"""
+import inspect
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from misskaty.vars import TRACE_BUFFER, TRACE_SAMPLE_RATE, TRACE_SLOW_MS
+
+current_span = ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "start", "duration", "children", "attrs")
+
+    def __init__(self, name: str, start: float = None, **attrs):
+        self.name = name
+        self.start = time.perf_counter() if start is None else start
+        self.duration = None
+        self.children = []
+        self.attrs = attrs
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+
+    def format(self, root_start: float = None, depth: int = 0) -> str:
+        root_start = self.start if root_start is None else root_start
+        attrs = " ".join(f"{key}={value}" for key, value in self.attrs.items())
+        took = f"{self.duration * 1000:.1f}ms" if self.duration is not None else "unfinished"
+        lines = [f"{'  ' * depth}+{(self.start - root_start) * 1000:.0f}ms {self.name} {took} {attrs}".rstrip()]
+        for child in sorted(self.children, key=lambda x: x.start):
+            lines.append(child.format(root_start, depth + 1))
+        if depth == 0 and self.duration is not None:
+            # time not spent in child span is mostly python code (parsing, formatting)
+            waited = sum(child.duration or 0 for child in self.children)
+            lines.append(f"  self time {max(self.duration - waited, 0) * 1000:.1f}ms")
+        return "\n".join(lines)
+
+
+class Tracer:
+    def __init__(self, sample_rate: float = TRACE_SAMPLE_RATE, slow_ms: float = TRACE_SLOW_MS, size: int = TRACE_BUFFER):
+        self.sample_rate = sample_rate
+        self.slow = slow_ms / 1000
+        self.traces = deque(maxlen=size)
+        self.sampled = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def _finish(self, root: Span):
+        root.finish()
+        if root.duration >= self.slow:
+            self.traces.append((time.time(), root))
+
+    def recent(self, limit: int = 10) -> list:
+        return list(self.traces)[-limit:][::-1]
+
+
+tracer = Tracer()
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Child span of current trace, does nothing outside sampled update."""
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, **attrs)
+    parent.children.append(child)
+    token = current_span.set(child)
+    try:
+        yield child
+    finally:
+        child.finish()
+        current_span.reset(token)
+
+
+def record(name: str, duration: float, **attrs):
+    """Add finished child span, for callback that only know the duration."""
+    parent = current_span.get()
+    if parent is None:
+        return
+    child = Span(name, time.perf_counter() - duration, **attrs)
+    child.duration = duration
+    # can be called from motor thread, list append is atomic
+    parent.children.append(child)
+
+
+def traced_handler(callback, name: str, update: str):
+    """Open root span for sampled call, return callback untouched when disabled."""
+    if not tracer.enabled or not inspect.iscoroutinefunction(callback):
+        return callback
+
+    @wraps(callback)
+    async def wrapper(client, event, *args, **kwargs):
+        if random.random() >= tracer.sample_rate:
+            return await callback(client, event, *args, **kwargs)
+        tracer.sampled += 1
+        chat = getattr(event, "chat", None) or getattr(getattr(event, "message", None), "chat", None)
+        root = Span(name, update=update, chat=chat.id if chat else None)
+        token = current_span.set(root)
+        try:
+            return await callback(client, event, *args, **kwargs)
+        finally:
+            current_span.reset(token)
+            tracer._finish(root)
+
+    return wrapper
+
+
+def trace_client(client):
+    """Record every Telegram RPC of sampled update as invoke span."""
+    if not tracer.enabled:
+        return
+    invoke = client.invoke
+
+    async def traced_invoke(query, *args, **kwargs):
+        with span("invoke", method=type(query).__name__):
+            return await invoke(query, *args, **kwargs)
+
+    client.invoke = traced_invoke
@@ -0,0 +1,163 @@
+"""
+Userbot in its own process.
+With USERBOT_MODE=split the bot process spawn userbot process (PROCESS_ROLE=userbot)
+which run userbot client and userbot plugin only. Bot side `user` is
+UserbotProxy, the few cross client call go to userbot process over unix
+socket (USERBOT_SOCKET) and return pickled result. Handler registered on proxy
+ignored, those run in userbot process.
+"""
+import asyncio
+import inspect
+import itertools
+import os
+import sys
+import time
+from logging import getLogger
+
+from misskaty.core import ipc
+from misskaty.core.metrics import metrics
+from misskaty.vars import USERBOT_IPC_LIMIT, USERBOT_SOCKET
+
+LOGGER = getLogger(__name__)
+
+# max item collected from async generator method like get_chat_history
+MAX_ITEMS = 1000
+
+
+async def _call(client, method: str, args: tuple, kwargs: dict):
+    result = getattr(client, method)(*args, **kwargs)
+    if inspect.isasyncgen(result):
+        return [x async for x in result][:MAX_ITEMS]
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+async def serve(client, path: str = USERBOT_SOCKET):
+    """Run in userbot process, answer call from bot process."""
+    limit = asyncio.Semaphore(USERBOT_IPC_LIMIT)
+
+    async def handle(rid, method, args, kwargs, writer, lock):
+        async with limit:
+            start = time.perf_counter()
+            try:
+                reply = (rid, True, await _call(client, method, args, kwargs))
+            except Exception as e:
+                reply = (rid, False, e)
+            metrics.observe("ipc", ("userbot", method), time.perf_counter() - start, not reply[1])
+        async with lock:
+            try:
+                await ipc.send(writer, reply)
+            except Exception as e:
+                # result can't be pickled or bot process gone
+                LOGGER.warning(f"[USERBOT] Reply to {method} failed: {e}")
+                if not writer.is_closing():
+                    await ipc.send(writer, (rid, False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+    async def connected(reader, writer):
+        lock = asyncio.Lock()
+        try:
+            while True:
+                rid, method, args, kwargs = await ipc.receive(reader)
+                asyncio.create_task(handle(rid, method, args, kwargs, writer, lock))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    if os.path.exists(path):
+        os.remove(path)
+    server = await asyncio.start_unix_server(connected, path)
+    LOGGER.info(f"[USERBOT] IPC listening on {path}")
+    return server
+
+
+async def supervise():
+    """Run in bot process, keep userbot process alive."""
+    env = {**os.environ, "PROCESS_ROLE": "userbot"}
+    env.pop("SHARD_ID", None)
+    while True:
+        proc = await asyncio.create_subprocess_exec(sys.executable, "-m", "misskaty", env=env)
+        code = await proc.wait()
+        LOGGER.error(f"[USERBOT] Userbot process exited with code {code}, restarting in 5s")
+        await asyncio.sleep(5)
+
+
+class UserbotProxy:
+    """Stand in for userbot Client in bot process."""
+
+    def __init__(self, spawn: bool, path: str = USERBOT_SOCKET):
+        self.spawn = spawn
+        self.path = path
+        self.me = None
+        self.is_connected = False
+        self.ids = itertools.count()
+        self.pending = {}
+        self.writer = None
+
+    async def start(self):
+        if self.spawn:
+            asyncio.create_task(supervise())
+        await self._connect()
+        self.me = await self.call("get_me")
+
+    async def _connect(self, retries: int = 120):
+        reader, self.writer = await ipc.connect(self.path, retries=retries)
+        self.is_connected = True
+        asyncio.create_task(self._receive(reader))
+
+    async def _receive(self, reader):
+        try:
+            while True:
+                rid, ok, result = await ipc.receive(reader)
+                future = self.pending.pop(rid, None)
+                if future and not future.done():
+                    future.set_result(result) if ok else future.set_exception(result)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            LOGGER.error("[USERBOT] Lost connection to userbot process, reconnecting")
+        self.is_connected = False
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Userbot process gone"))
+        self.pending.clear()
+        delay = 1
+        while True:
+            try:
+                return await self._connect(retries=0)
+            except OSError as e:
+                # userbot process may take long to come back, never give up
+                LOGGER.warning(f"[USERBOT] Reconnect failed: {e}, retrying in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
+
+    async def call(self, method: str, *args, **kwargs):
+        if not self.is_connected:
+            raise ConnectionError("Userbot process not connected")
+        rid = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[rid] = future
+        start = time.perf_counter()
+        error = False
+        try:
+            await ipc.send(self.writer, (rid, method, args, kwargs))
+            return await future
+        except BaseException:
+            error = True
+            self.pending.pop(rid, None)
+            raise
+        finally:
+            metrics.observe("ipc", ("bot", method), time.perf_counter() - start, error)
+
+    async def stop(self):
+        if self.writer:
+            self.writer.close()
+
+    def __getattr__(self, name: str):
+        if name.startswith("on_"):
+            # decorator of userbot handler, registered in userbot process instead
+            return lambda *args, **kwargs: lambda func: func
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        async def remote(*args, **kwargs):
+            return await self.call(name, *args, **kwargs)
+
+        return remote
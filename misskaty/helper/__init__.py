@@ -1,3 +1,4 @@
+from .downloader import *
 from .ffmpeg_helper import *
 from .files import *
 from .functions import *
@@ -0,0 +1,189 @@
+"""
+Cached Telegram Bot API spec for botapi inline query.
+Spec downloaded once and revalidated with ETag, method and type name indexed
+by prefix and trigram, result article rendered when spec loaded and long docs
+posted to Telegraph in background so inline answer doesn't do any network call.
+"""
+import asyncio
+import html
+import re
+import time
+from bisect import bisect_left
+from logging import getLogger
+
+from pykeyboard import InlineButton, InlineKeyboard
+from pyrogram import enums
+from pyrogram.types import InlineQueryResultArticle, InputTextMessageContent
+
+from misskaty.helper.http import http
+from misskaty.helper.media_helper import post_to_telegraph
+
+LOGGER = getLogger(__name__)
+
+SPEC_URL = "https://github.com/PaulSonOfLars/telegram-bot-api-spec/raw/main/api.json"
+# Revalidate spec with ETag after this many seconds
+SPEC_TTL = 6 * 3600
+THUMB_URL = "https://img.freepik.com/premium-vector/open-folder-folder-with-documents-document-protection-concept_183665-104.jpg"
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) " "Chrome/61.0.3163.100 Safari/537.36"}
+
+
+def trim_html(text: str, limit: int) -> str:
+    """Strip tag before cutting so no tag or entity left half open."""
+    plain = html.unescape(re.sub(r"<[^>]+>", "", text))
+    return html.escape(plain[:limit], quote=False)
+
+
+def trigrams(text: str):
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def render_doc(name: str, data: dict, is_method: bool) -> str:
+    if is_method:
+        returns = ", ".join(data.get("returns", []))
+        msg = f"<b>{name}</b> (<code>{returns}</code>)\n"
+    else:
+        msg = f"<b>{name}</b>\n"
+    msg += f"{data['description'][0]}\n\n"
+    msg += "<b>Variables:</b>\n"
+    for i in data.get("fields", []):
+        msg += f"<code>{i['name']}</code> (<b>{i['types'][0]}</b>)\n<b>Required:</b> <code>{i['required']}</code>\n{i['description']}\n\n"
+    return msg
+
+
+class BotApiSpec:
+    def __init__(self, url: str = SPEC_URL):
+        self.url = url
+        self.etag = None
+        self.checked = 0
+        self.docs = {}
+        self.articles = {}
+        self.names = []
+        self._sorted = []
+        self._trigram = {}
+        self._lock = asyncio.Lock()
+        self._telegraph_task = None
+
+    def _article(self, name: str, text: str, link: str, description: str) -> InlineQueryResultArticle:
+        buttons = InlineKeyboard()
+        buttons.row(
+            InlineButton("Open Docs", url=link),
+            InlineButton("Search Again", switch_inline_query_current_chat="botapi "),
+        )
+        buttons.row(
+            InlineButton("Give Coffee", url="https://yasirpedia.eu.org"),
+        )
+        return InlineQueryResultArticle(
+            title=name,
+            input_message_content=InputTextMessageContent(
+                message_text=text,
+                parse_mode=enums.ParseMode.HTML,
+                disable_web_page_preview=True,
+            ),
+            url=link,
+            description=description,
+            thumb_url=THUMB_URL,
+            reply_markup=buttons,
+        )
+
+    def _build(self, spec: dict):
+        docs = {}
+        for is_method, section in ((True, "methods"), (False, "types")):
+            for name, data in spec.get(section, {}).items():
+                docs[name] = {
+                    "link": data["href"],
+                    "description": data["description"][0],
+                    "text": render_doc(name, data, is_method),
+                    "telegraph": None,
+                }
+                old = self.docs.get(name)
+                if old and old["text"] == docs[name]["text"]:
+                    # reuse telegraph page when docs unchanged
+                    docs[name]["telegraph"] = old["telegraph"]
+        trigram = {}
+        for name in docs:
+            for gram in trigrams(name.lower()):
+                trigram.setdefault(gram, set()).add(name)
+        self.docs = docs
+        self.names = list(docs)
+        self._sorted = sorted((name.lower(), name) for name in docs)
+        self._trigram = trigram
+        self.articles = {name: self._render(name) for name in docs}
+
+    def _render(self, name: str) -> InlineQueryResultArticle:
+        doc = self.docs[name]
+        text = doc["text"]
+        if len(text.encode("utf-8")) > 4096:
+            # until Telegraph page ready, send trimmed docs with link
+            text = doc["telegraph"] or f"{trim_html(text, 3500)}...\n\n<a href='{doc['link']}'>Read more</a>"
+        return self._article(name, text, doc["link"], doc["description"])
+
+    async def _post_long_docs(self):
+        for name, doc in list(self.docs.items()):
+            if doc["telegraph"] or len(doc["text"].encode("utf-8")) <= 4096:
+                continue
+            try:
+                doc["telegraph"] = await post_to_telegraph(False, name, f"<pre>{doc['text'].replace('<user_id>', '(user_id)')}</pre>")
+                self.articles[name] = self._render(name)
+            except Exception as e:
+                LOGGER.warning(f"Failed to post {name} docs to telegraph: {e}")
+
+    async def refresh(self, force: bool = False):
+        if not force and self.docs and time.time() - self.checked < SPEC_TTL:
+            return
+        async with self._lock:
+            if not force and self.docs and time.time() - self.checked < SPEC_TTL:
+                return
+            headers = dict(HEADERS)
+            if self.etag and self.docs:
+                headers["If-None-Match"] = self.etag
+            try:
+                resp = await http.get(self.url, headers=headers, follow_redirects=True)
+            except Exception as e:
+                # keep serving old spec when GitHub unreachable
+                LOGGER.warning(f"Failed to refresh Bot API spec: {e}")
+                if not self.docs:
+                    raise
+                self.checked = time.time()
+                return
+            self.checked = time.time()
+            if resp.status_code == 304:
+                return
+            resp.raise_for_status()
+            await asyncio.get_running_loop().run_in_executor(None, self._build, resp.json())
+            self.etag = resp.headers.get("etag")
+            LOGGER.info(f"Loaded Bot API spec with {len(self.docs)} methods and types.")
+            if not self._telegraph_task or self._telegraph_task.done():
+                self._telegraph_task = asyncio.create_task(self._post_long_docs())
+
+    def search(self, query: str) -> list:
+        """Return matching name, exact and prefix match first."""
+        q = query.lower().strip()
+        if not q:
+            return []
+        # prefix match from sorted name
+        prefix = []
+        i = bisect_left(self._sorted, (q, ""))
+        while i < len(self._sorted) and self._sorted[i][0].startswith(q):
+            prefix.append(self._sorted[i][1])
+            i += 1
+        if len(q) < 3:
+            candidates = self.names
+        else:
+            sets = [self._trigram.get(gram, set()) for gram in trigrams(q)]
+            candidates = set.intersection(*sorted(sets, key=len)) if all(sets) else set()
+        seen = set(prefix)
+        other = sorted((name for name in candidates if name not in seen and q in name.lower()), key=len)
+        return sorted(prefix, key=lambda name: (name.lower() != q, len(name))) + other
+
+    async def articles_for(self, query: str) -> list:
+        if self.docs:
+            # serve cached spec now, revalidate in background when stale
+            if time.time() - self.checked >= SPEC_TTL and not self._lock.locked():
+                asyncio.create_task(self.refresh())
+        else:
+            await self.refresh()
+        # article dict swapped last when spec rebuilt, skip name that not rendered yet
+        return [self.articles[name] for name in self.search(query) if name in self.articles]
+
+
+botapi_spec = BotApiSpec()
@@ -0,0 +1,122 @@
+"""
+Resumable broadcast engine.
+Copy a message to all users with concurrent workers limited by token bucket,
+progress is checkpointed to MongoDB after every batch so broadcast can be
+resumed after crash or restart.
+"""
+import asyncio
+import datetime
+import time
+from logging import getLogger
+
+from pyrogram.errors import FloodWait, InputUserDeactivated, PeerIdInvalid, UserIsBlocked
+
+from database.broadcast_db import create_broadcast, get_running_broadcast, save_broadcast_checkpoint, set_broadcast_status
+from database.users_chats_db import db
+from misskaty.core.message_utils import editPesan
+from misskaty.core.ratelimiter_func import TokenBucket
+
+LOGGER = getLogger(__name__)
+
+# Bot can send around 30 message per second to different users
+BROADCAST_RATE = 25
+BROADCAST_WORKERS = 20
+BATCH_SIZE = 500
+# Min interval between progress message edit
+PROGRESS_INTERVAL = 15
+
+
+class Broadcaster:
+    # Current running broadcast, used by cancel command
+    current = None
+    # held from command until broadcast finished, released even when it crash
+    lock = asyncio.Lock()
+
+    def __init__(self, client, job: dict, status_msg=None):
+        self.client = client
+        self.job = job
+        self.status_msg = status_msg
+        self.stats = dict(job["stats"])
+        self.bucket = TokenBucket(BROADCAST_RATE)
+        self.sem = asyncio.Semaphore(BROADCAST_WORKERS)
+        self.cancelled = False
+        self.total = 0
+        self.start_time = time.time()
+        self._last_report = 0
+
+    @classmethod
+    async def new(cls, client, from_chat: int, message_id: int, status_msg=None):
+        job = {"from_chat": from_chat, "message_id": message_id, "created": datetime.datetime.utcnow()}
+        await create_broadcast(job)
+        return cls(client, job, status_msg)
+
+    @classmethod
+    async def resume(cls, client, status_msg=None):
+        job = await get_running_broadcast()
+        return cls(client, job, status_msg) if job else None
+
+    async def _send(self, user_id: int) -> str:
+        async with self.sem:
+            while True:
+                await self.bucket.acquire()
+                try:
+                    await self.client.copy_message(user_id, self.job["from_chat"], self.job["message_id"])
+                    return "success"
+                except FloodWait as e:
+                    LOGGER.warning(f"Broadcast got FloodWait {e.value}s")
+                    self.bucket.pause(e.value)
+                except InputUserDeactivated:
+                    return "deleted"
+                except UserIsBlocked:
+                    return "blocked"
+                except PeerIdInvalid:
+                    return "invalid"
+                except Exception as e:
+                    LOGGER.info(f"Broadcast to {user_id} failed: {e}")
+                    return "failed"
+
+    def progress_text(self, done: bool = False) -> str:
+        time_taken = datetime.timedelta(seconds=int(time.time() - self.start_time))
+        head = f"Broadcast Completed:\nCompleted in {time_taken} seconds." if done else "Broadcast in progress:"
+        return f"{head}\n\nTotal Users {self.total}\nCompleted: {self.stats['done']} / {self.total}\nSuccess: {self.stats['success']}\nBlocked: {self.stats['blocked']}\nDeleted: {self.stats['deleted']}\nFailed: {self.stats['failed']}"
+
+    async def _report(self, force: bool = False):
+        if not self.status_msg or (not force and time.time() - self._last_report < PROGRESS_INTERVAL):
+            return
+        self._last_report = time.time()
+        await editPesan(self.status_msg, self.progress_text(force))
+
+    async def run(self):
+        Broadcaster.current = self
+        try:
+            return await self._run()
+        finally:
+            Broadcaster.current = None
+
+    async def _run(self):
+        self.total = await db.total_users_count()
+        last_id = self.job.get("last_id")
+        while not self.cancelled:
+            batch = [user async for user in db.get_users_after(last_id, BATCH_SIZE)]
+            if not batch:
+                break
+            results = await asyncio.gather(*[self._send(int(user["id"])) for user in batch])
+            remove = []
+            for user, result in zip(batch, results):
+                if result == "invalid":
+                    result = "failed"
+                    remove.append(user["id"])
+                elif result in ("deleted", "blocked"):
+                    remove.append(user["id"])
+                self.stats[result] += 1
+                self.stats["done"] += 1
+            # Remove dead user in one request instead one by one
+            if remove:
+                await db.delete_users(remove)
+                LOGGER.info(f"Removed {len(remove)} blocked/deleted users from database.")
+            last_id = batch[-1]["_id"]
+            await save_broadcast_checkpoint(self.job["_id"], last_id, self.stats)
+            await self._report()
+        await set_broadcast_status(self.job["_id"], "cancelled" if self.cancelled else "done")
+        await self._report(force=True)
+        return self.stats
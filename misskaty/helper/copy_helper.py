@@ -0,0 +1,108 @@
+"""
+Bulk copy/forward engine for /copy and /forward range mode.
+Message id range sent in batch of 100 id per request (copy use forward with
+drop_author), batch of same destination share one token bucket and progress is
+checkpointed to MongoDB so archiving big channel can be resumed.
+"""
+import datetime
+import time
+from logging import getLogger
+
+from pyrogram import raw
+from pyrogram.errors import FloodWait, MessageIdInvalid
+
+from database.copy_job_db import create_copy_job, get_running_copy_job, save_copy_checkpoint, set_copy_status
+from misskaty.core.message_utils import editPesan
+from misskaty.core.ratelimiter_func import TokenBucket
+
+LOGGER = getLogger(__name__)
+
+BATCH_SIZE = 100
+# One batch every 2 second for each destination
+BATCH_RATE = 0.5
+PROGRESS_INTERVAL = 15
+
+
+class BulkCopy:
+    # Running job by user id, used by cancel command
+    running = {}
+    _buckets = {}
+
+    def __init__(self, client, job: dict, status_msg=None):
+        self.client = client
+        self.job = job
+        self.status_msg = status_msg
+        self.stats = dict(job["stats"])
+        self.bucket = BulkCopy._buckets.setdefault(job["dest"], TokenBucket(BATCH_RATE))
+        self.cancelled = False
+        self.start_time = time.time()
+        self._last_report = 0
+
+    @classmethod
+    async def new(cls, client, user_id: int, mode: str, source: int, dest, start: int, end: int, status_msg=None):
+        job = {"user_id": user_id, "mode": mode, "source": source, "dest": dest, "start": start, "end": end, "created": datetime.datetime.utcnow()}
+        await create_copy_job(job)
+        return cls(client, job, status_msg)
+
+    @classmethod
+    async def resume(cls, client, user_id: int, status_msg=None):
+        job = await get_running_copy_job(user_id)
+        return cls(client, job, status_msg) if job else None
+
+    async def _send(self, ids: list) -> int:
+        from_peer = await self.client.resolve_peer(self.job["source"])
+        to_peer = await self.client.resolve_peer(self.job["dest"])
+        while True:
+            await self.bucket.acquire()
+            try:
+                r = await self.client.invoke(
+                    raw.functions.messages.ForwardMessages(
+                        from_peer=from_peer,
+                        id=ids,
+                        random_id=[self.client.rnd_id() for _ in ids],
+                        to_peer=to_peer,
+                        drop_author=self.job["mode"] == "copy",
+                    )
+                )
+                return len([u for u in r.updates if isinstance(u, (raw.types.UpdateNewMessage, raw.types.UpdateNewChannelMessage))])
+            except FloodWait as e:
+                LOGGER.warning(f"Bulk {self.job['mode']} got FloodWait {e.value}s")
+                self.bucket.pause(e.value)
+            except MessageIdInvalid:
+                # whole batch is deleted or service message
+                return 0
+
+    def progress_text(self, done: bool = False) -> str:
+        total = self.job["end"] - self.job["start"] + 1
+        time_taken = datetime.timedelta(seconds=int(time.time() - self.start_time))
+        head = f"Bulk {self.job['mode']} completed in {time_taken}." if done else f"Bulk {self.job['mode']} in progress..."
+        return f"{head}\n\nRange: <code>{self.job['start']}</code> - <code>{self.job['end']}</code>\nProcessed: {self.stats['done']} / {total}\nSent: {self.stats['sent']}\nSkipped: {self.stats['skipped']}"
+
+    async def _report(self, force: bool = False):
+        if not self.status_msg or (not force and time.time() - self._last_report < PROGRESS_INTERVAL):
+            return
+        self._last_report = time.time()
+        await editPesan(self.status_msg, self.progress_text(force))
+
+    async def run(self):
+        BulkCopy.running[self.job["user_id"]] = self
+        try:
+            return await self._run()
+        finally:
+            BulkCopy.running.pop(self.job["user_id"], None)
+
+    async def _run(self):
+        # Batch sent one by one to keep message order in destination
+        next_id = self.job["next_id"]
+        while next_id <= self.job["end"] and not self.cancelled:
+            ids = list(range(next_id, min(next_id + BATCH_SIZE, self.job["end"] + 1)))
+            sent = await self._send(ids)
+            self.stats["done"] += len(ids)
+            self.stats["sent"] += sent
+            self.stats["skipped"] += len(ids) - sent
+            next_id = ids[-1] + 1
+            await save_copy_checkpoint(self.job["_id"], next_id, self.stats)
+            await self._report()
+        await set_copy_status(self.job["_id"], "cancelled" if self.cancelled else "done")
+        await self._report(force=True)
+        return self.stats
@@ -0,0 +1,225 @@
+"""
+Native asyncio download manager.
+Split file into HTTP Range segments, download them in parallel on the
+running loop and keep a small state file so partial download can be resumed.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from logging import getLogger
+from typing import Callable, List, Optional
+from urllib.parse import unquote, urlparse
+
+from aiohttp import ClientTimeout
+
+from misskaty.helper.http import session
+from misskaty.helper.scratch import scratch
+
+__all__ = ["DownloadError", "Downloader", "download_file", "filename_from_url"]
+
+LOGGER = getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+# Flush state file every 8MB downloaded
+STATE_FLUSH_SIZE = 8 * 1024 * 1024
+# Dont split small file into segment
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+# Global limit of running download across all job
+MAX_CONCURRENT_DOWNLOAD = 4
+
+_download_sem = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOAD)
+
+
+class DownloadError(Exception):
+    pass
+
+
+class RangeIgnored(Exception):
+    """Server answered segment request without the requested range."""
+
+
+class Downloader:
+    """
+    Ex:
+        dl = Downloader(url, "downloads/file.mkv", segments=4, checksum="sha256:abc..")
+        path = await dl.start(progress=reporter.update)
+    """
+
+    def __init__(
+        self,
+        url: str,
+        path: Optional[str] = None,
+        segments: int = 4,
+        checksum: Optional[str] = None,
+        headers: Optional[dict] = None,
+    ):
+        self.url = url
+        self.path = path or os.path.join("downloads", filename_from_url(url))
+        self.state_path = f"{self.path}.state"
+        self.segments = max(1, segments)
+        self.checksum = checksum
+        self.headers = headers or {}
+        self.total = 0
+        self.downloaded = 0
+        self.start_time = None
+        self._parts: List[list] = []
+        self._flushed = 0
+
+    @property
+    def speed(self) -> float:
+        if not self.start_time:
+            return 0
+        return self.downloaded / max(time.time() - self.start_time, 0.001)
+
+    async def _probe(self):
+        async with session.get(
+            self.url,
+            headers={**self.headers, "Range": "bytes=0-0"},
+            timeout=ClientTimeout(total=40),
+        ) as resp:
+            if resp.status == 206:
+                content_range = resp.headers.get("Content-Range", "")
+                size = content_range.rsplit("/", 1)[-1]
+                return int(size) if size.isdigit() else 0, True
+            if resp.status >= 400:
+                raise DownloadError(f"HTTP {resp.status} when requesting {self.url}")
+            return int(resp.headers.get("Content-Length", 0)), False
+
+    def _load_state(self) -> bool:
+        if not os.path.exists(self.state_path) or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if state.get("url") != self.url or state.get("total") != self.total:
+            return False
+        self._parts = state["parts"]
+        return True
+
+    def _save_state(self):
+        with open(self.state_path, "w") as f:
+            json.dump({"url": self.url, "total": self.total, "parts": self._parts}, f)
+        self._flushed = self.downloaded
+
+    def _plan(self, ranged: bool):
+        if not ranged or not self.total:
+            # [start, end, written], end -1 mean until EOF
+            self._parts = [[0, -1, 0]]
+            return
+        count = min(self.segments, max(1, self.total // MIN_SEGMENT_SIZE))
+        step = self.total // count
+        self._parts = []
+        for i in range(count):
+            start = i * step
+            end = self.total - 1 if i == count - 1 else start + step - 1
+            self._parts.append([start, end, 0])
+
+    async def _fetch_part(self, part: list, fp, progress: Optional[Callable]):
+        start, end, written = part
+        if end != -1 and start + written > end:
+            return
+        headers = dict(self.headers)
+        if end != -1:
+            headers["Range"] = f"bytes={start + written}-{end}"
+        async with session.get(self.url, headers=headers, timeout=ClientTimeout(total=None, sock_read=60)) as resp:
+            if resp.status >= 400:
+                raise DownloadError(f"HTTP {resp.status} when requesting {self.url}")
+            if end != -1 and (resp.status != 206 or not resp.headers.get("Content-Range", "").startswith(f"bytes {start + written}-")):
+                # full body written at segment offset would corrupt the file
+                raise RangeIgnored
+            if end == -1 and written:
+                # Server not support range, start over
+                part[2] = written = 0
+                fp.truncate(0)
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                fp.seek(start + part[2])
+                fp.write(chunk)
+                part[2] += len(chunk)
+                self.downloaded += len(chunk)
+                if self.downloaded - self._flushed >= STATE_FLUSH_SIZE:
+                    fp.flush()
+                    self._save_state()
+                if progress:
+                    await progress(self.downloaded, self.total)
+
+    async def _fetch_all(self, fp, progress: Optional[Callable]):
+        tasks = [asyncio.ensure_future(self._fetch_part(part, fp, progress)) for part in self._parts]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # stop other segment before file closed or replanned
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    def _verify(self):
+        if not self.checksum:
+            return
+        algo, _, digest = self.checksum.partition(":")
+        if not digest:
+            algo, digest = "sha256", algo
+        hasher = hashlib.new(algo.lower())
+        with open(self.path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(block)
+        if hasher.hexdigest().lower() != digest.lower():
+            raise DownloadError(f"Checksum mismatch for {os.path.basename(self.path)}")
+
+    async def start(self, progress: Optional[Callable] = None) -> str:
+        async with _download_sem:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.total, ranged = await self._probe()
+            # scratch janitor must not evict file being downloaded
+            async with scratch.hold(self.path, self.state_path, reserve=self.total):
+                return await self._download(ranged, progress)
+
+    async def _download(self, ranged: bool, progress: Optional[Callable]) -> str:
+        resumed = ranged and self._load_state()
+        if not resumed:
+            self._plan(ranged)
+            with open(self.path, "wb") as f:
+                if self.total and ranged:
+                    f.truncate(self.total)
+        self.downloaded = sum(part[2] for part in self._parts)
+        self._flushed = self.downloaded
+        self.start_time = time.time()
+        if resumed:
+            LOGGER.info(f"Resuming {self.path} from {self.downloaded} bytes")
+        with open(self.path, "r+b") as fp:
+            try:
+                try:
+                    await self._fetch_all(fp, progress)
+                except RangeIgnored:
+                    LOGGER.warning(f"{self.url} ignored Range request, downloading as single stream")
+                    ranged = False
+                    if os.path.exists(self.state_path):
+                        os.remove(self.state_path)
+                    self._plan(ranged)
+                    fp.truncate(0)
+                    self.downloaded = self._flushed = 0
+                    await self._fetch_all(fp, progress)
+            except BaseException:
+                fp.flush()
+                if ranged:
+                    self._save_state()
+                raise
+        if progress:
+            await progress(self.downloaded, self.total or self.downloaded)
+        await asyncio.get_running_loop().run_in_executor(None, self._verify)
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+        return self.path
+
+
+def filename_from_url(url: str) -> str:
+    name = unquote(os.path.basename(urlparse(url).path))
+    return name or f"file_{int(time.time())}"
+
+
+async def download_file(url: str, path: Optional[str] = None, progress: Optional[Callable] = None, **kwargs) -> str:
+    return await Downloader(url, path, **kwargs).start(progress=progress)
@@ -5,6 +5,7 @@ import time
 from pyrogram.errors import FloodWait
 from pyrogram.types import InputMediaPhoto
 
+from misskaty.core.tracing import span
 from misskaty.plugins.dev import shell_exec
 
 
@@ -12,8 +13,8 @@ def hhmmss(seconds):
     return time.strftime("%H:%M:%S", time.gmtime(seconds))
 
 
-async def take_ss(video_file):
-    out_put_file_name = f"genss{str(time.time())}.png"
+async def take_ss(video_file, output_directory="."):
+    out_put_file_name = os.path.join(output_directory, f"genss{str(time.time())}.png")
     cmd = f"ssmedia '{video_file}' -t -w 1340 -g 4x4 --ffmpeg-name mediaextract --template misskaty/helper/ssgen_template.html --quality 100 --end-delay-percent 20 --metadata-font-size 30 --timestamp-font-size 20 -o {out_put_file_name}"
     await shell_exec(cmd)
     return out_put_file_name if os.path.lexists(out_put_file_name) else None
@@ -33,9 +34,9 @@ async def ssgen_link(video, output_directory, ttl):
         "image2",
         out_put_file_name,
     ]
-    process = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
-
-    stdout, stderr = await process.communicate()
+    with span("subprocess", cmd=cmd[0]):
+        process = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stdout, stderr = await process.communicate()
     stderr.decode().strip()
     stdout.decode().strip()
     return out_put_file_name if os.path.isfile(out_put_file_name) else None
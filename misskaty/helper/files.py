@@ -17,40 +17,27 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-import math
 import os
 
-from PIL import Image
 from pyrogram import Client, raw
 from pyrogram.file_id import FileId
 
+from misskaty.helper.image_helper import fit_sticker, open_image, run_image
+
 STICKER_DIMENSIONS = (512, 512)
 
 
-async def resize_file_to_sticker_size(file_path: str) -> str:
-    im = Image.open(file_path)
-    if (im.width, im.height) < STICKER_DIMENSIONS:
-        size1 = im.width
-        size2 = im.height
-        if im.width > im.height:
-            scale = STICKER_DIMENSIONS[0] / size1
-            size1new = STICKER_DIMENSIONS[0]
-            size2new = size2 * scale
-        else:
-            scale = STICKER_DIMENSIONS[1] / size2
-            size1new = size1 * scale
-            size2new = STICKER_DIMENSIONS[1]
-        size1new = math.floor(size1new)
-        size2new = math.floor(size2new)
-        sizenew = (size1new, size2new)
-        im = im.resize(sizenew)
-    else:
-        im.thumbnail(STICKER_DIMENSIONS)
-    try:
+def _resize_file_to_sticker_size(file_path: str) -> str:
+    im = fit_sticker(open_image(file_path), max(STICKER_DIMENSIONS))
+    png_path = f"{os.path.splitext(file_path)[0]}.png"
+    im.save(png_path, "PNG")
+    if png_path != file_path:
         os.remove(file_path)
-        return f"{file_path}.png"
-    finally:
-        im.save(file_path)
+    return png_path
+
+
+async def resize_file_to_sticker_size(file_path: str) -> str:
+    return await run_image(_resize_file_to_sticker_size, file_path)
 
 
 async def upload_document(client: Client, file_path: str, chat_id: int) -> raw.base.InputDocument:
@@ -0,0 +1,207 @@
+"""
+Auto forwarder pipeline.
+Every destination has own queue and worker so FloodWait in one chat doesn't block
+or duplicate message in the other, file already forwarded is skipped by
+file_unique_id, album copied in one request and last forwarded message id is saved
+so message posted while bot offline can be backfilled.
+"""
+import asyncio
+from logging import getLogger
+from typing import Awaitable, Callable, List, Optional
+
+from cachetools import LRUCache
+from pyrogram.errors import FloodWait
+from pyrogram.types import Message
+
+from database.forwarder_db import filter_new_files, get_forward_offset, mark_forwarded, save_forward_offset
+
+LOGGER = getLogger(__name__)
+
+# Wait until all item of album arrived before copy it
+ALBUM_WAIT = 2
+BACKFILL_LIMIT = 1000
+
+
+def unique_ids(msgs: List[Message]) -> List[str]:
+    ids = []
+    for m in msgs:
+        media = getattr(m, m.media.value, None) if m.media else None
+        if getattr(media, "file_unique_id", None):
+            ids.append(media.file_unique_id)
+    return ids
+
+
+class ForwardJob:
+    def __init__(self, chat_id: int, message_ids: List[int], album: bool, destinations: int, file_ids: List[str], key: int):
+        self.chat_id = chat_id
+        self.message_ids = message_ids
+        self.album = album
+        self.remaining = destinations
+        self.sent = 0
+        # file marked forwarded after copied
+        self.file_ids = file_ids
+        # message id registered in offset tracker
+        self.key = key
+
+
+class ForwardPipeline:
+    """
+    Ex:
+        forwarder = ForwardPipeline(user, [-100123], [-100456], accept=can_forward)
+        await forwarder.submit(message)
+    """
+
+    instances = []
+
+    def __init__(self, client, sources: List[int], destinations: List[int], accept: Optional[Callable[[Message], Awaitable[bool]]] = None):
+        self.client = client
+        self.sources = sources
+        self.destinations = destinations
+        self.accept = accept
+        self.queues = {dest: asyncio.Queue() for dest in destinations}
+        self.seen = LRUCache(maxsize=5000)
+        self.forwarded = 0
+        self.skipped = 0
+        self._workers = []
+        self._lock = asyncio.Lock()
+        # per chat message id submitted but not finished, offset never pass them
+        self._inflight = {}
+        self._finished = {}
+        ForwardPipeline.instances.append(self)
+
+    def _start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker(dest)) for dest in self.destinations]
+
+    async def _new_files(self, msgs: List[Message]) -> Optional[List[str]]:
+        """file_unique_id not forwarded yet, None when every file is duplicate."""
+        ids = unique_ids(msgs)
+        if not ids:
+            return []
+        async with self._lock:
+            new = [i for i in ids if i not in self.seen]
+            if new:
+                new = await filter_new_files(new)
+            for i in ids:
+                self.seen[i] = True
+        return new or None
+
+    async def _done(self, chat_id: int, key: int, last_id: int):
+        """Save offset up to the lowest message still queued, so crash never skip it."""
+        inflight = self._inflight.get(chat_id, set())
+        inflight.discard(key)
+        self._finished[chat_id] = max(self._finished.get(chat_id, 0), last_id)
+        offset = min(min(inflight) - 1, self._finished[chat_id]) if inflight else self._finished[chat_id]
+        if offset > 0:
+            await save_forward_offset(chat_id, offset)
+
+    async def submit(self, msg: Message, wait: bool = True):
+        self._start()
+        if msg.media_group_id:
+            key = f"album:{msg.chat.id}:{msg.media_group_id}"
+            if key in self.seen:
+                return
+            self.seen[key] = True
+            self._inflight.setdefault(msg.chat.id, set()).add(msg.id)
+            if wait:
+                # don't hold handler while waiting the rest of album
+                asyncio.create_task(self._submit_album(msg, wait))
+                return
+            return await self._submit_album(msg, wait)
+        self._inflight.setdefault(msg.chat.id, set()).add(msg.id)
+        await self._enqueue(msg.chat.id, [msg], album=False, key=msg.id)
+
+    async def _submit_album(self, msg: Message, wait: bool):
+        if wait:
+            await asyncio.sleep(ALBUM_WAIT)
+        try:
+            msgs = await self.client.get_media_group(msg.chat.id, msg.id)
+        except Exception as err:
+            LOGGER.warning(f"Failed to get media group {msg.media_group_id}: {err}")
+            msgs = [msg]
+        await self._enqueue(msg.chat.id, msgs, album=True, key=msg.id)
+
+    async def _enqueue(self, chat_id: int, msgs: List[Message], album: bool, key: int):
+        last_id = max(m.id for m in msgs)
+        try:
+            accepted = [m for m in msgs if not self.accept or await self.accept(m)]
+            new = await self._new_files(accepted) if accepted else None
+        except BaseException:
+            self._inflight.get(chat_id, set()).discard(key)
+            raise
+        if new is None:
+            self.skipped += 1
+            return await self._done(chat_id, key, last_id)
+        # filtered album is copied one by one
+        job = ForwardJob(chat_id, [m.id for m in accepted], album and len(accepted) == len(msgs) > 1, len(self.destinations), new, key)
+        for queue in self.queues.values():
+            queue.put_nowait(job)
+
+    async def _copy(self, dest: int, job: ForwardJob):
+        sent = 0
+        while True:
+            try:
+                if job.album:
+                    await self.client.copy_media_group(dest, job.chat_id, job.message_ids[0])
+                else:
+                    for message_id in job.message_ids[sent:]:
+                        await self.client.copy_message(dest, job.chat_id, message_id)
+                        sent += 1
+                return
+            except FloodWait as e:
+                # Only this destination wait, item already sent is not repeated
+                LOGGER.warning(f"#FloodWait: Stopped Forwarder to {dest} for {e.value}s!")
+                await asyncio.sleep(e.value)
+
+    async def _worker(self, dest: int):
+        queue = self.queues[dest]
+        while True:
+            job = await queue.get()
+            try:
+                await self._copy(dest, job)
+                job.sent += 1
+            except Exception as err:
+                LOGGER.warning(f"#ERROR: {err}\n\nUnable to Forward Message to {dest}, reason: <code>{err}</code>")
+            finally:
+                queue.task_done()
+                job.remaining -= 1
+                if job.remaining == 0:
+                    await self._finish(job)
+
+    async def _finish(self, job: ForwardJob):
+        try:
+            if job.sent:
+                self.forwarded += 1
+                await mark_forwarded(job.file_ids)
+            else:
+                # nothing copied, same file can be forwarded again later
+                for i in job.file_ids:
+                    self.seen.pop(i, None)
+            await self._done(job.chat_id, job.key, max(job.message_ids))
+        except Exception as err:
+            LOGGER.error(f"Failed to save forwarder state of {job.chat_id}: {err}")
+
+    async def backfill(self):
+        """Forward message that posted in source chat while bot offline."""
+        for source in self.sources:
+            try:
+                last_id = await get_forward_offset(source)
+                if not last_id:
+                    # first run, start from new message
+                    continue
+                missed = []
+                async for m in self.client.get_chat_history(source, limit=BACKFILL_LIMIT):
+                    if m.id <= last_id:
+                        break
+                    if m.text or m.media:
+                        missed.append(m)
+                if missed:
+                    LOGGER.info(f"Backfilling {len(missed)} message from {source}")
+                for m in reversed(missed):
+                    await self.submit(m, wait=False)
+            except Exception as err:
+                LOGGER.error(f"Failed to backfill forwarder from {source}: {err}")
+
+    @classmethod
+    async def backfill_all(cls):
+        await asyncio.gather(*[pipeline.backfill() for pipeline in cls.instances])
@@ -1,16 +1,63 @@
+import time
 from asyncio import gather
 
 import httpx
-from aiohttp import ClientSession
+from aiohttp import ClientSession, TraceConfig
+
+from misskaty.core.metrics import metrics
+from misskaty.core.tracing import record
+from misskaty.helper.http_fixtures import FixtureStore, RecordReplaySession, RecordReplayTransport
+from misskaty.vars import HTTP_FIXTURES, HTTP_FIXTURES_DIR
+
+
+class TimedTransport(httpx.AsyncHTTPTransport):
+    async def handle_async_request(self, request):
+        start = time.perf_counter()
+        error = True
+        try:
+            response = await super().handle_async_request(request)
+            error = response.status_code >= 500
+            return response
+        finally:
+            took = time.perf_counter() - start
+            metrics.observe("http", ("httpx", request.method, request.url.host), took, error)
+            record("http", took, method=request.method, host=request.url.host)
+
+
+async def _on_request_start(_, ctx, params):
+    ctx.start = time.perf_counter()
+
+
+async def _on_request_end(_, ctx, params):
+    took = time.perf_counter() - ctx.start
+    metrics.observe("http", ("aiohttp", params.method, params.url.host), took, params.response.status >= 500)
+    record("http", took, method=params.method, host=params.url.host)
+
+
+async def _on_request_exception(_, ctx, params):
+    took = time.perf_counter() - ctx.start
+    metrics.observe("http", ("aiohttp", params.method, params.url.host), took, True)
+    record("http", took, method=params.method, host=params.url.host, error=True)
+
+
+trace_config = TraceConfig()
+trace_config.on_request_start.append(_on_request_start)
+trace_config.on_request_end.append(_on_request_end)
+trace_config.on_request_exception.append(_on_request_exception)
 
 # Aiohttp Async Client
-session = ClientSession()
+session = ClientSession(trace_configs=[trace_config])
+
+transport = TimedTransport(http2=True, verify=False)
+if HTTP_FIXTURES:
+    # record/replay response on disk, for offline test and benchmark
+    transport = RecordReplayTransport(transport, FixtureStore(HTTP_FIXTURES_DIR), HTTP_FIXTURES)
+    session = RecordReplaySession(session, FixtureStore(HTTP_FIXTURES_DIR), HTTP_FIXTURES)
 
 # HTTPx Async Client
 http = httpx.AsyncClient(
-    http2=True,
-    verify=False,
     timeout=httpx.Timeout(40),
+    transport=transport,
 )
 
 
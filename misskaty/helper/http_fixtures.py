@@ -0,0 +1,264 @@
+"""
+Record/replay for shared httpx client and aiohttp session.
+With HTTP_FIXTURES=record every response saved to disk keyed by method, url and
+body, replay serve only saved response (missing one raise connection error) and
+auto replay when saved or record otherwise. Used to test and benchmark scraper
+without network. Request made with cfscrape or requests (subscene) are not
+covered and still hit the network.
+"""
+import base64
+import hashlib
+import json
+import os
+from logging import getLogger
+from urllib.parse import urlencode, urlparse
+
+import httpx
+from aiohttp import ClientConnectionError, ClientResponseError, ContentTypeError
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+LOGGER = getLogger(__name__)
+
+MODES = ("record", "replay", "auto")
+# body saved already decoded, these header no longer true for it
+DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "set-cookie"}
+
+
+class FixtureStore:
+    def __init__(self, path: str):
+        self.path = path
+
+    @staticmethod
+    def key(method: str, url: str, body: bytes = b"") -> str:
+        return hashlib.sha1(f"{method} {url}\n".encode() + body).hexdigest()[:20]
+
+    def file(self, method: str, url: str, body: bytes = b"") -> str:
+        return os.path.join(self.path, urlparse(url).hostname or "local", f"{self.key(method, url, body)}.json")
+
+    @staticmethod
+    def request_body(request: httpx.Request) -> bytes:
+        try:
+            return request.content
+        except httpx.RequestNotRead:
+            # streamed upload, key by url only
+            return b""
+
+    def load(self, method: str, url: str, body: bytes = b""):
+        try:
+            with open(self.file(method, url, body)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, method: str, url: str, body: bytes, status: int, headers, content: bytes):
+        try:
+            text, encoding = content.decode(), "text"
+        except UnicodeDecodeError:
+            text, encoding = base64.b64encode(content).decode(), "base64"
+        fixture = {
+            "method": method,
+            "url": url,
+            "status": status,
+            "headers": [[k, v] for k, v in headers if k.lower() not in DROP_HEADERS],
+            "encoding": encoding,
+            "body": text,
+        }
+        path = self.file(method, url, body)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=1)
+
+
+def fixture_content(fixture: dict) -> bytes:
+    return base64.b64decode(fixture["body"]) if fixture["encoding"] == "base64" else fixture["body"].encode()
+
+
+def fixture_response(fixture: dict, request: httpx.Request) -> httpx.Response:
+    return httpx.Response(fixture["status"], headers=fixture["headers"], content=fixture_content(fixture), request=request)
+
+
+class RecordReplayTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, store: FixtureStore, mode: str = "replay"):
+        if mode not in MODES:
+            raise ValueError(f"HTTP fixture mode must be one of {MODES}")
+        self.transport = transport
+        self.store = store
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = self.store.request_body(request)
+        if self.mode != "record":
+            if fixture := self.store.load(request.method, str(request.url), body):
+                self.hits += 1
+                return fixture_response(fixture, request)
+            self.misses += 1
+            if self.mode == "replay":
+                raise httpx.ConnectError(f"No fixture for {request.method} {request.url}", request=request)
+        response = await self.transport.handle_async_request(request)
+        try:
+            # body is decompressed when read through Response
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        self.store.save(request.method, str(request.url), body, response.status_code, response.headers.items(), content)
+        LOGGER.info(f"Recorded fixture {request.method} {request.url}")
+        return httpx.Response(
+            response.status_code,
+            headers=[(k, v) for k, v in response.headers.items() if k.lower() not in DROP_HEADERS],
+            content=content,
+            request=request,
+        )
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class FixtureContent:
+    """Enough of aiohttp StreamReader for code reading resp.content."""
+
+    def __init__(self, content: bytes):
+        self._content = content
+        self._pos = 0
+
+    async def read(self, n: int = -1) -> bytes:
+        end = len(self._content) if n < 0 else self._pos + n
+        data, self._pos = self._content[self._pos : end], min(end, len(self._content))
+        return data
+
+    async def iter_chunked(self, n: int):
+        while chunk := await self.read(n):
+            yield chunk
+
+    async def iter_any(self):
+        if chunk := await self.read():
+            yield chunk
+
+
+class FixtureResponse:
+    """Saved response served in place of aiohttp ClientResponse."""
+
+    def __init__(self, fixture: dict, method: str, url: URL):
+        self.method = method
+        self.url = url
+        self.status = fixture["status"]
+        self.reason = ""
+        self.ok = self.status < 400
+        self.headers = CIMultiDictProxy(CIMultiDict(fixture["headers"]))
+        self.content_type = self.headers.get("Content-Type", "application/octet-stream").split(";")[0].strip()
+        self._body = fixture_content(fixture)
+        self.content = FixtureContent(self._body)
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: str = None, errors: str = "strict") -> str:
+        return self._body.decode(encoding or "utf-8", errors)
+
+    async def json(self, *, encoding: str = None, loads=json.loads, content_type: str = "application/json"):
+        if content_type and content_type not in self.content_type:
+            raise ContentTypeError(None, (), message=f"Attempt to decode JSON with unexpected mimetype: {self.content_type}")
+        return loads(await self.text(encoding))
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise ClientResponseError(None, (), status=self.status, message=self.reason)
+
+    def release(self):
+        pass
+
+    def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class _RequestContext:
+    """Awaitable and async context manager like aiohttp session.get() result."""
+
+    def __init__(self, coro):
+        self._coro = coro
+        self._resp = None
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self):
+        self._resp = await self._coro
+        return self._resp
+
+    async def __aexit__(self, *args):
+        self._resp.release()
+
+
+def _aiohttp_body(kwargs: dict) -> bytes:
+    if kwargs.get("json") is not None:
+        return json.dumps(kwargs["json"], sort_keys=True).encode()
+    data = kwargs.get("data")
+    if isinstance(data, dict):
+        return urlencode(sorted(data.items())).encode()
+    if isinstance(data, str):
+        return data.encode()
+    return data if isinstance(data, bytes) else b""
+
+
+class RecordReplaySession:
+    """
+    Wrap aiohttp ClientSession with same mode as RecordReplayTransport,
+    everything except request forwarded to the real session.
+    """
+
+    def __init__(self, session, store: FixtureStore, mode: str = "replay"):
+        if mode not in MODES:
+            raise ValueError(f"HTTP fixture mode must be one of {MODES}")
+        self.session = session
+        self.store = store
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+
+    async def _request(self, method: str, url, **kwargs):
+        url = URL(str(url))
+        if params := kwargs.pop("params", None):
+            url = url.extend_query(params)
+        body = _aiohttp_body(kwargs)
+        if self.mode != "record":
+            if fixture := self.store.load(method, str(url), body):
+                self.hits += 1
+                return FixtureResponse(fixture, method, url)
+            self.misses += 1
+            if self.mode == "replay":
+                raise ClientConnectionError(f"No fixture for {method} {url}")
+        resp = await self.session.request(method, url, **kwargs)
+        # read once, aiohttp keep the body so caller can read it again
+        content = await resp.read()
+        self.store.save(method, str(url), body, resp.status, resp.headers.items(), content)
+        LOGGER.info(f"Recorded fixture {method} {url}")
+        return resp
+
+    def request(self, method: str, url, **kwargs):
+        return _RequestContext(self._request(method.upper(), url, **kwargs))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self.session, name)
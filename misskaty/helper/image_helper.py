@@ -0,0 +1,101 @@
+"""
+Pillow image processing service.
+All decode/resize/encode work run in a dedicated thread pool so it doesn't block
+event loop, assets and fonts only loaded once and every function work on
+in-memory BytesIO instead of temp files.
+"""
+import asyncio
+import math
+import os
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from io import BytesIO
+from typing import Tuple, Union
+
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+# Pillow release the GIL while decode/resize/encode, so threads is enough here
+image_executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="pillow")
+
+RESAMPLE = Image.LANCZOS
+ImageSource = Union[str, bytes, BytesIO]
+
+
+async def run_image(func, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(image_executor, partial(func, *args, **kwargs))
+
+
+@lru_cache(maxsize=32)
+def get_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=8)
+def _load_asset(path: str, size: Tuple[int, int] = None) -> Image.Image:
+    im = Image.open(path)
+    im.load()
+    return im.resize(size, RESAMPLE) if size else im
+
+
+def get_asset(path: str, size: Tuple[int, int] = None) -> Image.Image:
+    # Return copy because cached asset must not be modified
+    return _load_asset(path, size).copy()
+
+
+def open_image(src: ImageSource) -> Image.Image:
+    if isinstance(src, bytes):
+        src = BytesIO(src)
+    elif isinstance(src, BytesIO):
+        src.seek(0)
+    im = Image.open(src)
+    im.load()
+    return im
+
+
+def save_image(im: Image.Image, name: str, fmt: str = None, **kwargs) -> BytesIO:
+    out = BytesIO()
+    out.name = name
+    im.save(out, fmt or name.rsplit(".", 1)[-1].upper().replace("JPG", "JPEG"), **kwargs)
+    out.seek(0)
+    return out
+
+
+def fit_sticker(im: Image.Image, maxsize: int = 512) -> Image.Image:
+    """Scale image so the longest side is exactly 512px as required by sticker."""
+    scale = maxsize / max(im.width, im.height)
+    return im.resize((max(1, math.floor(im.width * scale)), max(1, math.floor(im.height * scale))), RESAMPLE)
+
+
+def sticker_image(src: ImageSource, name: str = "sticker.png") -> BytesIO:
+    return save_image(fit_sticker(open_image(src)), name)
+
+
+def convert_image(src: ImageSource, name: str, mode: str = "RGB") -> BytesIO:
+    return save_image(open_image(src).convert(mode), name)
+
+
+def circle(pfp: Image.Image, size=(215, 215)) -> Image.Image:
+    pfp = pfp.resize(size, RESAMPLE).convert("RGBA")
+    bigsize = (pfp.size[0] * 3, pfp.size[1] * 3)
+    mask = Image.new("L", bigsize, 0)
+    draw = ImageDraw.Draw(mask)
+    draw.ellipse((0, 0) + bigsize, fill=255)
+    mask = mask.resize(pfp.size, RESAMPLE)
+    mask = ImageChops.darker(mask, pfp.split()[-1])
+    pfp.putalpha(mask)
+    return pfp
+
+
+def draw_multiple_line_text(image, text, font, text_start_height):
+    """
+    From unutbu on [python PIL draw multiline text on image](https://stackoverflow.com/a/7698300/395857)
+    """
+    draw = ImageDraw.Draw(image)
+    image_width, image_height = image.size
+    y_text = text_start_height
+    lines = textwrap.wrap(text, width=50)
+    for line in lines:
+        line_width, line_height = font.getsize(line)
+        draw.text(((image_width - line_width) / 2, y_text), line, font=font, fill="black")
+        y_text += line_height
@@ -0,0 +1,97 @@
+"""
+IMDb title detail fetcher with cache.
+Title page parsed in executor and cached per tt-id, JustWatch and translation
+for each locale gathered together and the final record cached per tt-id and
+locale so popular title only need one cache read.
+"""
+import asyncio
+import json
+import re
+from logging import getLogger
+
+from bs4 import BeautifulSoup
+from cachetools import TTLCache
+
+from misskaty.helper.http import http
+from misskaty.helper.tools import search_jw
+from misskaty.helper.translator import translator
+
+LOGGER = getLogger(__name__)
+
+IMDB_TTL = 6 * 3600
+HEADERS = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_9_5) AppleWebKit/600.1.17 (KHTML, like Gecko) Version/7.1 Safari/537.85.10"}
+LINK_ITEM = "ipc-metadata-list-item__list-content-item ipc-metadata-list-item__list-content-item--link"
+
+imdb_cache = TTLCache(maxsize=500, ttl=IMDB_TTL)
+_pending = {}
+
+
+def parse_title(html: str) -> dict:
+    sop = BeautifulSoup(html, "lxml")
+    ld = json.loads(sop.find("script", attrs={"type": "application/ld+json"}).contents[0])
+    year = re.findall(r"\d{4}\W\d{4}|\d{4}-?", sop.title.text)
+    rec = {
+        "ld": ld,
+        "year": year[0] if year else "N/A",
+        "description": ld.get("description"),
+        "duration": None,
+        "release": None,
+        "countries": [],
+        "languages": [],
+        "awards": None,
+    }
+    if durasi := sop.select('li[data-testid="title-techspec_runtime"]'):
+        rec["duration"] = durasi[0].find(class_="ipc-metadata-list-item__content-container").text
+    if release := sop.select('li[data-testid="title-details-releasedate"]'):
+        rilis = release[0].find(class_=LINK_ITEM)
+        rec["release"] = (rilis.text, rilis["href"])
+    if negara := sop.select('li[data-testid="title-details-origin"]'):
+        rec["countries"] = [country.text for country in negara[0].findAll(class_=LINK_ITEM)]
+    if bahasa := sop.select('li[data-testid="title-details-languages"]'):
+        rec["languages"] = [lang.text for lang in bahasa[0].findAll(class_=LINK_ITEM)]
+    if award := sop.select('li[data-testid="award_information"]'):
+        rec["awards"] = award[0].find(class_="ipc-metadata-list-item__list-content-item").text
+    return rec
+
+
+async def _fetch_page(movie: str) -> dict:
+    resp = await http.get(f"https://www.imdb.com/title/tt{movie}/", headers=HEADERS)
+    return await asyncio.get_running_loop().run_in_executor(None, parse_title, resp.text)
+
+
+async def _cached(key, func, *args):
+    if key in imdb_cache:
+        return imdb_cache[key]
+    # same title requested by many user at once only fetched once
+    if key not in _pending:
+        _pending[key] = asyncio.ensure_future(func(*args))
+    try:
+        result = await asyncio.shield(_pending[key])
+    finally:
+        _pending.pop(key, None)
+    imdb_cache[key] = result
+    return result
+
+
+async def _build_title(movie: str, locale: str, lang: str) -> dict:
+    page = await _cached(("page", movie), _fetch_page, movie)
+    fields = ("duration", "description", "awards")
+    jobs = [search_jw(page["ld"].get("name"), locale)]
+    if lang:
+        jobs.append(translator.translate_many([page[field] for field in fields], lang))
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+    rec = dict(page, ott=results[0] if isinstance(results[0], str) else "")
+    if lang:
+        if isinstance(results[1], Exception):
+            LOGGER.warning(f"Failed to translate IMDb detail: {results[1]}")
+        else:
+            rec.update(zip(fields, results[1]))
+    return rec
+
+
+async def get_imdb_title(movie: str, locale: str = "US", lang: str = None) -> dict:
+    """
+    Get parsed IMDb title detail, locale for JustWatch and lang to translate
+    duration, plot and awards (None mean keep original english).
+    """
+    return await _cached((movie, locale, lang), _build_title, movie, locale, lang)
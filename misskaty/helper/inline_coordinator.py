@@ -0,0 +1,133 @@
+"""
+Inline query coordinator.
+Telegram send inline query for every keystroke, so query from same user is
+debounced and newer query cancel the old one that still running. Answered
+results is cached per normalized query for its cache_time and served page by
+page with next_offset. Dispatcher only see run() return at once, so latency
+of the real work recorded here as handler metric.
+"""
+import asyncio
+import time
+from logging import getLogger
+
+from cachetools import LRUCache
+from pyrogram import ContinuePropagation, StopPropagation
+from pyrogram.types import InlineQuery
+
+from misskaty.core.metrics import metrics
+
+LOGGER = getLogger(__name__)
+
+DEBOUNCE = 0.4
+# Telegram accept max 50 results per answer
+PAGE_SIZE = 50
+# cache_time default of InlineQuery.answer
+DEFAULT_CACHE_TIME = 300
+
+
+def normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class InlineCoordinator:
+    """
+    Ex:
+        @app.on_inline_query()
+        async def inline_menu(client, inline_query):
+            await inline_coordinator.run(client, inline_query, handler)
+
+        # inside handler
+        await inline_coordinator.answer(inline_query, results, personal=True)
+    """
+
+    def __init__(self, debounce: float = DEBOUNCE, page_size: int = PAGE_SIZE):
+        self.debounce = debounce
+        self.page_size = page_size
+        self.cache = LRUCache(maxsize=1000)
+        self.tasks = {}
+        self.superseded = 0
+        self.cache_hits = 0
+
+    @staticmethod
+    def _key(inline_query: InlineQuery, personal: bool):
+        query = normalize(inline_query.query)
+        return (query, inline_query.from_user.id) if personal else (query,)
+
+    async def _answer_page(self, inline_query: InlineQuery, results: list, kwargs: dict):
+        offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+        end = offset + self.page_size
+        await inline_query.answer(results=results[offset:end], next_offset=str(end) if end < len(results) else "", **kwargs)
+
+    async def answer(self, inline_query: InlineQuery, results: list, cache: bool = True, personal: bool = False, **kwargs):
+        """Answer first page (or page from offset) and cache the rest for next_offset."""
+        kwargs.pop("next_offset", None)
+        ttl = kwargs.get("cache_time", DEFAULT_CACHE_TIME)
+        if cache and ttl > 0:
+            self.cache[self._key(inline_query, personal)] = (results, kwargs, time.monotonic() + ttl)
+        await self._answer_page(inline_query, results, kwargs)
+
+    def _cached(self, key: tuple):
+        cached = self.cache.get(key)
+        if cached and cached[2] < time.monotonic():
+            self.cache.pop(key, None)
+            return None
+        return cached
+
+    async def answer_cached(self, inline_query: InlineQuery) -> bool:
+        cached = self._cached(self._key(inline_query, True)) or self._cached(self._key(inline_query, False))
+        if not cached:
+            return False
+        self.cache_hits += 1
+        await self._answer_page(inline_query, *cached[:2])
+        return True
+
+    async def _work(self, client, inline_query: InlineQuery, handler):
+        start = time.perf_counter()
+        error = False
+        try:
+            if not await self.answer_cached(inline_query):
+                await handler(client, inline_query)
+        except asyncio.CancelledError:
+            # superseded by newer query, not a latency sample
+            start = None
+            raise
+        except (StopPropagation, ContinuePropagation):
+            raise
+        except BaseException:
+            error = True
+            raise
+        finally:
+            if start is not None:
+                labels = (client.name, f"{handler.__module__.rsplit('.', 1)[-1]}.{handler.__name__}", "inline_query")
+                metrics.observe("handler", labels, time.perf_counter() - start, error)
+
+    async def _process(self, client, inline_query: InlineQuery, handler, wait: bool):
+        if wait:
+            await asyncio.sleep(self.debounce)
+        try:
+            await self._work(client, inline_query, handler)
+        except (StopPropagation, ContinuePropagation):
+            pass
+        except Exception as e:
+            LOGGER.error(f"Inline query '{inline_query.query}' failed: {e}")
+
+    def _done(self, user_id: int, task: asyncio.Task):
+        if self.tasks.get(user_id) is task:
+            del self.tasks[user_id]
+
+    async def run(self, client, inline_query: InlineQuery, handler):
+        user_id = inline_query.from_user.id
+        if inline_query.offset:
+            # next page request, answer directly without debounce
+            return await self._work(client, inline_query, handler)
+        prev = self.tasks.get(user_id)
+        if prev and not prev.done():
+            prev.cancel()
+            self.superseded += 1
+        # run in own task so it can be cancelled without touching dispatcher worker
+        task = asyncio.create_task(self._process(client, inline_query, handler, wait=bool(inline_query.query.strip())))
+        self.tasks[user_id] = task
+        task.add_done_callback(lambda t: self._done(user_id, t))
+
+
+inline_coordinator = InlineCoordinator()
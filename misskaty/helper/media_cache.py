@@ -0,0 +1,114 @@
+"""
+Content addressed cache for generated media.
+Map (feature, input hash, parameters) to Telegram file_id of media that already
+sent by bot, so identical request can be answered by file_id without
+generating and uploading it again.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from logging import getLogger
+from typing import Awaitable, Callable, Optional, Union
+
+from cachetools import LRUCache
+from pyrogram.errors import FileReferenceExpired, FileReferenceInvalid, MediaEmpty
+
+from database.media_cache_db import delete_cached_media, get_cached_media, save_cached_media, touch_cached_media
+
+LOGGER = getLogger(__name__)
+
+# Refresh last_used in mongo at most once per day per key
+TOUCH_INTERVAL = 24 * 60 * 60
+
+
+def media_key(feature: str, data: Union[str, bytes, dict, list], **params) -> str:
+    if isinstance(data, (dict, list)):
+        data = json.dumps(data, sort_keys=True, default=str)
+    if isinstance(data, str):
+        data = data.encode()
+    digest = hashlib.sha256(data).hexdigest()
+    param = ",".join(f"{k}={params[k]}" for k in sorted(params))
+    return f"{feature}:{digest}:{param}"
+
+
+def file_id_of(msg) -> Optional[str]:
+    for media_type in ("sticker", "photo", "audio", "voice", "document", "video", "animation"):
+        if media := getattr(msg, media_type, None):
+            return media.file_id
+    return None
+
+
+class MediaCache:
+    """
+    Two level cache, LRU in memory for hot key and MongoDB for persistence.
+    Entry in mongo expired automatically when not used for 30 days.
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        self._cache = LRUCache(maxsize=maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        if key in self._cache:
+            file_id, touched = self._cache[key]
+            if time.time() - touched > TOUCH_INTERVAL:
+                await touch_cached_media(key)
+                self._cache[key] = (file_id, time.time())
+            self.hits += 1
+            return file_id
+        file_id = await get_cached_media(key)
+        if file_id:
+            await touch_cached_media(key)
+            self._cache[key] = (file_id, time.time())
+            self.hits += 1
+        else:
+            self.misses += 1
+        return file_id
+
+    async def set(self, key: str, file_id: str):
+        self._cache[key] = (file_id, time.time())
+        await save_cached_media(key, file_id)
+
+    async def delete(self, key: str):
+        self._cache.pop(key, None)
+        await delete_cached_media(key)
+
+    async def send(self, key: str, sender: Callable[..., Awaitable], generate: Callable[[], Awaitable]):
+        """
+        sender: coroutine function that accept media (file_id or new file) and return sent Message.
+        generate: coroutine function to create the media when not found in cache.
+        """
+        if file_id := await self.get(key):
+            try:
+                return await sender(file_id)
+            except (FileReferenceExpired, FileReferenceInvalid, MediaEmpty, ValueError) as e:
+                LOGGER.info(f"Cached media {key} is invalid, regenerate it. {e}")
+                await self.delete(key)
+        msg = await sender(await generate())
+        if file_id := file_id_of(msg):
+            await self.set(key, file_id)
+        return msg
+
+    async def send_many(self, items: list, generate: Callable[[], Awaitable]):
+        """
+        Like send() but for a job that produce more than one output.
+        items: list of (key, sender), generate must return tuple of media in same order
+        and only called once even when some of key missing from cache.
+        """
+        task = None
+
+        def media(index):
+            async def _media():
+                nonlocal task
+                if task is None:
+                    task = asyncio.ensure_future(generate())
+                return (await task)[index]
+
+            return _media
+
+        return await asyncio.gather(*[self.send(key, sender, media(i)) for i, (key, sender) in enumerate(items)])
+
+
+media_cache = MediaCache()
@@ -3,26 +3,22 @@ import os
 import shlex
 from typing import Tuple
 
-from misskaty import BOT_USERNAME
-from telegraph.aio import Telegraph
+from misskaty.core.tracing import span
+from misskaty.helper.telegraph_helper import telegraph
 
 
 async def post_to_telegraph(is_media: bool, title=None, content=None, media=None):
-    telegraph = Telegraph()
-    if telegraph.get_access_token() is None:
-        await telegraph.create_account(short_name=BOT_USERNAME)
     if is_media:
         """Create a Telegram Post Foto/Video"""
-        response = await telegraph.upload_file(media)
-        return f"https://telegra.ph{response[0]['src']}"
+        return await telegraph.upload_file(media)
     """Create a Telegram Post using HTML Content"""
-    response = await telegraph.create_page(title, html_content=content, author_url=f"https://t.me/{BOT_USERNAME}", author_name=BOT_USERNAME)
-    return response["url"]
+    return await telegraph.create_page(title, content)
 
 
 async def run_subprocess(cmd):
-    process = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
-    return await process.communicate()
+    with span("subprocess", cmd=cmd[0]):
+        process = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        return await process.communicate()
 
 
 async def get_media_info(file_link):
@@ -48,8 +44,9 @@ async def get_media_info(file_link):
 async def runcmd(cmd: str) -> Tuple[str, str, int, int]:
     """run command in terminal"""
     args = shlex.split(cmd)
-    process = await asyncio.create_subprocess_exec(*args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
-    stdout, stderr = await process.communicate()
+    with span("subprocess", cmd=args[0]):
+        process = await asyncio.create_subprocess_exec(*args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stdout, stderr = await process.communicate()
     return (
         stdout.decode("utf-8", "replace").strip(),
         stderr.decode("utf-8", "replace").strip(),
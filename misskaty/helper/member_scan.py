@@ -0,0 +1,230 @@
+"""
+Single pass member scanner for group cleanup tools.
+Read member list once page by page, count all statistic in the same pass and
+feed kick candidate to bounded concurrent queue that respect flood limit.
+Scan offset checkpointed to MongoDB so big group can be resumed.
+"""
+import asyncio
+import time
+from logging import getLogger
+from typing import Awaitable, Callable, Optional
+
+from pyrogram import enums, raw, types
+from pyrogram.errors import ChatAdminRequired, FloodWait, UserAdminInvalid
+
+from database.member_scan_db import clear_scan_checkpoint, get_scan_checkpoint, save_scan_checkpoint
+from misskaty.core.ratelimiter_func import TokenBucket
+
+LOGGER = getLogger(__name__)
+
+PAGE_SIZE = 200
+# Save checkpoint every N scanned members
+CHECKPOINT_EVERY = 2000
+PROGRESS_INTERVAL = 15
+# Each kick is 2 request (ban + unban)
+KICK_RATE = 6
+KICK_WORKERS = 4
+KICK_QUEUE_SIZE = 200
+
+ADMIN_STATUS = (enums.ChatMemberStatus.ADMINISTRATOR, enums.ChatMemberStatus.OWNER)
+
+
+class KickQueue:
+    """Bounded queue with worker that kick (ban + unban) user from chat."""
+
+    def __init__(self, client, chat_id: int, workers: int = KICK_WORKERS, rate: float = KICK_RATE):
+        self.client = client
+        self.chat_id = chat_id
+        self.queue = asyncio.Queue(maxsize=KICK_QUEUE_SIZE)
+        self.bucket = TokenBucket(rate)
+        self.kicked = 0
+        self.failed = 0
+        self.error = None
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(workers)]
+
+    async def put(self, user_id: int):
+        if self.error:
+            raise self.error
+        await self.queue.put(user_id)
+
+    async def _kick(self, user_id: int):
+        while True:
+            await self.bucket.acquire()
+            try:
+                await self.client.ban_chat_member(self.chat_id, user_id)
+                await self.client.unban_chat_member(self.chat_id, user_id)
+                return
+            except FloodWait as e:
+                self.bucket.pause(e.value)
+
+    async def _worker(self):
+        while True:
+            user_id = await self.queue.get()
+            try:
+                if not self.error:
+                    await self._kick(user_id)
+                    self.kicked += 1
+            except ChatAdminRequired as e:
+                self.error = e
+            except UserAdminInvalid:
+                self.failed += 1
+            except Exception as e:
+                LOGGER.info(f"Failed to kick {user_id} from {self.chat_id}: {e}")
+                self.failed += 1
+            finally:
+                self.queue.task_done()
+
+    def cancel(self):
+        for worker in self._workers:
+            worker.cancel()
+
+    async def close(self):
+        await self.queue.join()
+        self.cancel()
+        if self.error:
+            raise self.error
+
+
+class MemberScan:
+    """
+    Ex:
+        scan = MemberScan(app, chat_id, "ban_ghosts", select=lambda m: m.user.is_deleted)
+        stats = await scan.run()
+    """
+
+    def __init__(
+        self,
+        client,
+        chat_id: int,
+        action: str = "instatus",
+        select: Optional[Callable[[types.ChatMember], bool]] = None,
+        progress: Optional[Callable[[dict], Awaitable]] = None,
+    ):
+        self.client = client
+        self.chat_id = chat_id
+        self.action = action
+        self.select = select
+        self.progress = progress
+        self.kicker = None
+        self._kicked_before = 0
+        self._last_report = 0
+        self.stats = {
+            "scanned": 0,
+            "recently": 0,
+            "last_week": 0,
+            "last_month": 0,
+            "long_ago": 0,
+            "uncached": 0,
+            "no_username": 0,
+            "deleted": 0,
+            "premium": 0,
+            "bot": 0,
+            "restricted": 0,
+            "banned": 0,
+            "kicked": 0,
+            "failed": 0,
+        }
+
+    def count(self, member: types.ChatMember):
+        user = member.user
+        self.stats["scanned"] += 1
+        if member.status == enums.ChatMemberStatus.RESTRICTED:
+            self.stats["restricted"] += 1
+        if user.is_deleted:
+            self.stats["deleted"] += 1
+        elif user.is_bot:
+            self.stats["bot"] += 1
+        elif user.is_premium:
+            self.stats["premium"] += 1
+        elif not user.username:
+            self.stats["no_username"] += 1
+        elif user.status and user.status.value in ("recently", "last_week", "last_month", "long_ago"):
+            self.stats[user.status.value] += 1
+        else:
+            self.stats["uncached"] += 1
+
+    async def _pages(self, offset: int):
+        peer = await self.client.resolve_peer(self.chat_id)
+        if not isinstance(peer, raw.types.InputPeerChannel):
+            # Basic group is small and doesn't support offset
+            yield 0, [member async for member in self.client.get_chat_members(self.chat_id)]
+            return
+        while True:
+            r = await self.client.invoke(
+                raw.functions.channels.GetParticipants(
+                    channel=peer,
+                    filter=raw.types.ChannelParticipantsSearch(q=""),
+                    # Kicked member is removed from list, so the offset is shifted
+                    offset=max(0, offset - self._kicked_now()),
+                    limit=PAGE_SIZE,
+                    hash=0,
+                ),
+                sleep_threshold=60,
+            )
+            if not r.participants:
+                return
+            users = {i.id: i for i in r.users}
+            chats = {i.id: i for i in r.chats}
+            offset += len(r.participants)
+            yield offset, [types.ChatMember._parse(self.client, member, users, chats) for member in r.participants]
+
+    def _kicked_now(self) -> int:
+        return self.kicker.kicked if self.kicker else 0
+
+    async def _count_banned(self):
+        try:
+            async for _ in self.client.get_chat_members(self.chat_id, filter=enums.ChatMembersFilter.BANNED):
+                self.stats["banned"] += 1
+        except ChatAdminRequired:
+            pass
+
+    async def _report(self, force: bool = False):
+        if not self.progress or (not force and time.time() - self._last_report < PROGRESS_INTERVAL):
+            return
+        self._last_report = time.time()
+        await self.progress(self.stats)
+
+    async def _scan(self, offset: int):
+        last_checkpoint = offset
+        async for offset, members in self._pages(offset):
+            for member in members:
+                self.count(member)
+                if self.select and member.status not in ADMIN_STATUS and self.select(member):
+                    await self.kicker.put(member.user.id)
+            kicked = self._kicked_now()
+            self.stats["kicked"] = self._kicked_before + kicked
+            if offset - last_checkpoint >= CHECKPOINT_EVERY:
+                await save_scan_checkpoint(self.chat_id, self.action, offset - kicked, self.stats)
+                last_checkpoint = offset
+            await self._report()
+
+    async def run(self, resume: bool = True) -> dict:
+        offset = 0
+        if resume and (checkpoint := await get_scan_checkpoint(self.chat_id, self.action)):
+            offset = checkpoint["offset"]
+            self.stats.update(checkpoint["stats"])
+            # banned count restarted from zero below, not part of the offset
+            self.stats["banned"] = 0
+            self._kicked_before = self.stats["kicked"]
+            LOGGER.info(f"Resuming {self.action} in {self.chat_id} from offset {offset}")
+        if self.select:
+            self.kicker = KickQueue(self.client, self.chat_id)
+        # banned member is not included in member list, count it together with main scan
+        banned = None if self.select else asyncio.create_task(self._count_banned())
+        try:
+            await self._scan(offset)
+            if self.kicker:
+                await self.kicker.close()
+                self.stats["kicked"] = self._kicked_before + self.kicker.kicked
+                self.stats["failed"] += self.kicker.failed
+            if banned:
+                await banned
+        except BaseException:
+            if banned:
+                banned.cancel()
+            if self.kicker:
+                self.kicker.cancel()
+            raise
+        await clear_scan_checkpoint(self.chat_id, self.action)
+        await self._report(force=True)
+        return self.stats
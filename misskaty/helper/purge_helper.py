@@ -0,0 +1,111 @@
+"""
+Purge engine for bulk message deletion.
+Delete batch (max 100 id per request) dispatched concurrently under token bucket,
+with optional filter by user, message type or time range.
+"""
+import asyncio
+from datetime import datetime
+from logging import getLogger
+from typing import Callable, List, Optional
+
+from pyrogram.errors import FloodWait, MessageDeleteForbidden
+from pyrogram.types import Message
+
+from misskaty.core.ratelimiter_func import TokenBucket
+
+LOGGER = getLogger(__name__)
+
+DELETE_LIMIT = 100
+FETCH_LIMIT = 200
+PURGE_WORKERS = 5
+PURGE_RATE = 10
+# Max message id scanned backward for time based purge without reply
+MAX_SCAN = 20000
+
+PURGE_TYPES = {
+    "text": lambda m: bool(m.text),
+    "photo": lambda m: bool(m.photo),
+    "video": lambda m: bool(m.video),
+    "sticker": lambda m: bool(m.sticker),
+    "document": lambda m: bool(m.document),
+    "animation": lambda m: bool(m.animation),
+    "gif": lambda m: bool(m.animation),
+    "voice": lambda m: bool(m.voice),
+    "audio": lambda m: bool(m.audio),
+    "media": lambda m: bool(m.media),
+    "link": lambda m: any(e.type.name in ("URL", "TEXT_LINK") for e in (m.entities or m.caption_entities or [])),
+}
+
+
+def chunks(ids: List[int], size: int):
+    for i in range(0, len(ids), size):
+        yield ids[i : i + size]
+
+
+class PurgeEngine:
+    def __init__(self, client, chat_id: int, workers: int = PURGE_WORKERS, rate: float = PURGE_RATE):
+        self.client = client
+        self.chat_id = chat_id
+        self.sem = asyncio.Semaphore(workers)
+        self.bucket = TokenBucket(rate)
+        self.deleted = 0
+        self.skipped = 0
+
+    async def _call(self, func, *args, **kwargs):
+        async with self.sem:
+            while True:
+                await self.bucket.acquire()
+                try:
+                    return await func(*args, **kwargs)
+                except FloodWait as e:
+                    LOGGER.warning(f"Purge got FloodWait {e.value}s in {self.chat_id}")
+                    self.bucket.pause(e.value)
+
+    async def delete(self, message_ids: List[int]):
+        if not message_ids:
+            return
+        try:
+            count = await self._call(self.client.delete_messages, chat_id=self.chat_id, message_ids=message_ids, revoke=True)
+        except MessageDeleteForbidden:
+            count = 0
+        count = count if isinstance(count, int) else len(message_ids)
+        self.deleted += count
+        self.skipped += len(message_ids) - count
+
+    async def fetch(self, message_ids: List[int]) -> List[Message]:
+        msgs = await self._call(self.client.get_messages, self.chat_id, message_ids, replies=0)
+        return [m for m in msgs if not m.empty]
+
+    async def _filtered(self, message_ids: List[int], predicate: Callable[[Message], bool]):
+        msgs = await self.fetch(message_ids)
+        match = [m.id for m in msgs if predicate(m)]
+        self.skipped += len(message_ids) - len(match)
+        await asyncio.gather(*[self.delete(ids) for ids in chunks(match, DELETE_LIMIT)])
+
+    async def purge_range(self, start: int, end: int, predicate: Optional[Callable[[Message], bool]] = None) -> dict:
+        """Purge message id from start until end (exclusive)."""
+        ids = list(range(start, end))
+        if predicate is None:
+            await asyncio.gather(*[self.delete(batch) for batch in chunks(ids, DELETE_LIMIT)])
+        else:
+            # fetch and delete of every chunk run concurrently as pipeline
+            await asyncio.gather(*[self._filtered(batch, predicate) for batch in chunks(ids, FETCH_LIMIT)])
+        return self.result
+
+    async def purge_since(self, before_id: int, since: datetime, predicate: Optional[Callable[[Message], bool]] = None) -> dict:
+        """Purge message newer than since, scan backward from before_id."""
+        end = before_id
+        while end > 1 and before_id - end < MAX_SCAN:
+            start = max(1, end - FETCH_LIMIT)
+            msgs = await self.fetch(list(range(start, end)))
+            match = [m.id for m in msgs if m.date >= since and (predicate is None or predicate(m))]
+            self.skipped += (end - start) - len(match)
+            await asyncio.gather(*[self.delete(ids) for ids in chunks(match, DELETE_LIMIT)])
+            if msgs and min(m.date for m in msgs) < since:
+                break
+            end = start
+        return self.result
+
+    @property
+    def result(self) -> dict:
+        return {"deleted": self.deleted, "skipped": self.skipped}
@@ -47,6 +47,60 @@ async def progress_for_pyrogram(current, total, ud_type, message, start):
             pass
 
 
+class ProgressReporter:
+    """
+    Throttled progress message shared by long running jobs.
+    Only edit the status message once every `interval` seconds
+    so many jobs can report at the same time without FloodWait.
+    """
+
+    def __init__(self, message, ud_type: str, interval: float = 10):
+        self.message = message
+        self.ud_type = ud_type
+        self.interval = interval
+        self.start = time.time()
+        self._last_edit = 0
+        self._last_text = None
+
+    def render(self, current: int, total: int) -> str:
+        diff = max(time.time() - self.start, 0.001)
+        speed = current / diff
+        if total:
+            percentage = current * 100 / total
+            eta = time_formatter(round((total - current) / speed)) if speed else ""
+        else:
+            percentage = 0
+            eta = ""
+        progress = "[{0}{1}] \nP: {2}%\n".format(
+            "".join(["█" for _ in range(math.floor(percentage / 5))]),
+            "".join(["░" for _ in range(20 - math.floor(percentage / 5))]),
+            round(percentage, 2),
+        )
+        return progress + "{0} of {1}\nSpeed: {2}/s\nETA: {3}\n".format(
+            humanbytes(current) or "0 B",
+            humanbytes(total) or "Unknown",
+            humanbytes(speed) or "0 B",
+            eta or "0 s",
+        )
+
+    async def update(self, current: int, total: int, force: bool = False):
+        now = time.time()
+        if not force and now - self._last_edit < self.interval:
+            return
+        text = f"{self.ud_type}\n {self.render(current, total)}"
+        if text == self._last_text:
+            return
+        self._last_edit = now
+        self._last_text = text
+        try:
+            await self.message.edit(text, disable_web_page_preview=True)
+        except FloodWait as e:
+            # skip this tick, next update will be sent after flood wait is over
+            self._last_edit = now + e.value
+        except (MessageNotModified, MessageIdInvalid):
+            pass
+
+
 def humanbytes(size: int) -> str:
     """converts bytes into human readable format"""
     # https://stackoverflow.com/a/49361727/4723940
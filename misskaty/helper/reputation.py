@@ -0,0 +1,108 @@
+"""
+Spam reputation service for new member check.
+SpamWatch and CAS looked up concurrently with bounded fan-out, verdict cached
+with TTL and shared across all chats, optional local ban list snapshot give
+offline O(1) check before hitting any API.
+"""
+import asyncio
+import os
+from logging import getLogger
+from typing import Dict, Iterable, List, Tuple
+
+from cachetools import TTLCache
+
+from misskaty.helper.http import http
+from misskaty.vars import SPAM_BANLIST_FILE, SPAMWATCH_TOKEN
+
+LOGGER = getLogger(__name__)
+
+# Spammer rarely get unbanned, clean user recheck more often
+BANNED_TTL = 6 * 3600
+CLEAN_TTL = 3600
+MAX_LOOKUPS = 10
+
+# Verdict is list of (source, reason), empty list mean clean user
+Verdict = List[Tuple[str, str]]
+
+
+async def _spamwatch(user_id: int):
+    r = (await http.get(f"https://api.spamwat.ch/banlist/{user_id}", headers={"Authorization": f"Bearer {SPAMWATCH_TOKEN}"})).json()
+    if not r.get("error"):
+        return "SpamWatch", r.get("reason")
+
+
+async def _cas(user_id: int):
+    r = (await http.get(f"https://api.cas.chat/check?user_id={user_id}")).json()
+    if r.get("ok") in (True, "true"):
+        return "CAS", "spambot"
+
+
+class Reputation:
+    """
+    Ex:
+        verdicts = await reputation.check_many([u.id for u in message.new_chat_members])
+    """
+
+    def __init__(self, concurrency: int = MAX_LOOKUPS, snapshot: str = None):
+        self.banned = TTLCache(maxsize=20000, ttl=BANNED_TTL)
+        self.clean = TTLCache(maxsize=50000, ttl=CLEAN_TTL)
+        self.snapshot = {}
+        self.sem = asyncio.Semaphore(concurrency)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self.backends = [_spamwatch, _cas]
+        if snapshot:
+            self.load_snapshot(snapshot)
+
+    def load_snapshot(self, path: str) -> int:
+        """Load ban list mirror, each line is user id optionally followed by reason."""
+        if not os.path.isfile(path):
+            LOGGER.warning(f"Ban list snapshot {path} not found.")
+            return 0
+        snapshot = {}
+        with open(path) as f:
+            for line in f:
+                uid, _, reason = line.strip().partition(",")
+                if uid.lstrip("-").isdigit():
+                    snapshot[int(uid)] = reason.strip() or "listed in local ban list"
+        self.snapshot = snapshot
+        LOGGER.info(f"Loaded {len(snapshot)} users from ban list snapshot.")
+        return len(snapshot)
+
+    async def _lookup(self, user_id: int) -> Verdict:
+        async with self.sem:
+            results = await asyncio.gather(*[backend(user_id) for backend in self.backends], return_exceptions=True)
+        verdict, failed = [], False
+        for res in results:
+            if isinstance(res, Exception):
+                LOGGER.error(f"ERROR in spam reputation check. {res}")
+                failed = True
+            elif res:
+                verdict.append(res)
+        if verdict:
+            self.banned[user_id] = verdict
+        elif not failed:
+            # don't cache clean verdict when some API is down
+            self.clean[user_id] = verdict
+        return verdict
+
+    async def check(self, user_id: int) -> Verdict:
+        if user_id in self.snapshot:
+            return [("Local", self.snapshot[user_id])]
+        if user_id in self.banned:
+            return self.banned[user_id]
+        if user_id in self.clean:
+            return []
+        # join same user in many chats at once only trigger one lookup
+        if user_id not in self._pending:
+            task = asyncio.ensure_future(self._lookup(user_id))
+            self._pending[user_id] = task
+            task.add_done_callback(lambda _: self._pending.pop(user_id, None))
+        return await asyncio.shield(self._pending[user_id])
+
+    async def check_many(self, user_ids: Iterable[int]) -> Dict[int, Verdict]:
+        user_ids = list(dict.fromkeys(user_ids))
+        verdicts = await asyncio.gather(*[self.check(uid) for uid in user_ids])
+        return dict(zip(user_ids, verdicts))
+
+
+reputation = Reputation(snapshot=SPAM_BANLIST_FILE)
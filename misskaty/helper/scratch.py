@@ -0,0 +1,172 @@
+"""
+Scratch space manager for temporary files.
+Every job get own temp directory that removed when the job finished, total disk
+usage of download folder is limited by quota with LRU eviction and leftover
+from crashed process cleaned at startup.
+"""
+import asyncio
+import os
+import shutil
+import uuid
+from contextlib import asynccontextmanager
+from glob import glob
+from logging import getLogger
+from pathlib import Path
+
+from misskaty.vars import SCRATCH_QUOTA
+
+LOGGER = getLogger(__name__)
+
+# Folder that managed by scratch space. "/downloads" used by some plugin on docker.
+SCRATCH_ROOTS = ["downloads", "/downloads", "GenSS"]
+# absolute, pyrogram resolve relative download dir against script dir instead of CWD
+JOB_ROOT = Path("downloads", "jobs").resolve()
+# Temp files that created in working dir by old plugin code.
+LEFTOVER_PATTERNS = ["genss*.png", "sticker.png", "tts_*.mp3", "tostick_*.webp", "toimg_*.png", "ocr_*.jpg", "misskatyfy.*"]
+
+
+def _path_size(path: str) -> int:
+    if os.path.isfile(path) or os.path.islink(path):
+        try:
+            return os.lstat(path).st_size
+        except OSError:
+            return 0
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _remove(path: str):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class ScratchSpace:
+    """
+    Ex:
+        async with scratch.job("genss") as workdir:
+            path = await message.download(file_name=f"{workdir}/")
+    """
+
+    def __init__(self, quota: int, roots=None):
+        self.quota = quota
+        self.roots = roots or SCRATCH_ROOTS
+        self.active = set()
+        self.evicted = 0
+        self._lock = asyncio.Lock()
+
+    def _entries(self):
+        """Top level entries of managed roots, the unit of eviction."""
+        for root in self.roots:
+            if not os.path.isdir(root):
+                continue
+            for name in os.listdir(root):
+                path = os.path.join(root, name)
+                if os.path.abspath(path) == os.path.abspath(JOB_ROOT):
+                    # job dir counted one by one below
+                    continue
+                yield path
+        if JOB_ROOT.is_dir():
+            for name in os.listdir(JOB_ROOT):
+                yield str(JOB_ROOT.joinpath(name))
+
+    def _usage(self) -> dict:
+        entries = {}
+        for path in self._entries():
+            try:
+                atime = os.stat(path).st_atime
+            except OSError:
+                continue
+            entries[path] = (_path_size(path), atime)
+        return entries
+
+    def _in_use(self, path: str) -> bool:
+        path = os.path.abspath(path)
+        return any(key == path or key.startswith(path + os.sep) for key in self.active)
+
+    def _enforce(self, reserve: int = 0) -> int:
+        entries = self._usage()
+        used = sum(size for size, _ in entries.values())
+        freed = 0
+        for path, (size, _) in sorted(entries.items(), key=lambda x: x[1][1]):
+            if used - freed + reserve <= self.quota:
+                break
+            if self._in_use(path):
+                continue
+            LOGGER.info(f"Scratch quota exceeded, evicting {path} ({size} bytes)")
+            _remove(path)
+            freed += size
+            self.evicted += 1
+        return freed
+
+    async def enforce_quota(self, reserve: int = 0) -> int:
+        """Remove least recently used files until usage + reserve fit in quota."""
+        async with self._lock:
+            return await asyncio.get_running_loop().run_in_executor(None, self._enforce, reserve)
+
+    async def usage(self) -> dict:
+        entries = await asyncio.get_running_loop().run_in_executor(None, self._usage)
+        return {
+            "used": sum(size for size, _ in entries.values()),
+            "quota": self.quota,
+            "files": len(entries),
+            "active_jobs": len(self.active),
+            "evicted": self.evicted,
+        }
+
+    @asynccontextmanager
+    async def hold(self, *paths, reserve: int = 0):
+        """Keep paths from being evicted while in use, for file that outlive the job like /download."""
+        keys = {os.path.abspath(path) for path in paths} - self.active
+        self.active.update(keys)
+        try:
+            await self.enforce_quota(reserve)
+            yield
+        finally:
+            self.active.difference_update(keys)
+
+    @asynccontextmanager
+    async def job(self, name: str = "job", reserve: int = 0):
+        workdir = JOB_ROOT.joinpath(f"{name}-{uuid.uuid4().hex[:12]}")
+        async with self.hold(workdir, reserve=reserve):
+            workdir.mkdir(parents=True, exist_ok=True)
+            try:
+                yield workdir
+            finally:
+                await asyncio.get_running_loop().run_in_executor(None, _remove, str(workdir))
+
+    def cleanup_startup(self):
+        """Remove leftover of job that never finished because bot crashed or restarted."""
+        removed = 0
+        for path in [str(JOB_ROOT), "GenSS"]:
+            if os.path.isdir(path):
+                _remove(path)
+                removed += 1
+        for pattern in LEFTOVER_PATTERNS:
+            for path in glob(pattern):
+                _remove(path)
+                removed += 1
+        if removed:
+            LOGGER.info(f"Removed {removed} leftover temp files from previous run.")
+        self._enforce()
+
+
+async def scratch_janitor(interval: int = 600):
+    while not await asyncio.sleep(interval):
+        try:
+            await scratch.enforce_quota()
+        except Exception as e:
+            LOGGER.error(f"Scratch janitor error: {e}")
+
+
+scratch = ScratchSpace(SCRATCH_QUOTA)
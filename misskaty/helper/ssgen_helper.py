@@ -1,21 +1,21 @@
 import datetime
-import os
 import random
 import shlex
 import time
 import traceback
-import uuid
-from pathlib import Path
 
 from pyrogram import enums
 from pyrogram.types import InlineKeyboardButton, InputMediaPhoto
 
 from misskaty.core.message_utils import *
+from misskaty.core.tracing import span
+from misskaty.helper.scratch import scratch
 
 
 async def run_subprocess(cmd):
-    process = await asyncio.create_subprocess_shell(cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
-    return await process.communicate()
+    with span("subprocess", cmd=cmd.split(maxsplit=1)[0]):
+        process = await asyncio.create_subprocess_shell(cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        return await process.communicate()
 
 
 def get_random_start_at(seconds, dur=0):
@@ -64,11 +64,11 @@ async def screenshot_flink(c, m):
         # c.CURRENT_PROCESSES[chat_id] -= 1
         return
 
-    uid = str(uuid.uuid4())
-    output_folder = Path("GenSS/").joinpath(uid)
-    if not output_folder.exists():
-        os.makedirs(output_folder)
+    async with scratch.job("genss") as output_folder:
+        await _screenshot_flink(m, media_msg, num_screenshots, output_folder)
 
+
+async def _screenshot_flink(m, media_msg, num_screenshots, output_folder):
     try:
         start_time = time.time()
 
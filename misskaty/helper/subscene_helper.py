@@ -4,8 +4,11 @@ from bs4 import BeautifulSoup
 
 async def down_page(url):
     f = cfscrape.create_scraper()
-    resp = f.get(url).text
-    soup = BeautifulSoup(resp, "lxml")
+    return parse_down_page(f.get(url).text)
+
+
+def parse_down_page(html: str) -> dict:
+    soup = BeautifulSoup(html, "lxml")
     maindiv = soup.body.find("div", class_="subtitle").find("div", class_="top left")
     title = maindiv.find("div", class_="header").h1.span.text.strip()
     try:
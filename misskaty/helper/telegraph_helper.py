@@ -0,0 +1,84 @@
+"""
+Shared Telegraph client.
+One account created and its token saved to MongoDB, all post use the same
+client (and http connection pool) and page is cached by content hash so
+posting identical content return the old url.
+"""
+import asyncio
+import hashlib
+from logging import getLogger
+
+from cachetools import LRUCache
+from telegraph.aio import Telegraph
+from telegraph.exceptions import RetryAfterError, TelegraphException
+
+from database.telegraph_db import get_telegraph_page, get_telegraph_token, save_telegraph_page, save_telegraph_token
+from misskaty import BOT_USERNAME
+
+LOGGER = getLogger(__name__)
+
+# Don't wait flood longer than this, just raise
+MAX_RETRY_AFTER = 30
+
+
+class TelegraphService:
+    def __init__(self):
+        self.client = None
+        self.pages = LRUCache(maxsize=512)
+        self._lock = asyncio.Lock()
+
+    async def setup(self, new_account: bool = False) -> Telegraph:
+        async with self._lock:
+            if self.client and self.client.get_access_token() and not new_account:
+                return self.client
+            if not self.client:
+                self.client = Telegraph(access_token=await get_telegraph_token())
+            if new_account or not self.client.get_access_token():
+                await self.client.create_account(short_name=BOT_USERNAME, author_name=BOT_USERNAME, author_url=f"https://t.me/{BOT_USERNAME}")
+                await save_telegraph_token(self.client.get_access_token())
+                LOGGER.info("Created new Telegraph account.")
+            return self.client
+
+    async def warmup(self):
+        try:
+            await self.setup()
+        except Exception as e:
+            LOGGER.warning(f"Failed to setup Telegraph account: {e}")
+
+    async def _call(self, method: str, *args, **kwargs):
+        client = await self.setup()
+        for _ in range(3):
+            try:
+                return await getattr(client, method)(*args, **kwargs)
+            except RetryAfterError as e:
+                if e.retry_after > MAX_RETRY_AFTER:
+                    raise
+                await asyncio.sleep(e.retry_after)
+            except TelegraphException as e:
+                if "ACCESS_TOKEN_INVALID" not in str(e):
+                    raise
+                client = await self.setup(new_account=True)
+        return await getattr(client, method)(*args, **kwargs)
+
+    @staticmethod
+    def key(content: str) -> str:
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    async def create_page(self, title: str, html_content: str) -> str:
+        """Create page and return the url, same content only posted once."""
+        key = self.key(html_content)
+        if url := self.pages.get(key) or await get_telegraph_page(key):
+            self.pages[key] = url
+            return url
+        page = await self._call("create_page", title, html_content=html_content, author_url=f"https://t.me/{BOT_USERNAME}", author_name=BOT_USERNAME)
+        url = page["url"]
+        self.pages[key] = url
+        await save_telegraph_page(key, url)
+        return url
+
+    async def upload_file(self, media) -> str:
+        response = await self._call("upload_file", media)
+        return f"https://telegra.ph{response[0]['src']}"
+
+
+telegraph = TelegraphService()
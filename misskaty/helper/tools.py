@@ -10,7 +10,8 @@ import psutil
 
 from misskaty import BOT_NAME, UBOT_NAME, botStartTime
 from misskaty.helper.http import http
-from misskaty.helper.human_read import get_readable_time
+from misskaty.helper.human_read import get_readable_file_size, get_readable_time
+from misskaty.helper.scratch import scratch
 from misskaty.plugins import ALL_MODULES
 
 LOGGER = logging.getLogger(__name__)
@@ -47,6 +48,7 @@ async def bot_sys_stats():
     mem = psutil.virtual_memory().percent
     disk = psutil.disk_usage("/").percent
     process = psutil.Process(os.getpid())
+    scratch_usage = await scratch.usage()
     return f"""
 {UBOT_NAME}@{BOT_NAME}
 ------------------
@@ -55,6 +57,7 @@ BOT: {round(process.memory_info()[0] / 1024**2)} MB
 CPU: {cpu}%
 RAM: {mem}%
 DISK: {disk}%
+TEMP: {get_readable_file_size(scratch_usage["used"])} / {get_readable_file_size(scratch_usage["quota"])}
 
 TOTAL PLUGINS: {len(ALL_MODULES)}
 """
@@ -0,0 +1,147 @@
+"""
+Async translation service.
+Blocking translator run in executor, segments requested at same time for same
+language pair merged into one request (auto source only merged within one
+call) and every translation cached by (text hash, source, target) in LRU and
+MongoDB. Local backend translate without network for testing.
+"""
+import asyncio
+import hashlib
+from logging import getLogger
+from typing import Dict, List
+
+from cachetools import LRUCache
+from deep_translator import GoogleTranslator
+
+from database.translation_db import get_translations, save_translations
+from misskaty.vars import TRANSLATOR_BACKEND
+
+LOGGER = getLogger(__name__)
+
+# Wait a moment so segments from other handler can join the batch
+BATCH_WINDOW = 0.05
+SEPARATOR = "\n\n"
+
+
+class GoogleBackend:
+    name = "google"
+    # Google Translate limit is 5000 chars per request
+    max_chars = 4500
+
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        translator = GoogleTranslator(source=source, target=target)
+        if len(texts) > 1 and not any(SEPARATOR in text for text in texts):
+            parts = translator.translate(SEPARATOR.join(texts)).split(SEPARATOR)
+            if len(parts) == len(texts):
+                return [part.strip() for part in parts]
+        # Separator changed by translator, fallback one by one
+        return [translator.translate(text) for text in texts]
+
+
+class LocalBackend:
+    """Offline backend, return text from dictionary or the text itself."""
+
+    name = "local"
+    max_chars = 4500
+
+    def __init__(self, dictionary: Dict[tuple, str] = None):
+        self.dictionary = dictionary or {}
+        self.requests = 0
+
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        self.requests += 1
+        return [self.dictionary.get((text, target), text) for text in texts]
+
+
+BACKENDS = {"google": GoogleBackend, "local": LocalBackend}
+
+
+def _batches(texts: List[str], max_chars: int):
+    batch, size = [], 0
+    for text in texts:
+        if batch and size + len(text) + len(SEPARATOR) > max_chars:
+            yield batch
+            batch, size = [], 0
+        batch.append(text)
+        size += len(text) + len(SEPARATOR)
+    if batch:
+        yield batch
+
+
+class Translator:
+    """
+    Ex:
+        text = await translator.translate("Hello", "id")
+        plot, awards = await translator.translate_many([plot, awards], "id")
+    """
+
+    def __init__(self, backend=None, persist: bool = None):
+        self.backend = backend or GoogleBackend()
+        # Local backend used for testing, don't pollute database
+        self.persist = self.backend.name != "local" if persist is None else persist
+        self.cache = LRUCache(maxsize=4096)
+        self._pending = {}
+
+    @staticmethod
+    def key(text: str, source: str, target: str) -> str:
+        return f"{hashlib.sha1(text.encode()).hexdigest()}:{source}:{target}"
+
+    async def _flush(self, pair: tuple, wait: float):
+        await asyncio.sleep(wait)
+        pending = self._pending.pop(pair)
+        source, target, _ = pair
+        texts = list(pending)
+        loop = asyncio.get_running_loop()
+        batches = list(_batches(texts, self.backend.max_chars))
+        results = await asyncio.gather(*[loop.run_in_executor(None, self.backend.translate, batch, source, target) for batch in batches], return_exceptions=True)
+        for batch, result in zip(batches, results):
+            for i, text in enumerate(batch):
+                fut = pending[text]
+                if fut.done():
+                    continue
+                if isinstance(result, Exception):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result[i])
+
+    def _request(self, text: str, source: str, target: str, group=None) -> asyncio.Future:
+        pair = (source, target, group)
+        if pair not in self._pending:
+            self._pending[pair] = {}
+            # only shared batch wait for other handler
+            asyncio.create_task(self._flush(pair, BATCH_WINDOW if group is None else 0))
+        if text not in self._pending[pair]:
+            self._pending[pair][text] = asyncio.get_running_loop().create_future()
+        return self._pending[pair][text]
+
+    async def translate_many(self, texts: List[str], target: str, source: str = "auto") -> List[str]:
+        keys = [self.key(text or "", source, target) for text in texts]
+        results = {key: self.cache[key] for key in keys if key in self.cache}
+        missing = {key: text for key, text in zip(keys, texts) if key not in results and text and text.strip()}
+        if missing and self.persist:
+            try:
+                results.update(await get_translations(list(missing)))
+            except Exception as e:
+                LOGGER.warning(f"Failed to read translation cache: {e}")
+            missing = {key: text for key, text in missing.items() if key not in results}
+        if missing:
+            # auto detect run on whole batch, don't mix text from other caller
+            group = object() if source == "auto" else None
+            translated = await asyncio.gather(*[self._request(text, source, target, group) for text in missing.values()])
+            new = dict(zip(missing, translated))
+            results.update(new)
+            if self.persist:
+                try:
+                    await save_translations(new)
+                except Exception as e:
+                    LOGGER.warning(f"Failed to save translation cache: {e}")
+        for key in keys:
+            if key in results:
+                self.cache[key] = results[key]
+        return [results.get(key, text) for key, text in zip(keys, texts)]
+
+    async def translate(self, text: str, target: str, source: str = "auto") -> str:
+        return (await self.translate_many([text], target, source))[0]
+
+
+translator = Translator(BACKENDS.get(TRANSLATOR_BACKEND, GoogleBackend)())
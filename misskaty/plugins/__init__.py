@@ -39,4 +39,6 @@ def __list_all_modules():
 LOGGER.info("[INFO]: IMPORTING PLUGINS")
 importlib.import_module("misskaty.plugins.__main__")
 ALL_MODULES = sorted(__list_all_modules())
-__all__ = ALL_MODULES + ["ALL_MODULES"]
+# plugin with userbot handler, only these loaded in separate userbot process
+USERBOT_MODULES = [mod for mod in ("auto_forwarder", "dev", "ubot_plugin") if mod in ALL_MODULES]
+__all__ = ALL_MODULES + ["ALL_MODULES", "USERBOT_MODULES"]
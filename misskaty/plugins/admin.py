@@ -1,5 +1,6 @@
 import asyncio
 import re
+from datetime import datetime, timedelta
 from logging import getLogger
 from time import time
 
@@ -21,6 +22,7 @@ from misskaty.core.decorator.ratelimiter import ratelimiter
 from misskaty.core.keyboard import ikb
 from misskaty.core.message_utils import kirimPesan
 from misskaty.helper.localization import use_chat_lang
+from misskaty.helper.purge_helper import PURGE_TYPES, PurgeEngine
 from misskaty.helper.functions import (
     extract_user,
     extract_user_and_reason,
@@ -47,6 +49,7 @@ __HELP__ = """
 /dkick - Delete the replied message kicking its sender
 /purge - Purge Messages
 /purge [n] - Purge "n" number of messages from replied message
+/purge [user|me] [type] [10m|2h|1d] - Purge only messages from replied user/you, by type (text, photo, video, sticker, document, animation, voice, audio, media, link) or newer than time range
 /del - Delete Replied Message
 /promote - Promote A Member
 /fullpromote - Promote A Member With All Rights
@@ -86,46 +89,42 @@ async def purge(_, message, strings):
         repliedmsg = message.reply_to_message
         await message.delete()
 
-        if not repliedmsg:
+        cmd = message.command[1:]
+        count = None
+        since = None
+        predicates = []
+        for arg in cmd:
+            arg = arg.lower()
+            if arg.isdigit():
+                count = int(arg)
+            elif arg in PURGE_TYPES:
+                predicates.append(PURGE_TYPES[arg])
+            elif arg in ("user", "me") and (repliedmsg or arg == "me"):
+                target = message if arg == "me" else repliedmsg
+                sender_id = (target.from_user or target.sender_chat).id
+                predicates.append(lambda m, uid=sender_id: (m.from_user or m.sender_chat) and (m.from_user or m.sender_chat).id == uid)
+            elif match := re.fullmatch(r"(\d+)([mhd])", arg):
+                unit = {"m": "minutes", "h": "hours", "d": "days"}[match[2]]
+                since = datetime.now() - timedelta(**{unit: int(match[1])})
+
+        if not repliedmsg and not since:
             return await message.reply_text(strings("purge_no_reply"))
 
-        cmd = message.command
-        if len(cmd) > 1 and cmd[1].isdigit():
-            purge_to = repliedmsg.id + int(cmd[1])
-            purge_to = min(purge_to, message.id)
+        predicate = (lambda m: all(p(m) for p in predicates)) if predicates else None
+        if since and predicate:
+            time_pred = predicate
+            predicate = lambda m: m.date >= since and time_pred(m)
+        elif since:
+            predicate = lambda m: m.date >= since
+
+        start_time = time()
+        engine = PurgeEngine(app, message.chat.id)
+        if repliedmsg:
+            purge_to = min(repliedmsg.id + count, message.id) if count else message.id
+            result = await engine.purge_range(repliedmsg.id, purge_to, predicate)
         else:
-            purge_to = message.id
-
-        chat_id = message.chat.id
-        message_ids = []
-        del_total = 0
-
-        for message_id in range(
-            repliedmsg.id,
-            purge_to,
-        ):
-            message_ids.append(message_id)
-
-            # Max message deletion limit is 100
-            if len(message_ids) == 100:
-                await app.delete_messages(
-                    chat_id=chat_id,
-                    message_ids=message_ids,
-                    revoke=True,  # For both sides
-                )
-                del_total += len(message_ids)
-                # To delete more than 100 messages, start again
-                message_ids = []
-
-        # Delete if any messages left
-        if len(message_ids) > 0:
-            await app.delete_messages(
-                chat_id=chat_id,
-                message_ids=message_ids,
-                revoke=True,
-            )
-            del_total += len(message_ids)
-        await kirimPesan(message, strings("purge_success").format(del_total=del_total))
+            result = await engine.purge_since(message.id, since, predicate)
+        await kirimPesan(message, strings("purge_result").format(time=round(time() - start_time, 2), **result))
     except Exception as err:
         await kirimPesan(message, f"ERROR: {err}")
 
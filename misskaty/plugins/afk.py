@@ -9,6 +9,7 @@
 #
 
 # Modified plugin by me from https://github.com/TeamYukki/YukkiAFKBot to make compatible with pyrogram v2
+import os
 import time
 import re
 
@@ -25,6 +26,12 @@ from misskaty.helper.localization import use_chat_lang
 from misskaty.vars import COMMAND_HANDLER
 from utils import put_cleanmode
 
+def remove_afk_photo(user_id: int):
+    # AFK photo only needed until user back online
+    if os.path.exists(f"afk/{user_id}.jpg"):
+        os.remove(f"afk/{user_id}.jpg")
+
+
 __MODULE__ = "AFK"
 __HELP__ = """/afk [Reason > Optional] - Tell others that you are AFK (Away From Keyboard), so that your boyfriend or girlfriend won't look for you 💔.
 /afk [reply to media] - AFK with media.
@@ -65,12 +72,12 @@ async def active_afk(_, message, strings):
             elif afktype == "photo":
                 send = (
                     await message.reply_photo(
-                        photo=f"downloads/{user_id}.jpg",
+                        photo=f"afk/{user_id}.jpg",
                         caption=strings("on_afk_msg_no_r").format(usr=message.from_user.mention, id=message.from_user.id, tm=seenago),
                     )
                     if str(reasonafk) == "None"
                     else await message.reply_photo(
-                        photo=f"downloads/{user_id}.jpg",
+                        photo=f"afk/{user_id}.jpg",
                         caption=strings("on_afk_msg_with_r").format(usr=message.from_user.first_name, tm=seenago, reas=reasonafk),
                     )
                 )
@@ -90,6 +97,7 @@ async def active_afk(_, message, strings):
                 disable_web_page_preview=True,
             )
         await put_cleanmode(message.chat.id, send.id)
+        remove_afk_photo(user_id)
         return
     if len(message.command) == 1 and not message.reply_to_message:
         details = {
@@ -124,7 +132,7 @@ async def active_afk(_, message, strings):
             "reason": _reason,
         }
     elif len(message.command) == 1 and message.reply_to_message.photo:
-        await app.download_media(message.reply_to_message, file_name=f"{user_id}.jpg")
+        await app.download_media(message.reply_to_message, file_name=os.path.abspath(f"afk/{user_id}.jpg"))
         details = {
             "type": "photo",
             "time": time.time(),
@@ -132,7 +140,7 @@ async def active_afk(_, message, strings):
             "reason": None,
         }
     elif len(message.command) > 1 and message.reply_to_message.photo:
-        await app.download_media(message.reply_to_message, file_name=f"{user_id}.jpg")
+        await app.download_media(message.reply_to_message, file_name=os.path.abspath(f"afk/{user_id}.jpg"))
         _reason = message.text.split(None, 1)[1].strip()
         details = {
             "type": "photo",
@@ -149,7 +157,7 @@ async def active_afk(_, message, strings):
                 "reason": None,
             }
         else:
-            await app.download_media(message.reply_to_message, file_name=f"{user_id}.jpg")
+            await app.download_media(message.reply_to_message, file_name=os.path.abspath(f"afk/{user_id}.jpg"))
             details = {
                 "type": "photo",
                 "time": time.time(),
@@ -166,7 +174,7 @@ async def active_afk(_, message, strings):
                 "reason": _reason,
             }
         else:
-            await app.download_media(message.reply_to_message, file_name=f"{user_id}.jpg")
+            await app.download_media(message.reply_to_message, file_name=os.path.abspath(f"afk/{user_id}.jpg"))
             details = {
                 "type": "photo",
                 "time": time.time(),
@@ -258,16 +266,17 @@ async def chat_watcher_func(client, message, strings):
             if afktype == "photo":
                 if str(reasonafk) == "None":
                     send = await message.reply_photo(
-                        photo=f"downloads/{userid}.jpg",
+                        photo=f"afk/{userid}.jpg",
                         caption=strings("on_afk_msg_no_r").format(usr=user_name, id=userid, tm=seenago),
                     )
                 else:
                     send = await message.reply_photo(
-                        photo=f"downloads/{userid}.jpg",
+                        photo=f"afk/{userid}.jpg",
                         caption=strings("on_afk_msg_with_r").format(usr=user_name, id=userid, tm=seenago, reas=reasonafk),
                     )
         except:
             msg += strings("is_online").format(usr=user_name, id=userid)
+        remove_afk_photo(userid)
 
     # Replied to a User which is AFK
     if message.reply_to_message:
@@ -300,12 +309,12 @@ async def chat_watcher_func(client, message, strings):
                     if afktype == "photo":
                         if str(reasonafk) == "None":
                             send = await message.reply_photo(
-                                photo=f"downloads/{replied_user_id}.jpg",
+                                photo=f"afk/{replied_user_id}.jpg",
                                 caption=strings("is_afk_msg_no_r").format(usr=replied_first_name, id=replied_user_id, tm=seenago),
                             )
                         else:
                             send = await message.reply_photo(
-                                photo=f"downloads/{replied_user_id}.jpg",
+                                photo=f"afk/{replied_user_id}.jpg",
                                 caption=strings("is_afk_msg_with_r").format(usr=replied_first_name, id=replied_user_id, tm=seenago, reas=reasonafk),
                             )
                 except Exception:
@@ -355,12 +364,12 @@ async def chat_watcher_func(client, message, strings):
                         if afktype == "photo":
                             if str(reasonafk) == "None":
                                 send = await message.reply_photo(
-                                    photo=f"downloads/{user.id}.jpg",
+                                    photo=f"afk/{user.id}.jpg",
                                     caption=strings("is_afk_msg_no_r").format(usr=user.first_name[:25], id=user.id, tm=seenago),
                                 )
                             else:
                                 send = await message.reply_photo(
-                                    photo=f"downloads/{user.id}.jpg",
+                                    photo=f"afk/{user.id}.jpg",
                                     caption=strings("is_afk_msg_with_r").format(usr=user.first_name[:25], id=user.id, tm=seenago, reas=reasonafk),
                                 )
                     except:
@@ -401,12 +410,12 @@ async def chat_watcher_func(client, message, strings):
                         if afktype == "photo":
                             if str(reasonafk) == "None":
                                 send = await message.reply_photo(
-                                    photo=f"downloads/{user_id}.jpg",
+                                    photo=f"afk/{user_id}.jpg",
                                     caption=strings("is_afk_msg_no_r").format(usr=first_name[:25], id=user_id, tm=seenago),
                                 )
                             else:
                                 send = await message.reply_photo(
-                                    photo=f"downloads/{user_id}.jpg",
+                                    photo=f"afk/{user_id}.jpg",
                                     caption=strings("is_afk_msg_with_r").format(usr=first_name[:25], id=user_id, tm=seenago, reas=reasonafk),
                                 )
                     except:
@@ -1,11 +1,11 @@
 import json
 from calendar import month_name
 
-import aiohttp
 from pyrogram import filters
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from misskaty import app
+from misskaty.helper.http import http
 from misskaty.helper.human_read import get_readable_time
 from misskaty.vars import COMMAND_HANDLER
 
@@ -142,9 +142,8 @@ query ($id: Int, $idMal: Int, $search: String) {
 
 
 async def get_anime(title):
-    async with aiohttp.ClientSession() as sesi:
-        r = await sesi.post("https://graphql.anilist.co", json={"query": anime_query, "variables": title})
-        return await r.read()
+    r = await http.post("https://graphql.anilist.co", json={"query": anime_query, "variables": title})
+    return r.content
 
 
 def shorten(description, info="anilist.co"):
@@ -1,12 +1,11 @@
 # Code copy from https://github.com/AbirHasan2005/Forward-Client
-from asyncio import sleep
 from logging import getLogger
 
 from pyrogram import filters
-from pyrogram.errors import FloodWait
 from pyrogram.types import Message
 
 from misskaty import user
+from misskaty.helper.forward_helper import ForwardPipeline
 from misskaty.vars import (
     BLOCK_FILES_WITHOUT_EXTENSIONS,
     BLOCKED_EXTENSIONS,
@@ -55,36 +54,24 @@ async def CheckFileSize(msg: Message):
     return MINIMUM_FILE_SIZE is None or media.file_size >= int(MINIMUM_FILE_SIZE)
 
 
-async def ForwardMessage(client: user, msg: Message):
+async def ForwardMessage(msg: Message) -> bool:
     try:
         ## --- Check 1 --- ##
-        can_forward = await FilterMessage(message=msg)
-        if can_forward == 400:
-            return 400
+        if await FilterMessage(message=msg) == 400:
+            return False
         ## --- Check 2 --- ##
-        has_blocked_ext = await CheckBlockedExt(event=msg)
-        if has_blocked_ext is True:
-            return 400
+        if await CheckBlockedExt(event=msg) is True:
+            return False
         ## --- Check 3 --- ##
-        file_size_passed = await CheckFileSize(msg=msg)
-        if file_size_passed is False:
-            return 400
-        ## --- Check 4 --- ##
-        for i in range(len(FORWARD_TO_CHAT_ID)):
-            try:
-                await msg.copy(FORWARD_TO_CHAT_ID[i])
-            except FloodWait as e:
-                await sleep(e.value)
-                LOGGER.warning(f"#FloodWait: Stopped Forwarder for {e.x}s!")
-                await ForwardMessage(client, msg)
-            except Exception as err:
-                LOGGER.warning(f"#ERROR: {err}\n\nUnable to Forward Message to {str(FORWARD_TO_CHAT_ID[i])}, reason: <code>{err}</code>")
+        return await CheckFileSize(msg=msg) is not False
     except Exception as err:
         LOGGER.warning(f"#ERROR: {err}")
+        return False
+
+
+forwarder = ForwardPipeline(user, FORWARD_FROM_CHAT_ID, FORWARD_TO_CHAT_ID, accept=ForwardMessage)
 
 
 @user.on_message((filters.text | filters.media) & filters.chat(FORWARD_FROM_CHAT_ID))
 async def forwardubot(client: user, message: Message):
-    try_forward = await ForwardMessage(client, message)
-    if try_forward == 400:
-        return
+    await forwarder.submit(message)
@@ -1,43 +1,31 @@
-import asyncio
-import datetime
-import time
-
 from pyrogram import filters
 
-from database.users_chats_db import db
 from misskaty import app
 from misskaty.core.message_utils import *
+from misskaty.helper.broadcast_helper import Broadcaster
 from misskaty.vars import SUDO
-from utils import broadcast_messages
 
 
-@app.on_message(filters.command("broadcast") & filters.user(SUDO) & filters.reply)
+@app.on_message(filters.command("broadcast") & filters.user(SUDO))
 async def broadcast(bot, message):
-    users = await db.get_all_users()
-    b_msg = message.reply_to_message
-    sts = await kirimPesan(message, "Broadcasting your messages...")
-    start_time = time.time()
-    total_users = await db.total_users_count()
-    done = 0
-    blocked = 0
-    deleted = 0
-    failed = 0
-
-    success = 0
-    async for user in users:
-        pti, sh = await broadcast_messages(int(user["id"]), b_msg)
-        if pti:
-            success += 1
-        elif pti is False:
-            if sh == "Blocked":
-                blocked += 1
-            elif sh == "Deleted":
-                deleted += 1
-            elif sh == "Error":
-                failed += 1
-        done += 1
-        await asyncio.sleep(2)
-        if not done % 20:
-            await editPesan(sts, f"Broadcast in progress:\n\nTotal Users {total_users}\nCompleted: {done} / {total_users}\nSuccess: {success}\nBlocked: {blocked}\nDeleted: {deleted}")
-    time_taken = datetime.timedelta(seconds=int(time.time() - start_time))
-    await editPesan(sts, f"Broadcast Completed:\nCompleted in {time_taken} seconds.\n\nTotal Users {total_users}\nCompleted: {done} / {total_users}\nSuccess: {success}\nBlocked: {blocked}\nDeleted: {deleted}")
+    cmd = message.command[1].lower() if len(message.command) > 1 else ""
+    if cmd == "cancel":
+        if not Broadcaster.current:
+            return await kirimPesan(message, "No broadcast is running.")
+        Broadcaster.current.cancelled = True
+        return await kirimPesan(message, "Broadcast will be stopped after current batch.")
+    if Broadcaster.lock.locked():
+        return await kirimPesan(message, "Another broadcast is still running, use <code>/broadcast cancel</code> to stop it.")
+    # taken before any await so two command can't both start
+    async with Broadcaster.lock:
+        if cmd == "resume":
+            sts = await kirimPesan(message, "Resuming last broadcast...")
+            broadcaster = await Broadcaster.resume(bot, sts)
+            if not broadcaster:
+                return await editPesan(sts, "No unfinished broadcast found.")
+        elif message.reply_to_message:
+            sts = await kirimPesan(message, "Broadcasting your messages...")
+            broadcaster = await Broadcaster.new(bot, message.chat.id, message.reply_to_message.id, sts)
+        else:
+            return await kirimPesan(message, "Reply to a message to broadcast it, or use <code>/broadcast resume</code> to continue unfinished broadcast.")
+        await broadcaster.run()
@@ -5,12 +5,65 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from misskaty import BOT_USERNAME, app
 from misskaty.core.decorator.ratelimiter import ratelimiter
 from misskaty.core.decorator.errors import capture_err
+from misskaty.helper.copy_helper import BulkCopy
 from misskaty.vars import COMMAND_HANDLER
 
 
+def chat_arg(chat):
+    return int(chat) if chat.lstrip("-").isdigit() else chat
+
+
+def parse_range(message):
+    """
+    /copy <dest> <start>-<end> [source] or /copy <dest> last <N>
+    Return (source, start, end) or None if not range mode.
+    """
+    cmd = message.command
+    if len(cmd) >= 4 and cmd[2].lower() == "last" and cmd[3].isdigit():
+        end = message.id - 1
+        return message.chat.id, max(1, end - int(cmd[3]) + 1), end
+    if len(cmd) >= 3 and "-" in cmd[2]:
+        start, _, end = cmd[2].partition("-")
+        if start.isdigit() and end.isdigit() and int(start) <= int(end):
+            return chat_arg(cmd[3]) if len(cmd) >= 4 else message.chat.id, int(start), int(end)
+    return None
+
+
+async def bulk_copy(client, message, mode: str):
+    cmd = message.command[1].lower()
+    if cmd == "cancel":
+        if not (job := BulkCopy.running.get(message.from_user.id)):
+            return await message.reply("Tidak ada proses yang sedang berjalan.")
+        job.cancelled = True
+        return await message.reply("Proses akan dihentikan setelah batch saat ini selesai.")
+    if BulkCopy.running.get(message.from_user.id):
+        return await message.reply(f"Proses sebelumnya masih berjalan, gunakan <code>/{mode} cancel</code> untuk menghentikan.")
+    try:
+        userstat = await app.get_chat_member(-1001686184174, message.from_user.id)
+        if userstat.status not in [enums.ChatMemberStatus.ADMINISTRATOR, enums.ChatMemberStatus.OWNER] and message.from_user.id != 2024984460:
+            return await message.reply_text("🦉🦉🦉")
+    except UserNotParticipant:
+        return await message.reply("Command ini hanya untuk admin YMoviezNew")
+    if cmd == "resume":
+        sts = await message.reply("Melanjutkan proses sebelumnya...")
+        job = await BulkCopy.resume(client, message.from_user.id, sts)
+        if not job:
+            return await sts.edit("Tidak ada proses yang belum selesai.")
+    else:
+        source, start, end = parse_range(message)
+        sts = await message.reply(f"Memproses {end - start + 1} pesan...")
+        job = await BulkCopy.new(client, message.from_user.id, mode, source, chat_arg(message.command[1]), start, end, sts)
+    try:
+        await job.run()
+    except Exception as e:
+        await sts.edit(f"ERROR: {e}\n\nGunakan <code>/{mode} resume</code> untuk melanjutkan.")
+
+
 @app.on_message(filters.command(["copy"], COMMAND_HANDLER))
 @ratelimiter
 async def copy(client, message):
+    if len(message.command) > 1 and (message.command[1].lower() in ("cancel", "resume") or parse_range(message)):
+        return await bulk_copy(client, message, "copy")
     if len(message.command) == 1:
         if not message.reply_to_message:
             return await message.reply("Silahkan balas pesan yang mau dicopy.")
@@ -67,6 +120,8 @@ async def copy(client, message):
 @app.on_message(filters.command(["forward"], COMMAND_HANDLER))
 @capture_err
 async def forward(client, message):
+    if len(message.command) > 1 and (message.command[1].lower() in ("cancel", "resume") or parse_range(message)):
+        return await bulk_copy(client, message, "forward")
     if len(message.command) == 1:
         if not message.reply_to_message:
             return await message.reply("Silahkan balas pesan yang mau dicopy.")
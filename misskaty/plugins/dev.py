@@ -6,10 +6,12 @@ import sys
 import pickle
 import json
 import traceback
+import html
 import cfscrape
 import aiohttp
 from shutil import disk_usage
 from time import time
+from datetime import datetime
 from inspect import getfullargspec
 from typing import Any, Optional, Tuple
 
@@ -26,7 +28,12 @@ from misskaty.helper.eval_helper import meval, format_exception
 from misskaty.helper.localization import use_chat_lang
 from misskaty.helper.human_read import get_readable_file_size, get_readable_time
 from misskaty.core.message_utils import editPesan, hapusPesan, kirimPesan
-from misskaty.vars import COMMAND_HANDLER, SUDO
+from misskaty.core.error_digest import errors
+from misskaty.core.log import log_stats
+from misskaty.core.metrics import metrics
+from misskaty.core.snapshot import save_snapshot
+from misskaty.core.tracing import tracer, span
+from misskaty.vars import COMMAND_HANDLER, LOG_FILE, SUDO
 
 __MODULE__ = "DevCommand"
 __HELP__ = """
@@ -50,10 +57,11 @@ async def edit_or_reply(msg, **kwargs):
 @use_chat_lang()
 async def log_file(bot, message, strings):
     """Send log file"""
+    stats = log_stats()
     try:
         await message.reply_document(
-            "MissKatyLogs.txt",
-            caption="Log Bot MissKatyPyro",
+            LOG_FILE,
+            caption=f"Log Bot MissKatyPyro\nQueued: {stats.get('queued', 0)}, dropped: {stats.get('overflow', 0)}, sampled out: {sum(stats.get('sampled_out', {}).values())}",
             reply_markup=InlineKeyboardMarkup(
                 [
                     [
@@ -110,6 +118,64 @@ RAM Usage: `{virtual_memory().percent}%`
     await kirimPesan(m, caption)
 
 
+@app.on_message(filters.command(["perf"], COMMAND_HANDLER) & filters.user(SUDO))
+async def perf_stats(_, m):
+    """
+    Show slowest handler, MongoDB and HTTP call since start (or last reset).
+    """
+    if len(m.command) > 1 and m.command[1] == "reset":
+        metrics.reset()
+        return await kirimPesan(m, "Metrics reset.")
+    text = metrics.summary()
+    if len(text) < 4000:
+        return await kirimPesan(m, text, parse_mode=enums.ParseMode.HTML)
+    with io.BytesIO(html.unescape(re.sub(r"<[^>]+>", "", text)).encode()) as out_file:
+        out_file.name = "perf.txt"
+        await m.reply_document(out_file, caption="Performance summary")
+
+
+@app.on_message(filters.command(["traces"], COMMAND_HANDLER) & filters.user(SUDO))
+async def slow_traces(_, m):
+    """
+    Send recent slow trace, /traces [count].
+    """
+    if not tracer.enabled:
+        return await kirimPesan(m, "Tracing disabled, set TRACE_SAMPLE_RATE to enable it.")
+    limit = int(m.command[1]) if len(m.command) > 1 and m.command[1].isdigit() else 10
+    traces = tracer.recent(limit)
+    if not traces:
+        return await kirimPesan(m, f"No trace slower than {tracer.slow * 1000:.0f}ms yet ({tracer.sampled} sampled).")
+    text = "\n\n".join(f"[{datetime.fromtimestamp(ts).strftime('%H:%M:%S')}]\n{root.format()}" for ts, root in traces)
+    if len(text) < 4000:
+        return await kirimPesan(m, f"<pre>{html.escape(text)}</pre>", parse_mode=enums.ParseMode.HTML)
+    with io.BytesIO(text.encode()) as out_file:
+        out_file.name = "traces.txt"
+        await m.reply_document(out_file, caption=f"{len(traces)} slow traces")
+
+
+@app.on_message(filters.command(["errors"], COMMAND_HANDLER) & filters.user(SUDO))
+async def recent_errors(_, m):
+    """
+    List recent handler error, /errors <id> send full traceback.
+    """
+    if len(m.command) > 1:
+        found = errors.get(m.command[1])
+        if not found:
+            return await kirimPesan(m, "Traceback not found, maybe already rotated out of buffer.")
+        ts, context, tb = found
+        text = f"[{datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')}] {context}\n\n{tb}"
+        if len(text) < 4000:
+            return await kirimPesan(m, f"<pre>{html.escape(text)}</pre>", parse_mode=enums.ParseMode.HTML)
+        with io.BytesIO(text.encode()) as out_file:
+            out_file.name = f"error_{m.command[1]}.txt"
+            return await m.reply_document(out_file)
+    entries = errors.recent()
+    if not entries:
+        return await kirimPesan(m, "No error since start.")
+    text = "\n".join(f"<code>{x.fid}</code> {x.total}x <code>{html.escape(x.exc_type)}</code> in {html.escape(x.handler)} ({html.escape(x.frame)}), last {datetime.fromtimestamp(x.last).strftime('%H:%M:%S')}" for x in entries)
+    await kirimPesan(m, text, parse_mode=enums.ParseMode.HTML)
+
+
 @app.on_message(filters.command(["shell", "sh"], COMMAND_HANDLER) & filters.user(SUDO))
 @app.on_edited_message(filters.command(["shell", "sh"], COMMAND_HANDLER) & filters.user(SUDO))
 @user.on_message(filters.command(["shell", "sh"], ".") & filters.me)
@@ -269,6 +335,7 @@ async def update_restart(_, message, strings):
     msg = await message.reply_text(strings("up_and_rest"))
     with open("restart.pickle", "wb") as status:
         pickle.dump([message.chat.id, msg.id], status)
+    save_snapshot()
     os.execvp(sys.executable, [sys.executable, "-m", "misskaty"])
 
 
@@ -278,9 +345,9 @@ async def aexec(code, c, m):
 
 
 async def shell_exec(code, treat=True):
-    process = await asyncio.create_subprocess_shell(code, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
-
-    stdout = (await process.communicate())[0]
+    with span("subprocess", cmd=code.split(maxsplit=1)[0] if code.strip() else ""):
+        process = await asyncio.create_subprocess_shell(code, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+        stdout = (await process.communicate())[0]
     if treat:
         stdout = stdout.decode().strip()
     return stdout, process
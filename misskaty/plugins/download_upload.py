@@ -1,5 +1,3 @@
-import asyncio
-import math
 import os
 import time
 from datetime import datetime
@@ -7,20 +5,20 @@ from logging import getLogger
 
 from pyrogram import filters
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-from pySmartDL import SmartDL
 
 from misskaty import app
 from misskaty.core.decorator.errors import capture_err
 from misskaty.core.decorator.ratelimiter import ratelimiter
 from misskaty.helper.http import http
-from misskaty.helper.pyro_progress import humanbytes, progress_for_pyrogram
+from misskaty.helper.downloader import DownloadError, download_file, filename_from_url
+from misskaty.helper.pyro_progress import ProgressReporter, progress_for_pyrogram
 from misskaty.vars import COMMAND_HANDLER, SUDO
 
 LOGGER = getLogger(__name__)
 
 __MODULE__ = "Download/Upload"
 __HELP__ = """
-/download [url] - Download file from URL (Sudo Only)
+/download [url] | [filename] | [sha256:hash] - Download file from URL, resumable (Sudo Only)
 /download [reply_to_TG_File] - Download TG File
 /tgraph_up [reply_to_TG_File] - Download TG File
 /tiktokdl [link] - Download TikTok Video
@@ -78,50 +76,21 @@ async def download(client, message):
     elif len(message.command) > 1:
         start_t = datetime.now()
         the_url_parts = " ".join(message.command[1:])
-        url = the_url_parts.strip()
-        custom_file_name = os.path.basename(url)
-        if "|" in the_url_parts:
-            url, custom_file_name = the_url_parts.split("|")
-            url = url.strip()
-            custom_file_name = custom_file_name.strip()
+        url, *opts = [x.strip() for x in the_url_parts.split("|")]
+        custom_file_name = opts[0] if opts and opts[0] else filename_from_url(url)
+        checksum = opts[1] if len(opts) > 1 and opts[1] else None
         download_file_path = os.path.join("downloads/", custom_file_name)
-        downloader = SmartDL(url, download_file_path, progress_bar=False)
-        downloader.start(blocking=False)
-        c_time = time.time()
-        while not downloader.isFinished():
-            total_length = downloader.filesize or None
-            downloaded = downloader.get_dl_size(human=True)
-            display_message = ""
-            now = time.time()
-            diff = now - c_time
-            percentage = downloader.get_progress() * 100
-            speed = downloader.get_speed(human=True)
-            round(diff) * 1000
-            progress_str = "[{0}{1}]\nProgress: {2}%".format(
-                "".join(["█" for _ in range(math.floor(percentage / 5))]),
-                "".join(["░" for _ in range(20 - math.floor(percentage / 5))]),
-                round(percentage, 2),
-            )
-
-            estimated_total_time = downloader.get_eta(human=True)
-            try:
-                current_message = "Trying to download...\n"
-                current_message += f"URL: <code>{url}</code>\n"
-                current_message += f"File Name: <code>{custom_file_name}</code>\n"
-                current_message += f"Speed: {speed}\n"
-                current_message += f"{progress_str}\n"
-                current_message += f"{humanbytes(downloaded)} of {humanbytes(total_length)}\n"
-                current_message += f"ETA: {estimated_total_time}"
-                if round(diff % 10.00) == 0 and current_message != display_message:
-                    await pesan.edit(disable_web_page_preview=True, text=current_message)
-                    display_message = current_message
-                    await asyncio.sleep(10)
-            except Exception as e:
-                LOGGER.info(str(e))
-        if os.path.exists(download_file_path):
-            end_t = datetime.now()
-            ms = (end_t - start_t).seconds
-            await pesan.edit(f"Downloaded to <code>{download_file_path}</code> in {ms} seconds")
+        reporter = ProgressReporter(
+            pesan,
+            f"Trying to download...\nURL: <code>{url}</code>\nFile Name: <code>{custom_file_name}</code>",
+        )
+        try:
+            await download_file(url, download_file_path, progress=reporter.update, checksum=checksum)
+        except DownloadError as e:
+            return await pesan.edit(f"Failed to download <code>{url}</code>\n\n<b>Reason:</b> {e}")
+        end_t = datetime.now()
+        ms = (end_t - start_t).seconds
+        await pesan.edit(f"Downloaded to <code>{download_file_path}</code> in {ms} seconds")
     else:
         await pesan.edit("Reply to a Telegram Media, to download it to my local server.")
 
@@ -159,9 +128,7 @@ async def fbdl(client, message):
             url = resjson["result"]["links"]["hd"].replace("&amp;", "&")
         except:
             url = resjson["result"]["links"]["sd"].replace("&amp;", "&")
-        obj = SmartDL(url, progress_bar=False)
-        obj.start()
-        path = obj.get_dest()
+        path = await download_file(url)
         await message.reply_video(path, caption=f"<code>{os.path.basename(path)}</code>\n\nUploaded for {message.from_user.mention} [<code>{message.from_user.id}</code>]", thumb="assets/thumb.jpg")
         await msg.delete()
         try:
@@ -1,6 +1,5 @@
 import random
 import re
-import os
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from pyrogram import enums, filters
@@ -14,6 +13,7 @@ from misskaty.core.decorator.permissions import admins_in_chat
 from misskaty.core.decorator.ratelimiter import ratelimiter
 from misskaty.core.decorator.errors import capture_err
 from misskaty.helper.time_gap import check_time_gap
+from misskaty.helper.scratch import scratch
 
 chat = [-1001128045651, -1001255283935, -1001455886928]
 REQUEST_DB = {}
@@ -116,11 +116,7 @@ async def clear_reqdict():
     REQUEST_DB.clear()
     PYPI_DICT.clear()
     admins_in_chat.clear()
-    try:
-        os.rmdir("downloads")
-        os.rmdir("GenSS")
-    except:
-        pass
+    await scratch.enforce_quota()
 
 
 # @app.on_message(filters.regex(r"makasi|thank|terimakasih|terima kasih|mksh", re.I) & filters.chat(chat))
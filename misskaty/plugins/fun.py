@@ -1,22 +1,21 @@
 import textwrap
-from asyncio import gather
-from os import remove as hapus
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import ImageDraw
 from pyrogram import filters
 
 from misskaty import app
+from misskaty.helper.image_helper import fit_sticker, get_font, open_image, run_image, save_image
 from misskaty.helper.localization import use_chat_lang
+from misskaty.helper.media_cache import media_cache, media_key
 from misskaty.core.decorator.ratelimiter import ratelimiter
 from misskaty.core.decorator.errors import capture_err
 from misskaty.vars import COMMAND_HANDLER
 
 
-async def draw_meme_text(image_path, text):
-    img = Image.open(image_path)
-    hapus(image_path)
+def draw_meme_text(image, text):
+    img = open_image(image)
     i_width, i_height = img.size
-    m_font = ImageFont.truetype("assets/MutantAcademyStyle.ttf", int((70 / 640) * i_width))
+    m_font = get_font("assets/MutantAcademyStyle.ttf", int((70 / 640) * i_width))
     if ";" in text:
         upper_text, lower_text = text.split(";")
     else:
@@ -130,12 +129,8 @@ async def draw_meme_text(image_path, text):
             )
             current_h += u_height + pad
 
-    webp_file = "misskatyfy.webp"
-    png_file = "misskatyfy.png"
-    new_size = (512, 512)
-    img.resize(new_size)
-    img.save(webp_file, "WebP")
-    img.save(png_file, "PNG")
+    webp_file = save_image(fit_sticker(img), "misskatyfy.webp")
+    png_file = save_image(img, "misskatyfy.png")
     img.close()
     return webp_file, png_file
 
@@ -146,14 +141,21 @@ async def draw_meme_text(image_path, text):
 async def memify(client, message):
     if message.reply_to_message and (message.reply_to_message.sticker or message.reply_to_message.photo):
         try:
-            file = await message.reply_to_message.download()
-            webp, png = await draw_meme_text(file, message.text.split(None, 1)[1].strip())
-            await gather(*[message.reply_document(png), message.reply_sticker(webp)])
-            try:
-                hapus(webp)
-                hapus(png)
-            except:
-                pass
+            text = message.text.split(None, 1)[1].strip()
+            media = message.reply_to_message.sticker or message.reply_to_message.photo
+
+            async def generate():
+                file = await message.reply_to_message.download(in_memory=True)
+                webp, png = await run_image(draw_meme_text, file, text)
+                return png, webp
+
+            await media_cache.send_many(
+                [
+                    (media_key("memify", media.file_unique_id, text=text, kind="png"), message.reply_document),
+                    (media_key("memify", media.file_unique_id, text=text, kind="webp"), message.reply_sticker),
+                ],
+                generate,
+            )
         except:
             await message.reply("Gunakan command <b>/mmf <text></b> dengan reply ke sticker, pisahkan dengan ; untuk membuat posisi text dibawah.")
     else:
@@ -20,6 +20,7 @@ from misskaty.core.decorator.ratelimiter import ratelimiter
 from misskaty.core.message_utils import *
 from misskaty.helper import gen_ik_buttons, get_duration, is_url, progress_for_pyrogram, screenshot_flink, take_ss
 from misskaty.helper.localization import use_chat_lang
+from misskaty.helper.scratch import scratch
 from misskaty.vars import COMMAND_HANDLER
 
 LOGGER = getLogger(__name__)
@@ -55,17 +56,17 @@ async def genss(c, m, strings):
         if media.file_size > 2097152000:
             return await editPesan(process, strings("limit_dl"))
         c_time = time.time()
-        dl = await replied.download(
-            file_name="/downloads/",
-            progress=progress_for_pyrogram,
-            progress_args=(strings("dl_progress"), process, c_time),
-        )
-        the_real_download_location = os.path.join("/downloads/", os.path.basename(dl))
-        if the_real_download_location is not None:
+        async with scratch.job("genss", reserve=media.file_size) as workdir:
+            dl = await replied.download(
+                file_name=f"{workdir}/",
+                progress=progress_for_pyrogram,
+                progress_args=(strings("dl_progress"), process, c_time),
+            )
+            the_real_download_location = dl
             try:
                 await editPesan(process, strings("success_dl_msg").format(path=the_real_download_location))
                 await sleep(2)
-                images = await take_ss(the_real_download_location)
+                images = await take_ss(the_real_download_location, workdir)
                 await editPesan(process, strings("up_progress"))
                 await c.send_chat_action(chat_id=m.chat.id, action=enums.ChatAction.UPLOAD_PHOTO)
 
@@ -90,18 +91,8 @@ async def genss(c, m, strings):
                     reply_to_message_id=m.id,
                 )
                 await process.delete()
-                try:
-                    os.remove(images)
-                    os.remove(the_real_download_location)
-                except:
-                    pass
             except Exception as exc:
                 await kirimPesan(m, strings("err_ssgen").format(exc=exc))
-                try:
-                    os.remove(images)
-                    os.remove(the_real_download_location)
-                except:
-                    pass
     else:
         await kirimPesan(m, strings("no_reply"))
 
@@ -1,13 +1,10 @@
-import json
 import logging
 import re
 import traceback
 
-from bs4 import BeautifulSoup
 from urllib.parse import quote_plus
 
 from utils import demoji
-from deep_translator import GoogleTranslator
 from pykeyboard import InlineButton, InlineKeyboard
 from pyrogram import filters, enums
 from pyrogram.errors import (
@@ -23,11 +20,14 @@ from misskaty import BOT_USERNAME, app
 from misskaty.core.message_utils import *
 from misskaty.core.decorator.errors import capture_err
 from misskaty.core.decorator.ratelimiter import ratelimiter
-from misskaty.helper import http, get_random_string, search_jw, GENRES_EMOJI
+from misskaty.core.snapshot import register
+from misskaty.helper import http, get_random_string, GENRES_EMOJI
+from misskaty.helper.imdb_helper import get_imdb_title
 from misskaty.vars import COMMAND_HANDLER, LOG_CHANNEL
 
 LOGGER = logging.getLogger(__name__)
 LIST_CARI = {}
+register("imdb_search.LIST_CARI", LIST_CARI)
 headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_9_5) AppleWebKit/600.1.17 (KHTML, like Gecko) Version/7.1 Safari/537.85.10"}
 
 
@@ -293,39 +293,36 @@ async def imdb_id_callback(_, query):
     try:
         await query.message.edit_caption("⏳ Permintaan kamu sedang diproses.. ")
         url = f"https://www.imdb.com/title/tt{movie}/"
-        resp = await http.get(url, headers=headers)
-        sop = BeautifulSoup(resp, "lxml")
-        r_json = json.loads(sop.find("script", attrs={"type": "application/ld+json"}).contents[0])
-        ott = await search_jw(r_json.get("name"), "ID")
+        imdb = await get_imdb_title(movie, "ID", "id")
+        r_json = imdb["ld"]
+        ott = imdb["ott"]
         typee = r_json.get("@type", "")
         res_str = ""
-        tahun = re.findall(r"\d{4}\W\d{4}|\d{4}-?", sop.title.text)[0] if re.findall(r"\d{4}\W\d{4}|\d{4}-?", sop.title.text) else "N/A"
+        tahun = imdb["year"]
         res_str += f"<b>📹 Judul:</b> <a href='{url}'>{r_json.get('name')} [{tahun}]</a> (<code>{typee}</code>)\n"
         if aka := r_json.get("alternateName"):
             res_str += f"<b>📢 AKA:</b> <code>{aka}</code>\n\n"
         else:
             res_str += "\n"
-        if durasi := sop.select('li[data-testid="title-techspec_runtime"]'):
-            durasi = durasi[0].find(class_="ipc-metadata-list-item__content-container").text
-            res_str += f"<b>Durasi:</b> <code>{GoogleTranslator('auto', 'id').translate(durasi)}</code>\n"
+        if durasi := imdb["duration"]:
+            res_str += f"<b>Durasi:</b> <code>{durasi}</code>\n"
         if kategori := r_json.get("contentRating"):
             res_str += f"<b>Kategori:</b> <code>{kategori}</code> \n"
         if rating := r_json.get("aggregateRating"):
             res_str += f"<b>Peringkat:</b> <code>{rating['ratingValue']}⭐️ dari {rating['ratingCount']} pengguna</code>\n"
-        if release := sop.select('li[data-testid="title-details-releasedate"]'):
-            rilis = release[0].find(class_="ipc-metadata-list-item__list-content-item ipc-metadata-list-item__list-content-item--link").text
-            rilis_url = release[0].find(class_="ipc-metadata-list-item__list-content-item ipc-metadata-list-item__list-content-item--link")["href"]
+        if release := imdb["release"]:
+            rilis, rilis_url = release
             res_str += f"<b>Rilis:</b> <a href='https://www.imdb.com{rilis_url}'>{rilis}</a>\n"
         if genre := r_json.get("genre"):
             genre = "".join(f"{GENRES_EMOJI[i]} #{i.replace('-', '_').replace(' ', '_')}, " if i in GENRES_EMOJI else f"#{i.replace('-', '_').replace(' ', '_')}, " for i in r_json["genre"])
             genre = genre[:-2]
             res_str += f"<b>Genre:</b> {genre}\n"
-        if negara := sop.select('li[data-testid="title-details-origin"]'):
-            country = "".join(f"{demoji(country.text)} #{country.text.replace(' ', '_').replace('-', '_')}, " for country in negara[0].findAll(class_="ipc-metadata-list-item__list-content-item ipc-metadata-list-item__list-content-item--link"))
+        if negara := imdb["countries"]:
+            country = "".join(f"{demoji(country)} #{country.replace(' ', '_').replace('-', '_')}, " for country in negara)
             country = country[:-2]
             res_str += f"<b>Negara:</b> {country}\n"
-        if bahasa := sop.select('li[data-testid="title-details-languages"]'):
-            language = "".join(f"#{lang.text.replace(' ', '_').replace('-', '_')}, " for lang in bahasa[0].findAll(class_="ipc-metadata-list-item__list-content-item ipc-metadata-list-item__list-content-item--link"))
+        if bahasa := imdb["languages"]:
+            language = "".join(f"#{lang.replace(' ', '_').replace('-', '_')}, " for lang in bahasa)
             language = language[:-2]
             res_str += f"<b>Bahasa:</b> {language}\n"
         res_str += "\n<b>🙎 Info Cast:</b>\n"
@@ -354,8 +351,7 @@ async def imdb_id_callback(_, query):
                 actors += f"<a href='https://www.imdb.com{url}'>{name}</a>, "
             actors = actors[:-2]
             res_str += f"<b>Pemeran:</b> {actors}\n\n"
-        if deskripsi := r_json.get("description"):
-            summary = GoogleTranslator("auto", "id").translate(deskripsi)
+        if summary := imdb["description"]:
             res_str += f"<b>📜 Plot: </b> <code>{summary}</code>\n\n"
         if keywd := r_json.get("keywords"):
             keywords = keywd.split(",")
@@ -365,9 +361,8 @@ async def imdb_id_callback(_, query):
                 key_ += f"#{i}, "
             key_ = key_[:-2]
             res_str += f"<b>🔥 Kata Kunci:</b> {key_} \n"
-        if award := sop.select('li[data-testid="award_information"]'):
-            awards = award[0].find(class_="ipc-metadata-list-item__list-content-item").text
-            res_str += f"<b>🏆 Penghargaan:</b> <code>{GoogleTranslator('auto', 'id').translate(awards)}</code>\n"
+        if awards := imdb["awards"]:
+            res_str += f"<b>🏆 Penghargaan:</b> <code>{awards}</code>\n"
         else:
             res_str += "\n"
         if ott != "":
@@ -412,39 +407,36 @@ async def imdb_en_callback(bot, query):
     await query.message.edit_caption("<i>⏳ Getting IMDb source..</i>")
     try:
         url = f"https://www.imdb.com/title/tt{movie}/"
-        resp = await http.get(url, headers=headers)
-        sop = BeautifulSoup(resp, "lxml")
-        r_json = json.loads(sop.find("script", attrs={"type": "application/ld+json"}).contents[0])
-        ott = await search_jw(r_json.get("name"), "US")
+        imdb = await get_imdb_title(movie, "US", None)
+        r_json = imdb["ld"]
+        ott = imdb["ott"]
         typee = r_json.get("@type", "")
         res_str = ""
-        tahun = re.findall(r"\d{4}\W\d{4}|\d{4}-?", sop.title.text)[0] if re.findall(r"\d{4}\W\d{4}|\d{4}-?", sop.title.text) else "N/A"
+        tahun = imdb["year"]
         res_str += f"<b>📹 Judul:</b> <a href='{url}'>{r_json.get('name')} [{tahun}]</a> (<code>{typee}</code>)\n"
         if aka := r_json.get("alternateName"):
             res_str += f"<b>📢 AKA:</b> <code>{aka}</code>\n\n"
         else:
             res_str += "\n"
-        if durasi := sop.select('li[data-testid="title-techspec_runtime"]'):
-            durasi = durasi[0].find(class_="ipc-metadata-list-item__content-container").text
+        if durasi := imdb["duration"]:
             res_str += f"<b>Duration:</b> <code>{durasi}</code>\n"
         if kategori := r_json.get("contentRating"):
             res_str += f"<b>Category:</b> <code>{kategori}</code> \n"
         if rating := r_json.get("aggregateRating"):
             res_str += f"<b>Rating:</b> <code>{rating['ratingValue']}⭐️ from {rating['ratingCount']} users</code>\n"
-        if release := sop.select('li[data-testid="title-details-releasedate"]'):
-            rilis = release[0].find(class_="ipc-metadata-list-item__list-content-item ipc-metadata-list-item__list-content-item--link").text
-            rilis_url = release[0].find(class_="ipc-metadata-list-item__list-content-item ipc-metadata-list-item__list-content-item--link")["href"]
+        if release := imdb["release"]:
+            rilis, rilis_url = release
             res_str += f"<b>Rilis:</b> <a href='https://www.imdb.com{rilis_url}'>{rilis}</a>\n"
         if genre := r_json.get("genre"):
             genre = "".join(f"{GENRES_EMOJI[i]} #{i.replace('-', '_').replace(' ', '_')}, " if i in GENRES_EMOJI else f"#{i.replace('-', '_').replace(' ', '_')}, " for i in r_json["genre"])
             genre = genre[:-2]
             res_str += f"<b>Genre:</b> {genre}\n"
-        if negara := sop.select('li[data-testid="title-details-origin"]'):
-            country = "".join(f"{demoji(country.text)} #{country.text.replace(' ', '_').replace('-', '_')}, " for country in negara[0].findAll(class_="ipc-metadata-list-item__list-content-item ipc-metadata-list-item__list-content-item--link"))
+        if negara := imdb["countries"]:
+            country = "".join(f"{demoji(country)} #{country.replace(' ', '_').replace('-', '_')}, " for country in negara)
             country = country[:-2]
             res_str += f"<b>Country:</b> {country}\n"
-        if bahasa := sop.select('li[data-testid="title-details-languages"]'):
-            language = "".join(f"#{lang.text.replace(' ', '_').replace('-', '_')}, " for lang in bahasa[0].findAll(class_="ipc-metadata-list-item__list-content-item ipc-metadata-list-item__list-content-item--link"))
+        if bahasa := imdb["languages"]:
+            language = "".join(f"#{lang.replace(' ', '_').replace('-', '_')}, " for lang in bahasa)
             language = language[:-2]
             res_str += f"<b>Language:</b> {language}\n"
         res_str += "\n<b>🙎 Cast Info:</b>\n"
@@ -473,7 +465,7 @@ async def imdb_en_callback(bot, query):
                 actors += f"<a href='https://www.imdb.com{url}'>{name}</a>, "
             actors = actors[:-2]
             res_str += f"<b>Stars:</b> {actors}\n\n"
-        if description := r_json.get("description"):
+        if description := imdb["description"]:
             res_str += f"<b>📜 Summary: </b> <code>{description}</code>\n\n"
         if keywd := r_json.get("keywords"):
             keywords = keywd.split(",")
@@ -483,8 +475,7 @@ async def imdb_en_callback(bot, query):
                 key_ += f"#{i}, "
             key_ = key_[:-2]
             res_str += f"<b>🔥 Keywords:</b> {key_} \n"
-        if award := sop.select('li[data-testid="award_information"]'):
-            awards = award[0].find(class_="ipc-metadata-list-item__list-content-item").text
+        if awards := imdb["awards"]:
             res_str += f"<b>🏆 Awards:</b> <code>{awards}</code>\n"
         else:
             res_str += "\n"
@@ -2,16 +2,13 @@ import time
 from asyncio import sleep
 
 from pyrogram import enums, filters
-from pyrogram.errors import FloodWait
-from pyrogram.errors.exceptions.bad_request_400 import (
-    ChatAdminRequired,
-    UserAdminInvalid,
-)
+from pyrogram.errors.exceptions.bad_request_400 import ChatAdminRequired
 from pyrogram.errors.exceptions.forbidden_403 import ChatWriteForbidden
 
 from misskaty import app
 from misskaty.core.decorator.ratelimiter import ratelimiter
 from misskaty.core.message_utils import editPesan, kirimPesan
+from misskaty.helper.member_scan import MemberScan
 from misskaty.vars import COMMAND_HANDLER
 
 __MODULE__ = "Inkick"
@@ -21,6 +18,20 @@ __HELP__ = """"
 """
 
 
+async def kick_members(message, action, select, not_admin_text):
+    sent_message = await message.reply_text("🚮**Sedang membersihkan user, mungkin butuh waktu beberapa saat...**")
+
+    async def progress(stats):
+        await editPesan(sent_message, f"🚮**Sedang membersihkan user...**\n\nDipindai: {stats['scanned']}\nDitendang: {stats['kicked']}")
+
+    try:
+        stats = await MemberScan(app, message.chat.id, action, select=select, progress=progress).run()
+    except ChatAdminRequired:
+        await editPesan(sent_message, not_admin_text)
+        return None, sent_message
+    return stats["kicked"], sent_message
+
+
 @app.on_message(filters.incoming & ~filters.private & filters.command(["inkick"], COMMAND_HANDLER))
 @ratelimiter
 async def inkick(_, message):
@@ -30,23 +41,14 @@ async def inkick(_, message):
     if user.status.value in ("administrator", "owner"):
         if len(message.command) > 1:
             input_str = message.command
-            sent_message = await message.reply_text("🚮**Sedang membersihkan user, mungkin butuh waktu beberapa saat...**")
-            count = 0
-            async for member in app.get_chat_members(message.chat.id):
-                if member.user.is_bot:
-                    continue
-                if member.user.status.value in input_str and member.status.value not in ("administrator", "owner"):
-                    try:
-                        await message.chat.ban_member(member.user.id)
-                        count += 1
-                        await sleep(1)
-                        await message.chat.unban_member(member.user.id)
-                    except (ChatAdminRequired, UserAdminInvalid):
-                        await sent_message.edit("❗**Oh tidaakk, saya bukan admin disini**\n__Saya pergi dari sini, tambahkan aku kembali dengan perijinan banned pengguna.__")
-                        await app.leave_chat(message.chat.id)
-                        break
-                    except FloodWait as e:
-                        await sleep(e.value)
+            count, sent_message = await kick_members(
+                message,
+                "inkick",
+                lambda member: not member.user.is_bot and member.user.status and member.user.status.value in input_str,
+                "❗**Oh tidaakk, saya bukan admin disini**\n__Saya pergi dari sini, tambahkan aku kembali dengan perijinan banned pengguna.__",
+            )
+            if count is None:
+                return await app.leave_chat(message.chat.id)
             try:
                 await sent_message.edit(f"✔️ **Berhasil menendang {count} pengguna berdasarkan argumen.**")
 
@@ -68,24 +70,14 @@ async def uname(_, message):
         return await message.reply("This feature not available for channel.")
     user = await app.get_chat_member(message.chat.id, message.from_user.id)
     if user.status.value in ("administrator", "owner"):
-        sent_message = await message.reply_text("🚮**Sedang membersihkan user, mungkin butuh waktu beberapa saat...**")
-        count = 0
-        async for member in app.get_chat_members(message.chat.id):
-            if not member.user.username and member.status.value not in (
-                "administrator",
-                "owner",
-            ):
-                try:
-                    await message.chat.ban_member(member.user.id)
-                    count += 1
-                    await sleep(1)
-                    await message.chat.unban_member(member.user.id)
-                except (ChatAdminRequired, UserAdminInvalid):
-                    await sent_message.edit("❗**Oh tidaakk, saya bukan admin disini**\n__Saya pergi dari sini, tambahkan aku kembali dengan perijinan banned pengguna.__")
-                    await app.leave_chat(message.chat.id)
-                    break
-                except FloodWait as e:
-                    await sleep(e.value)
+        count, sent_message = await kick_members(
+            message,
+            "uname",
+            lambda member: not member.user.username,
+            "❗**Oh tidaakk, saya bukan admin disini**\n__Saya pergi dari sini, tambahkan aku kembali dengan perijinan banned pengguna.__",
+        )
+        if count is None:
+            return await app.leave_chat(message.chat.id)
         try:
             await sent_message.edit(f"✔️ **Berhasil menendang {count} pengguna berdasarkan argumen.**")
 
@@ -104,23 +96,14 @@ async def rm_delacc(client, message):
         return await message.reply("This feature not available for channel.")
     user = await app.get_chat_member(message.chat.id, message.from_user.id)
     if user.status.value in ("administrator", "owner"):
-        sent_message = await message.reply_text("🚮**Sedang membersihkan user, mungkin butuh waktu beberapa saat...**")
-        count = 0
-        async for member in app.get_chat_members(message.chat.id):
-            if member.user.is_deleted and member.status.value not in (
-                "administrator",
-                "owner",
-            ):
-                try:
-                    await message.chat.ban_member(member.user.id)
-                    count += 1
-                    await sleep(1)
-                    await message.chat.unban_member(member.user.id)
-                except (ChatAdminRequired, UserAdminInvalid):
-                    await sent_message.edit("❗**Oh Nooo, i'm doesn't have admin permission in this group. Make sure i'm have admin permission to <b>ban users</b>.")
-                    break
-                except FloodWait as e:
-                    await sleep(e.value)
+        count, sent_message = await kick_members(
+            message,
+            "ban_ghosts",
+            lambda member: member.user.is_deleted,
+            "❗**Oh Nooo, i'm doesn't have admin permission in this group. Make sure i'm have admin permission to <b>ban users</b>.",
+        )
+        if count is None:
+            return
         if count == 0:
             return await editPesan(sent_message, "There are no deleted accounts in this chat.")
         await editPesan(sent_message, f"✔️ **Berhasil menendang {count} akun terhapus.**")
@@ -143,58 +126,28 @@ async def instatus(client, message):
         enums.ChatMemberStatus.OWNER,
     ):
         sent_message = await message.reply_text("**Sedang mengumpulkan informasi pengguna...**")
-        recently = 0
-        within_week = 0
-        within_month = 0
-        long_time_ago = 0
-        deleted_acc = 0
-        premium_acc = 0
-        no_username = 0
-        restricted = 0
-        banned = 0
-        uncached = 0
-        bot = 0
-        async for ban in app.get_chat_members(message.chat.id, filter=enums.ChatMembersFilter.BANNED):
-            banned += 1
-        async for restr in app.get_chat_members(message.chat.id, filter=enums.ChatMembersFilter.RESTRICTED):
-            restricted += 1
-        async for member in app.get_chat_members(message.chat.id):
-            user = member.user
-            if user.is_deleted:
-                deleted_acc += 1
-            elif user.is_bot:
-                bot += 1
-            elif user.is_premium:
-                premium_acc += 1
-            elif not user.username:
-                no_username += 1
-            elif user.status.value == "recently":
-                recently += 1
-            elif user.status.value == "last_week":
-                within_week += 1
-            elif user.status.value == "last_month":
-                within_month += 1
-            elif user.status.value == "long_ago":
-                long_time_ago += 1
-            else:
-                uncached += 1
+
+        async def progress(stats):
+            await editPesan(sent_message, f"**Sedang mengumpulkan informasi pengguna...**\n\n{stats['scanned']} / {count}")
+
+        stats = await MemberScan(app, message.chat.id, "instatus", progress=progress).run()
         end_time = time.perf_counter()
         timelog = "{:.2f}".format(end_time - start_time)
         await sent_message.edit(
             "<b>💠 {}\n👥 {} Anggota\n——————\n👁‍🗨 Informasi Status Anggota\n——————\n</b>🕒 <code>recently</code>: {}\n🕒 <code>last_week</code>: {}\n🕒 <code>last_month</code>: {}\n🕒 <code>long_ago</code>: {}\n🉑 Tanpa Username: {}\n🤐 Dibatasi: {}\n🚫 Diblokir: {}\n👻 Deleted Account (<code>/ban_ghosts</code>): {}\n🤖 Bot: {}\n⭐️ Premium User: {}\n👽 UnCached: {}\n\n⏱ Waktu eksekusi {} detik.".format(
                 message.chat.title,
                 count,
-                recently,
-                within_week,
-                within_month,
-                long_time_ago,
-                no_username,
-                restricted,
-                banned,
-                deleted_acc,
-                bot,
-                premium_acc,
-                uncached,
+                stats["recently"],
+                stats["last_week"],
+                stats["last_month"],
+                stats["long_ago"],
+                stats["no_username"],
+                stats["restricted"],
+                stats["banned"],
+                stats["deleted"],
+                stats["bot"],
+                stats["premium"],
+                stats["uncached"],
                 timelog,
             )
         )
@@ -6,9 +6,8 @@ from sys import platform
 from sys import version as pyver
 
 from bs4 import BeautifulSoup
-from deep_translator import GoogleTranslator
 from motor import version as mongover
-from pykeyboard import InlineKeyboard, InlineButton
+from pykeyboard import InlineKeyboard
 from pyrogram import __version__ as pyrover
 from pyrogram import enums, filters
 from pyrogram.types import (
@@ -22,7 +21,12 @@ from pyrogram.types import (
 
 from misskaty import BOT_USERNAME, app, user
 from misskaty.core.decorator.ratelimiter import ratelimiter
-from misskaty.helper import post_to_telegraph, http, GENRES_EMOJI, search_jw
+from misskaty.core.metrics import timed_elsewhere
+from misskaty.core.snapshot import register
+from misskaty.helper import http, GENRES_EMOJI, search_jw
+from misskaty.helper.botapi_spec import botapi_spec
+from misskaty.helper.inline_coordinator import inline_coordinator
+from misskaty.helper.translator import translator
 from misskaty.plugins.misc_tools import get_content
 from utils import demoji
 
@@ -39,18 +43,24 @@ To use this feature, just type bot username with following args below.
 keywords_list = ["imdb", "pypi", "git", "google", "secretmsg", "info", "botapi"]
 
 PRVT_MSGS = {}
+register("inline_search.PRVT_MSGS", PRVT_MSGS)
 LOGGER = getLogger()
 
 
 @app.on_inline_query()
-async def inline_menu(_, inline_query: InlineQuery):
+@timed_elsewhere
+async def inline_menu(client, inline_query: InlineQuery):
+    await inline_coordinator.run(client, inline_query, inline_answer)
+
+
+async def inline_answer(_, inline_query: InlineQuery):
     if inline_query.query.strip().lower().strip() == "":
         buttons = InlineKeyboard(row_width=2)
         buttons.add(*[(InlineKeyboardButton(text=i, switch_inline_query_current_chat=i)) for i in keywords_list])
 
         btn = InlineKeyboard(row_width=2)
-        bot_state = "Alive" if await app.get_me() else "Dead"
-        ubot_state = "Alive" if await user.get_me() else "Dead"
+        bot_state = "Alive" if app.is_connected else "Dead"
+        ubot_state = "Alive" if user.is_connected else "Dead"
         btn.add(
             InlineKeyboardButton("Stats", callback_data="stats_callback"),
             InlineKeyboardButton("Go Inline!", switch_inline_query_current_chat=""),
@@ -64,7 +74,7 @@ async def inline_menu(_, inline_query: InlineQuery):
 **Pyrogram:** `{pyrover}`
 **MongoDB:** `{mongover}`
 **Platform:** `{platform}`
-**Profiles:** {(await app.get_me()).username} | {(await user.get_me()).first_name}
+**Profiles:** {app.me.username} | {user.me.first_name}
         """
         answerss = [
             InlineQueryResultArticle(
@@ -88,7 +98,7 @@ async def inline_menu(_, inline_query: InlineQuery):
                 reply_markup=btn,
             ),
         ]
-        await inline_query.answer(results=answerss)
+        await inline_coordinator.answer(inline_query, answerss)
     elif inline_query.query.strip().lower().split()[0] == "botapi":
         if len(inline_query.query.strip().lower().split()) < 2:
             return await inline_query.answer(
@@ -97,95 +107,12 @@ async def inline_menu(_, inline_query: InlineQuery):
                 switch_pm_parameter="inline",
             )
         kueri = inline_query.query.split(None, 1)[1].strip()
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) " "Chrome/61.0.3163.100 Safari/537.36"}
-        jsonapi = await http.get(
-            "https://github.com/PaulSonOfLars/telegram-bot-api-spec/raw/main/api.json",
-            headers=headers,
-            follow_redirects=True,
-        )
-        parsemethod = jsonapi.json().get("methods")
-        parsetypes = jsonapi.json().get("types")
-        datajson = []
-        for method in parsemethod:
-            if kueri.lower() in method.lower():
-                link = parsemethod[method]["href"]
-                description = parsemethod[method]["description"][0]
-                buttons = InlineKeyboard()
-                buttons.row(
-                    InlineButton("Open Docs", url=link),
-                    InlineButton("Search Again", switch_inline_query_current_chat=inline_query.query),
-                )
-                buttons.row(
-                    InlineButton("Give Coffee", url="https://yasirpedia.eu.org"),
-                )
-                returns = "".join(f"{i}, " for i in parsemethod[method]["returns"])
-                msg = f"<b>{method}</b> (<code>{returns[:-2]}</code>)\n"
-                msg += f"{description}\n\n"
-                msg += f"<b>Variables:</b>\n"
-                if parsemethod[method].get("fields"):
-                    for i in parsemethod[method]["fields"]:
-                        msg += f"<code>{i['name']}</code> (<b>{i['types'][0]}</b>)\n<b>Required:</b> <code>{i['required']}</code>\n{i['description']}\n\n"
-                if len(msg.encode("utf-8")) > 4096:
-                    body_text = f"""
-                        <pre>{msg.replace("<user_id>", "(user_id)")}</pre>
-                        """
-                    msg = await post_to_telegraph(False, method, body_text)
-                datajson.append(
-                    InlineQueryResultArticle(
-                        title=method,
-                        input_message_content=InputTextMessageContent(
-                            message_text=msg,
-                            parse_mode=enums.ParseMode.HTML,
-                            disable_web_page_preview=True,
-                        ),
-                        url=link,
-                        description=description,
-                        thumb_url="https://img.freepik.com/premium-vector/open-folder-folder-with-documents-document-protection-concept_183665-104.jpg",
-                        reply_markup=buttons,
-                    )
-                )
-        for types in parsetypes:
-            if kueri.lower() in types.lower():
-                link = parsetypes[types]["href"]
-                description = parsetypes[types]["description"][0]
-                buttons = InlineKeyboard()
-                buttons.row(
-                    InlineButton("Open Docs", url=link),
-                    InlineButton("Search Again", switch_inline_query_current_chat=inline_query.query),
-                )
-                buttons.row(
-                    InlineButton("Give Coffee", url="https://yasirpedia.eu.org"),
-                )
-                msg = f"<b>{types}</b>\n"
-                msg += f"{description}\n\n"
-                msg += f"<b>Variables:</b>\n"
-                if parsetypes[types].get("fields"):
-                    for i in parsetypes[types]["fields"]:
-                        msg += f"<code>{i['name']}</code> (<b>{i['types'][0]}</b>)\n<b>Required:</b> <code>{i['required']}</code>\n{i['description']}\n\n"
-                if len(msg.encode("utf-8")) > 4096:
-                    body_text = f"""
-                        <pre>{msg}</pre>
-                        """
-                    msg = await post_to_telegraph(False, method, body_text)
-                datajson.append(
-                    InlineQueryResultArticle(
-                        title=types,
-                        input_message_content=InputTextMessageContent(
-                            message_text=msg,
-                            parse_mode=enums.ParseMode.HTML,
-                            disable_web_page_preview=True,
-                        ),
-                        url=link,
-                        description=description,
-                        thumb_url="https://img.freepik.com/premium-vector/open-folder-folder-with-documents-document-protection-concept_183665-104.jpg",
-                        reply_markup=buttons,
-                    )
-                )
-        await inline_query.answer(
-            results=datajson[:50],
+        datajson = await botapi_spec.articles_for(kueri)
+        await inline_coordinator.answer(
+            inline_query,
+            results=datajson,
             is_gallery=False,
             is_personal=False,
-            next_offset="",
             cache_time=5,
             switch_pm_text=f"Found {len(datajson)} results",
             switch_pm_parameter="help",
@@ -225,11 +152,11 @@ async def inline_menu(_, inline_query: InlineQuery):
                     reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton(text="Open Website", url=link)]]),
                 )
             )
-        await inline_query.answer(
+        await inline_coordinator.answer(
+            inline_query,
             results=data,
             is_gallery=False,
             is_personal=False,
-            next_offset="",
             switch_pm_text=f"Found {len(data)} results",
             switch_pm_parameter="google",
         )
@@ -269,7 +196,7 @@ async def inline_menu(_, inline_query: InlineQuery):
                 description=f"Get information off {diaa.id}",
             )
         ]
-        await inline_query.answer(results=results, cache_time=3)
+        await inline_coordinator.answer(inline_query, results, cache_time=3)
     elif inline_query.query.strip().lower().split()[0] == "secretmsg":
         if len(inline_query.query.strip().lower().split()) < 3:
             return await inline_query.answer(
@@ -318,7 +245,7 @@ async def inline_menu(_, inline_query: InlineQuery):
                 reply_markup=prvte_msg,
             )
         ]
-        await inline_query.answer(results=results, cache_time=3)
+        await inline_coordinator.answer(inline_query, results, cache=False, cache_time=3)
     elif inline_query.query.strip().lower().split()[0] == "git":
         if len(inline_query.query.strip().lower().split()) < 2:
             return await inline_query.answer(
@@ -353,11 +280,11 @@ async def inline_menu(_, inline_query: InlineQuery):
                     reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton(text="Open Github Link", url=link)]]),
                 )
             )
-        await inline_query.answer(
+        await inline_coordinator.answer(
+            inline_query,
             results=data,
             is_gallery=False,
             is_personal=False,
-            next_offset="",
             switch_pm_text=f"Found {len(data)} results",
             switch_pm_parameter="github",
         )
@@ -393,11 +320,11 @@ async def inline_menu(_, inline_query: InlineQuery):
                     reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton(text="Open Link", url=link)]]),
                 )
             )
-        await inline_query.answer(
+        await inline_coordinator.answer(
+            inline_query,
             results=data,
             is_gallery=False,
             is_personal=False,
-            next_offset="",
             switch_pm_text=f"Found {len(data)} results",
             switch_pm_parameter="pypi",
         )
@@ -443,11 +370,11 @@ async def inline_menu(_, inline_query: InlineQuery):
                     reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton(text="Watch Video 📹", url=link)]]),
                 )
             )
-        await inline_query.answer(
+        await inline_coordinator.answer(
+            inline_query,
             results=oorse,
             is_gallery=False,
             is_personal=False,
-            next_offset="",
             switch_pm_text=f"Found {len(asroe)} results",
             switch_pm_parameter="yt",
         )
@@ -490,11 +417,12 @@ async def inline_menu(_, inline_query: InlineQuery):
                 )
             )
         resfo = json.loads(search_results.text).get("q")
-        await inline_query.answer(
+        await inline_coordinator.answer(
+            inline_query,
             results=oorse,
+            personal=True,
             is_gallery=False,
             is_personal=False,
-            next_offset="",
             switch_pm_text=f"Found {len(oorse)} results for {resfo}",
             switch_pm_parameter="imdb",
         )
@@ -558,7 +486,7 @@ async def imdb_inl(_, query):
                 res_str += "\n"
             if durasi := sop.select('li[data-testid="title-techspec_runtime"]'):
                 durasi = durasi[0].find(class_="ipc-metadata-list-item__content-container").text
-                res_str += f"<b>Durasi:</b> <code>{GoogleTranslator('auto', 'id').translate(durasi)}</code>\n"
+                res_str += f"<b>Durasi:</b> <code>{await translator.translate(durasi, 'id')}</code>\n"
             if r_json.get("contentRating"):
                 res_str += f"<b>Kategori:</b> <code>{r_json['contentRating']}</code> \n"
             if r_json.get("aggregateRating"):
@@ -606,7 +534,7 @@ async def imdb_inl(_, query):
                 actors = actors[:-2]
                 res_str += f"<b>Pemeran:</b> {actors}\n\n"
             if r_json.get("description"):
-                summary = GoogleTranslator("auto", "id").translate(r_json.get("description"))
+                summary = await translator.translate(r_json.get("description"), "id")
                 res_str += f"<b>📜 Plot: </b> <code>{summary}</code>\n\n"
             if r_json.get("keywords"):
                 keywords = r_json["keywords"].split(",")
@@ -618,7 +546,7 @@ async def imdb_inl(_, query):
                 res_str += f"<b>🔥 Kata Kunci:</b> {key_} \n"
             if award := sop.select('li[data-testid="award_information"]'):
                 awards = award[0].find(class_="ipc-metadata-list-item__list-content-item").text
-                res_str += f"<b>🏆 Penghargaan:</b> <code>{GoogleTranslator('auto', 'id').translate(awards)}</code>\n"
+                res_str += f"<b>🏆 Penghargaan:</b> <code>{await translator.translate(awards, 'id')}</code>\n"
             else:
                 res_str += "\n"
             if ott != "":
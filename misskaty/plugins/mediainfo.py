@@ -8,7 +8,6 @@
 import io
 import subprocess
 import time
-from os import remove as osremove, path
 
 from pyrogram import filters
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
@@ -19,6 +18,7 @@ from misskaty.core.decorator.ratelimiter import ratelimiter
 from misskaty.helper import progress_for_pyrogram, runcmd, post_to_telegraph
 from misskaty.helper.mediainfo_paste import mediainfo_paste
 from misskaty.helper.localization import use_chat_lang
+from misskaty.helper.scratch import scratch
 from misskaty.vars import COMMAND_HANDLER
 from utils import get_file_id
 
@@ -37,13 +37,13 @@ async def mediainfo(client, message, strings):
         if (message.reply_to_message.video and message.reply_to_message.video.file_size > 2097152000) or (message.reply_to_message.document and message.reply_to_message.document.file_size > 2097152000):
             return await editPesan(process, strings("dl_limit_exceeded"))
         c_time = time.time()
-        dl = await message.reply_to_message.download(
-            file_name="/downloads/",
-            progress=progress_for_pyrogram,
-            progress_args=(strings("dl_args_text"), process, c_time),
-        )
-        file_path = path.join("/downloads/", path.basename(dl))
-        output_ = await runcmd(f'mediainfo "{file_path}"')
+        async with scratch.job("mediainfo", reserve=file_info.file_size or 0) as workdir:
+            dl = await message.reply_to_message.download(
+                file_name=f"{workdir}/",
+                progress=progress_for_pyrogram,
+                progress_args=(strings("dl_args_text"), process, c_time),
+            )
+            output_ = await runcmd(f'mediainfo "{dl}"')
         out = output_[0] if len(output_) != 0 else None
         body_text = f"""
 MissKatyBot MediaInfo
@@ -72,10 +72,6 @@ DETAILS
                 reply_markup=markup,
             )
             await process.delete()
-        try:
-            osremove(file_path)
-        except Exception:
-            pass
     else:
         try:
             link = message.text.split(" ", maxsplit=1)[1]
@@ -10,13 +10,13 @@ import json
 import os
 import asyncio
 import traceback
-from PIL import Image
+from functools import partial
+from io import BytesIO
 from logging import getLogger
 from urllib.parse import quote
 
 import aiohttp
 from bs4 import BeautifulSoup
-from deep_translator import GoogleTranslator
 from gtts import gTTS
 from pyrogram import Client, filters
 from pyrogram.errors import MessageTooLong, UserNotParticipant
@@ -27,7 +27,10 @@ from misskaty.core.decorator.errors import capture_err
 from misskaty.core.decorator.ratelimiter import ratelimiter
 from misskaty.core.message_utils import editPesan, hapusPesan, kirimPesan
 from misskaty.helper.http import http
+from misskaty.helper.image_helper import convert_image, run_image
+from misskaty.helper.media_cache import media_cache, media_key
 from misskaty.helper.tools import rentry
+from misskaty.helper.translator import translator
 from misskaty.vars import COMMAND_HANDLER
 from utils import extract_user, get_file_id
 
@@ -81,7 +84,15 @@ async def makeqr(c, m):
     else:
         return await m.reply("Please add text after command to convert text -> QR Code.")
     url = f"https://api.qrserver.com/v1/create-qr-code/?data={quote(teks)}&size=300x300"
-    await m.reply_photo(url, caption=f"<b>QR Code Maker by @{c.me.username}</b>", quote=True)
+
+    async def generate():
+        return url
+
+    await media_cache.send(
+        media_key("createqr", teks, size="300x300"),
+        partial(m.reply_photo, caption=f"<b>QR Code Maker by @{c.me.username}</b>", quote=True),
+        generate,
+    )
 
 
 @app.on_message(filters.command(["sof"], COMMAND_HANDLER))
@@ -170,9 +181,8 @@ async def translate(client, message):
         text = message.text.split(None, 2)[2]
     msg = await message.reply("Menerjemahkan...")
     try:
-        my_translator = GoogleTranslator(source="auto", target=target_lang)
-        result = my_translator.translate(text=text)
-        await editPesan(msg, f"Translation using source = {my_translator.source} and target = {my_translator.target}\n\n-> {result}")
+        result = await translator.translate(text, target_lang)
+        await editPesan(msg, f"Translation using source = auto and target = {target_lang}\n\n-> {result}")
     except MessageTooLong:
         url = await rentry(result)
         await editPesan(msg, f"Your translated text pasted to rentry because has long text:\n{url}")
@@ -199,14 +209,18 @@ async def tts(_, message):
         target_lang = message.text.split(None, 2)[1]
         text = message.text.split(None, 2)[2]
     msg = await message.reply("Converting to voice...")
-    try:
+
+    async def generate():
         tts = gTTS(text, lang=target_lang)
         tts.save(f"tts_{message.from_user.id}.mp3")
+        return f"tts_{message.from_user.id}.mp3"
+
+    try:
+        await media_cache.send(media_key("tts", text, lang=target_lang), msg.reply_audio, generate)
     except ValueError as err:
         await msg.edit(f"Error: <code>{str(err)}</code>")
         return
     await msg.delete()
-    await msg.reply_audio(f"tts_{message.from_user.id}.mp3")
     try:
         os.remove(f"tts_{message.from_user.id}.mp3")
     except:
@@ -220,12 +234,14 @@ async def tostick(client, message):
     try:
         if not message.reply_to_message or not message.reply_to_message.photo:
             return await message.reply_text("Reply ke foto untuk mengubah ke sticker")
-        sticker = await client.download_media(
-            message.reply_to_message.photo.file_id,
-            f"tostick_{message.from_user.id}.webp",
-        )
-        await message.reply_sticker(sticker)
-        os.remove(sticker)
+        sticker = f"tostick_{message.from_user.id}.webp"
+
+        async def generate():
+            return await client.download_media(message.reply_to_message.photo.file_id, sticker)
+
+        await media_cache.send(media_key("tosticker", message.reply_to_message.photo.file_unique_id), message.reply_sticker, generate)
+        if os.path.exists(sticker):
+            os.remove(sticker)
     except Exception as e:
         await message.reply_text(str(e))
 
@@ -239,13 +255,22 @@ async def topho(client, message):
             return await message.reply_text("Reply ke sticker untuk mengubah ke foto")
         if message.reply_to_message.sticker.is_animated:
             return await message.reply_text("Ini sticker animasi, command ini hanya untuk sticker biasa.")
-        photo = await message.reply_to_message.download()
-        im = Image.open(photo).convert("RGB")
         filename = f"toimg_{message.from_user.id}.png"
-        im.save(filename, "png")
-        await asyncio.gather(*[message.reply_document(filename), message.reply_photo(filename, caption=f"Sticker -> Image\n@{client.me.username}")])
-        os.remove(photo)
-        os.remove(filename)
+        unique_id = message.reply_to_message.sticker.file_unique_id
+
+        async def generate():
+            photo = await message.reply_to_message.download(in_memory=True)
+            image = await run_image(convert_image, photo, filename)
+            # each upload need its own buffer
+            return image, BytesIO(image.getvalue())
+
+        await media_cache.send_many(
+            [
+                (media_key("toimage", unique_id, kind="document"), message.reply_document),
+                (media_key("toimage", unique_id, kind="photo"), partial(message.reply_photo, caption=f"Sticker -> Image\n@{client.me.username}")),
+            ],
+            generate,
+        )
     except Exception as e:
         await message.reply_text(str(e))
 
@@ -10,7 +10,6 @@
 import os
 
 from pyrogram import filters
-from telegraph.aio import Telegraph
 
 from misskaty import app
 from misskaty.core.message_utils import *
@@ -18,6 +17,7 @@ from misskaty.core.decorator.ratelimiter import ratelimiter
 from misskaty.core.decorator.errors import capture_err
 from misskaty.helper.localization import use_chat_lang
 from misskaty.helper.http import http
+from misskaty.helper.telegraph_helper import telegraph
 from misskaty.vars import COMMAND_HANDLER
 
 __MODULE__ = "OCR"
@@ -37,8 +37,7 @@ async def ocr(_, m, strings):
         file_path = await reply.download()
         if reply.sticker:
             file_path = await reply.download(f"ocr_{m.from_user.id}.jpg")
-        response = await Telegraph().upload_file(file_path)
-        url = f"https://telegra.ph{response[0]['src']}"
+        url = await telegraph.upload_file(file_path)
         req = (
             await http.get(
                 f"https://script.google.com/macros/s/AKfycbwURISN0wjazeJTMHTPAtxkrZTWTpsWIef5kxqVGoXqnrzdLdIQIfLO7jsR5OQ5GO16/exec?url={url}",
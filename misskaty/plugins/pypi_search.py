@@ -11,11 +11,13 @@ from pyrogram import filters
 from misskaty import app
 from misskaty.core.decorator.ratelimiter import ratelimiter
 from misskaty.core.message_utils import *
+from misskaty.core.snapshot import register
 from misskaty.helper.http import http
 from misskaty.plugins.web_scraper import split_arr, headers
 from misskaty.vars import COMMAND_HANDLER
 
 PYPI_DICT = {}
+register("pypi_search.PYPI_DICT", PYPI_DICT)
 
 
 async def getDataPypi(msg, kueri, CurrentPage, user):
@@ -5,6 +5,7 @@ from pyrogram.types import Message
 
 from misskaty import app
 from misskaty.helper.http import http
+from misskaty.helper.media_cache import media_cache, media_key
 from misskaty.core.decorator.ratelimiter import ratelimiter
 
 __MODULE__ = "Fun"
@@ -131,7 +132,7 @@ async def get_text_or_caption(m: Message):
         return ""
 
 
-async def pyrogram_to_quotly(messages):
+async def quotly_payload(messages):
     if not isinstance(messages, list):
         messages = [messages]
     payload = {
@@ -181,6 +182,10 @@ async def pyrogram_to_quotly(messages):
         else:
             the_message_dict_to_append["replyMessage"] = {}
         payload["messages"].append(the_message_dict_to_append)
+    return payload
+
+
+async def render_quotly(payload):
     r = await http.post("https://bot.lyo.su/quote/generate.png", json=payload)
     if not r.is_error:
         return r.read()
@@ -188,6 +193,21 @@ async def pyrogram_to_quotly(messages):
         raise QuotlyException(r.json())
 
 
+async def pyrogram_to_quotly(messages):
+    return await render_quotly(await quotly_payload(messages))
+
+
+async def send_quotly(m: Message, messages):
+    payload = await quotly_payload(messages)
+
+    async def generate():
+        bio_sticker = BytesIO(await render_quotly(payload))
+        bio_sticker.name = "biosticker.webp"
+        return bio_sticker
+
+    return await media_cache.send(media_key("quotly", payload), m.reply_sticker, generate)
+
+
 def isArgInt(txt) -> list:
     count = txt
     try:
@@ -221,10 +241,7 @@ async def msg_quotly_cmd(c: Client, m: Message):
             except Exception:
                 return await m.reply_text("🤷🏻‍♂️")
             try:
-                make_quotly = await pyrogram_to_quotly(messages)
-                bio_sticker = BytesIO(make_quotly)
-                bio_sticker.name = "biosticker.webp"
-                return await m.reply_sticker(bio_sticker)
+                return await send_quotly(m, messages)
             except Exception:
                 return await m.reply_text("🤷🏻‍♂️")
     try:
@@ -233,9 +250,6 @@ async def msg_quotly_cmd(c: Client, m: Message):
     except Exception:
         return await m.reply_text("🤷🏻‍♂️")
     try:
-        make_quotly = await pyrogram_to_quotly(messages)
-        bio_sticker = BytesIO(make_quotly)
-        bio_sticker.name = "biosticker.webp"
-        return await m.reply_sticker(bio_sticker)
+        return await send_quotly(m, messages)
     except Exception as e:
         return await m.reply_text(f"ERROR: {e}")
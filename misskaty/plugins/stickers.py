@@ -4,7 +4,6 @@ import re
 import shutil
 import tempfile
 
-from PIL import Image
 from pyrogram import emoji, filters, enums
 from pyrogram.errors import BadRequest, PeerIdInvalid, StickersetInvalid
 from pyrogram.file_id import FileId
@@ -16,6 +15,7 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from misskaty import BOT_USERNAME, app
 from misskaty.core.decorator.ratelimiter import ratelimiter
 from misskaty.helper.http import http
+from misskaty.helper.image_helper import fit_sticker, open_image, run_image
 from misskaty.helper.localization import use_chat_lang
 from misskaty.vars import COMMAND_HANDLER, LOG_CHANNEL
 
@@ -193,7 +193,7 @@ async def kang_sticker(c, m, strings):
         return await prog_msg.edit_text(strings("kang_help"))
     try:
         if resize:
-            filename = resize_image(filename)
+            filename = await run_image(resize_image, filename)
         elif convert:
             filename = await convert_video(filename)
             if filename is False:
@@ -316,11 +316,7 @@ async def kang_sticker(c, m, strings):
 
 
 def resize_image(filename: str) -> str:
-    im = Image.open(filename)
-    maxsize = 512
-    scale = maxsize / max(im.width, im.height)
-    sizenew = (int(im.width * scale), int(im.height * scale))
-    im = im.resize(sizenew, Image.NEAREST)
+    im = fit_sticker(open_image(filename))
     downpath, f_name = os.path.split(filename)
     # not hardcoding png_image as "sticker.png"
     png_image = os.path.join(downpath, f"{f_name.split('.', 1)[0]}.png")
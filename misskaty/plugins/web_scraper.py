@@ -10,6 +10,7 @@ from bs4 import BeautifulSoup
 from pykeyboard import InlineKeyboard, InlineButton
 from pyrogram import filters
 from misskaty.core.decorator.ratelimiter import ratelimiter
+from misskaty.core.snapshot import register
 from misskaty.helper.http import http
 from misskaty.helper.localization import use_chat_lang
 from misskaty.helper.kuso_utils import Kusonime
@@ -35,6 +36,8 @@ headers = {"User-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/
 LOGGER = logging.getLogger(__name__)
 SCRAP_DICT = {}
 data_kuso = {}
+register("web_scraper.SCRAP_DICT", SCRAP_DICT)
+register("web_scraper.data_kuso", data_kuso)
 
 
 def split_arr(arr, size: 5):
@@ -47,6 +50,117 @@ def split_arr(arr, size: 5):
     return arrs
 
 
+# Page parser, take html and return plain data so it can be tested and benchmarked offline
+def parse_kuso_search(html: str) -> list:
+    kusodata = []
+    for i in BeautifulSoup(html, "lxml").find_all("h2", {"class": "episodeye"}):
+        ress = i.find_all("a")[0]
+        kusodata.append({"title": ress.text, "link": ress["href"]})
+    return kusodata
+
+
+def parse_movieku_search(html: str) -> list:
+    moviekudata = []
+    for i in BeautifulSoup(html, "lxml").find_all(class_="bx"):
+        judul = i.find_all("a")[0]["title"]
+        link = i.find_all("a")[0]["href"]
+        typ = i.find(class_="overlay").text
+        typee = typ.strip() if typ.strip() != "" else "~"
+        moviekudata.append({"judul": judul, "link": link, "type": typee})
+    return moviekudata
+
+
+def _parse_gmr_entry(html: str, not_found: str) -> list:
+    entry = BeautifulSoup(html, "lxml").find_all(class_="entry-header")
+    if not entry or not_found in entry[0].text:
+        return []
+    data = []
+    for i in entry:
+        genre = i.find(class_="gmr-movie-on").text
+        genre = f"{genre}" if genre != "" else "N/A"
+        judul = i.find(class_="entry-title").find("a").text
+        link = i.find(class_="entry-title").find("a").get("href")
+        data.append({"judul": judul, "link": link, "genre": genre})
+    return data
+
+
+def parse_savefilm21_search(html: str) -> list:
+    return _parse_gmr_entry(html, "Tidak Ditemukan")
+
+
+def parse_gomov_search(html: str) -> list:
+    return _parse_gmr_entry(html, "Nothing Found")
+
+
+def parse_lendrive_search(html: str) -> list:
+    lenddata = []
+    for o in BeautifulSoup(html, "lxml").find_all(class_="bsx"):
+        title = o.find("a")["title"]
+        link = o.find("a")["href"]
+        status = o.find(class_="epx").text
+        kualitas = o.find(class_="typez TV").text if o.find(class_="typez TV") else o.find(class_="typez BD")
+        lenddata.append({"judul": title, "link": link, "quality": kualitas, "status": status})
+    return lenddata
+
+
+def parse_melong_search(html: str) -> list:
+    melongdata = []
+    for res in BeautifulSoup(html, "lxml").select(".box"):
+        dd = res.select("a")
+        url = dd[0]["href"]
+        title = dd[0]["title"]
+        try:
+            quality = dd[0].find(class_="quality").text
+        except:
+            quality = "N/A"
+        melongdata.append({"judul": title, "link": url, "quality": quality})
+    return melongdata
+
+
+def parse_savefilm21_links(html: str) -> str:
+    res = BeautifulSoup(html, "lxml").find_all(class_="button button-shadow")
+    return "".join(f"{i.text}\n{i['href']}\n\n" for i in res)
+
+
+def parse_movieku_links(html: str) -> list:
+    data = []
+    for i in BeautifulSoup(html, "lxml").find_all(class_="smokeurl"):
+        for a in i.find_all("a"):
+            data.append({"link": a["href"], "kualitas": a.text})
+    return data
+
+
+def parse_melong_links(html: str) -> str:
+    soup = BeautifulSoup(html, "lxml")
+    rep = ""
+    for ep in soup.findAll(text=re.compile(r"(?i)episode\s+\d+|LINK DOWNLOAD")):
+        hardsub = ep.findPrevious("div")
+        softsub = ep.findNext("div")
+        rep += f"{hardsub}\n{softsub}"
+    return rep
+
+
+def parse_gomov_links(html: str) -> str:
+    soup = BeautifulSoup(html, "lxml")
+    entry = soup.find(class_="gmr-download-wrap clearfix")
+    hasil = soup.find(class_="title-download").text
+    for i in entry.find(class_="list-inline gmr-download-list clearfix"):
+        title = i.find("a").text
+        link = i.find("a")["href"]
+        hasil += f"\n{title}\n{link}\n"
+    return hasil
+
+
+def parse_lendrive_links(html: str) -> str:
+    kl = ""
+    for i in BeautifulSoup(html, "lxml").findAll("div", class_="soraurlx"):
+        if not i.find("a"):
+            continue
+        kl += f"{i.find('strong')}:\n"
+        kl += "".join(f"[ <a href='{a.get('href')}'>{a.text}</a> ]\n" for a in i.findAll("a"))
+    return kl
+
+
 # Terbit21 GetData
 async def getDataTerbit21(msg, kueri, CurrentPage, strings):
     if not SCRAP_DICT.get(msg.id):
@@ -124,14 +238,8 @@ async def getDataPahe(msg, kueri, CurrentPage, strings):
 # Kusonime GetData
 async def getDataKuso(msg, kueri, CurrentPage, user, strings):
     if not SCRAP_DICT.get(msg.id):
-        kusodata = []
         data = await http.get(f"https://kusonime.com/?s={kueri}", headers=headers, follow_redirects=True)
-        res = BeautifulSoup(data, "lxml").find_all("h2", {"class": "episodeye"})
-        for i in res:
-            ress = i.find_all("a")[0]
-            title = ress.text
-            link = ress["href"]
-            kusodata.append({"title": title, "link": link})
+        kusodata = parse_kuso_search(data.text)
         if not kusodata:
             await editPesan(msg, strings("no_result"))
             return None, 0, None, None
@@ -159,16 +267,8 @@ async def getDataKuso(msg, kueri, CurrentPage, user, strings):
 # Movieku GetData
 async def getDataMovieku(msg, kueri, CurrentPage, strings):
     if not SCRAP_DICT.get(msg.id):
-        moviekudata = []
         data = await http.get(f"https://107.152.37.223/?s={kueri}", headers=headers, follow_redirects=True)
-        r = BeautifulSoup(data, "lxml")
-        res = r.find_all(class_="bx")
-        for i in res:
-            judul = i.find_all("a")[0]["title"]
-            link = i.find_all("a")[0]["href"]
-            typ = i.find(class_="overlay").text
-            typee = typ.strip() if typ.strip() != "" else "~"
-            moviekudata.append({"judul": judul, "link": link, "type": typee})
+        moviekudata = parse_movieku_search(data.text)
         if not moviekudata:
             await editPesan(msg, strings("no_result"))
             return None, None
@@ -190,22 +290,14 @@ async def getDataMovieku(msg, kueri, CurrentPage, strings):
 # Savefilm21 GetData
 async def getDataSavefilm21(msg, kueri, CurrentPage, user, strings):
     if not SCRAP_DICT.get(msg.id):
-        sfdata = []
         data = await http.get(f"https://savefilm21.pro/?s={kueri}", headers=headers, follow_redirects=True)
-        text = BeautifulSoup(data, "lxml")
-        entry = text.find_all(class_="entry-header")
-        if "Tidak Ditemukan" in entry[0].text:
+        sfdata = parse_savefilm21_search(data.text)
+        if not sfdata:
             if not kueri:
                 await editPesan(msg, strings("no_result"))
             else:
                 await editPesan(msg, strings("no_result_w_query").format(kueri=kueri))
             return None, 0, None
-        for i in entry:
-            genre = i.find(class_="gmr-movie-on").text
-            genre = f"{genre}" if genre != "" else "N/A"
-            judul = i.find(class_="entry-title").find("a").text
-            link = i.find(class_="entry-title").find("a").get("href")
-            sfdata.append({"judul": judul, "link": link, "genre": genre})
         SCRAP_DICT[msg.id] = [split_arr(sfdata, 6), kueri]
     try:
         index = int(CurrentPage - 1)
@@ -226,14 +318,7 @@ async def getDataSavefilm21(msg, kueri, CurrentPage, user, strings):
 async def getDataLendrive(msg, kueri, CurrentPage, user, strings):
     if not SCRAP_DICT.get(msg.id):
         data = await http.get(f"https://lendrive.web.id/?s={kueri}", headers=headers, follow_redirects=True)
-        soup = BeautifulSoup(data, "lxml")
-        lenddata = []
-        for o in soup.find_all(class_="bsx"):
-            title = o.find("a")["title"]
-            link = o.find("a")["href"]
-            status = o.find(class_="epx").text
-            kualitas = o.find(class_="typez TV").text if o.find(class_="typez TV") else o.find(class_="typez BD")
-            lenddata.append({"judul": title, "link": link, "quality": kualitas, "status": status})
+        lenddata = parse_lendrive_search(data.text)
         if not lenddata:
             await editPesan(msg, strings("no_result"))
             return None, 0, None
@@ -258,17 +343,7 @@ async def getDataLendrive(msg, kueri, CurrentPage, user, strings):
 async def getDataMelong(msg, kueri, CurrentPage, user, strings):
     if not SCRAP_DICT.get(msg.id):
         data = await http.get(f"https://melongmovie.info/?s={kueri}", headers=headers, follow_redirects=True)
-        bs4 = BeautifulSoup(data, "lxml")
-        melongdata = []
-        for res in bs4.select(".box"):
-            dd = res.select("a")
-            url = dd[0]["href"]
-            title = dd[0]["title"]
-            try:
-                quality = dd[0].find(class_="quality").text
-            except:
-                quality = "N/A"
-            melongdata.append({"judul": title, "link": url, "quality": quality})
+        melongdata = parse_melong_search(data.text)
         if not melongdata:
             await editPesan(msg, strings("no_result"))
             return None, 0, None
@@ -293,21 +368,13 @@ async def getDataMelong(msg, kueri, CurrentPage, user, strings):
 async def getDataGomov(msg, kueri, CurrentPage, user, strings):
     if not SCRAP_DICT.get(msg.id):
         gomovv = await http.get(f"https://gomov.cfd/?s={kueri}", headers=headers, follow_redirects=True)
-        text = BeautifulSoup(gomovv, "lxml")
-        entry = text.find_all(class_="entry-header")
-        if entry[0].text.strip() == "Nothing Found":
+        data = parse_gomov_search(gomovv.text)
+        if not data:
             if not kueri:
                 await editPesan(msg, strings("no_result"))
             else:
                 await editPesan(msg, strings("no_result_w_query").format(kueri=kueri))
             return None, 0, None
-        data = []
-        for i in entry:
-            genre = i.find(class_="gmr-movie-on").text
-            genre = f"{genre}" if genre != "" else "N/A"
-            judul = i.find(class_="entry-title").find("a").text
-            link = i.find(class_="entry-title").find("a").get("href")
-            data.append({"judul": judul, "link": link, "genre": genre})
         SCRAP_DICT[msg.id] = [split_arr(data, 6), kueri]
     try:
         index = int(CurrentPage - 1)
@@ -803,9 +870,7 @@ async def savefilm21_scrap(_, callback_query, strings):
     keyboard.row(InlineButton(strings("back_btn"), f"page_savefilm#{CurrentPage}#{message_id}#{callback_query.from_user.id}"), InlineButton(strings("cl_btn"), f"close#{callback_query.from_user.id}"))
     try:
         html = await http.get(link, headers=headers)
-        soup = BeautifulSoup(html.text, "lxml")
-        res = soup.find_all(class_="button button-shadow")
-        res = "".join(f"{i.text}\n{i['href']}\n\n" for i in res)
+        res = parse_savefilm21_links(html.text)
     except Exception as err:
         await editPesan(callback_query.message, f"ERROR: {err}", reply_markup=keyboard)
         return
@@ -820,15 +885,7 @@ async def muviku_scrap(_, message, strings):
     try:
         link = message.text.split(" ", maxsplit=1)[1]
         html = await http.get(link, headers=headers)
-        soup = BeautifulSoup(html.text, "lxml")
-        res = soup.find_all(class_="smokeurl")
-        data = []
-        for i in res:
-            for b in range(len(i.find_all("a"))):
-                link = i.find_all("a")[b]["href"]
-                kualitas = i.find_all("a")[b].text
-                # print(f"{kualitas}\n{link
-                data.append({"link": link, "kualitas": kualitas})
+        data = parse_movieku_links(html.text)
         if not data:
             return await message.reply(strings("no_result"))
         res = "".join(f"<b>Host: {i['kualitas']}</b>\n{i['link']}\n\n" for i in data)
@@ -858,12 +915,7 @@ async def melong_scrap(_, callback_query, strings):
     keyboard.row(InlineButton(strings("back_btn"), f"page_melong#{CurrentPage}#{message_id}#{callback_query.from_user.id}"), InlineButton(strings("cl_btn"), f"close#{callback_query.from_user.id}"))
     try:
         html = await http.get(link, headers=headers)
-        soup = BeautifulSoup(html.text, "lxml")
-        rep = ""
-        for ep in soup.findAll(text=re.compile(r"(?i)episode\s+\d+|LINK DOWNLOAD")):
-            hardsub = ep.findPrevious("div")
-            softsub = ep.findNext("div")
-            rep += f"{hardsub}\n{softsub}"
+        rep = parse_melong_links(html.text)
     except Exception as err:
         await editPesan(callback_query.message, f"ERROR: {err}", reply_markup=keyboard)
         return
@@ -889,13 +941,7 @@ async def gomov_dl(_, callback_query, strings):
     keyboard.row(InlineButton(strings("back_btn"), f"page_gomov#{CurrentPage}#{message_id}#{callback_query.from_user.id}"), InlineButton(strings("cl_btn"), f"close#{callback_query.from_user.id}"))
     try:
         html = await http.get(link, headers=headers)
-        soup = BeautifulSoup(html.text, "lxml")
-        entry = soup.find(class_="gmr-download-wrap clearfix")
-        hasil = soup.find(class_="title-download").text
-        for i in entry.find(class_="list-inline gmr-download-list clearfix"):
-            title = i.find("a").text
-            link = i.find("a")["href"]
-            hasil += f"\n{title}\n{link}\n"
+        hasil = parse_gomov_links(html.text)
     except Exception as err:
         await editPesan(callback_query.message, f"ERROR: {err}", reply_markup=keyboard)
         return
@@ -920,14 +966,7 @@ async def lendrive_dl(_, callback_query, strings):
     keyboard.row(InlineButton(strings("back_btn"), f"page_lendrive#{CurrentPage}#{message_id}#{callback_query.from_user.id}"), InlineButton(strings("cl_btn"), f"close#{callback_query.from_user.id}"))
     try:
         hmm = await http.get(link, headers=headers)
-        q = BeautifulSoup(hmm.text, "lxml")
-        j = q.findAll("div", class_="soraurlx")
-        kl = ""
-        for i in j:
-            if not i.find("a"):
-                continue
-            kl += f"{i.find('strong')}:\n"
-            kl += "".join(f"[ <a href='{a.get('href')}'>{a.text}</a> ]\n" for a in i.findAll("a"))
+        kl = parse_lendrive_links(hmm.text)
         await editPesan(callback_query.message, strings("res_scrape").format(link=link, kl=kl), reply_markup=keyboard)
     except Exception as err:
         await editPesan(callback_query.message, f"ERROR: {err}", reply_markup=keyboard)
@@ -1,4 +1,5 @@
-from asyncio import gather
+import time
+from functools import partial
 
 from pyrogram import filters
 
@@ -7,8 +8,12 @@ from misskaty.core.message_utils import *
 from misskaty.core.decorator.errors import capture_err
 from misskaty.core.decorator.ratelimiter import ratelimiter
 from misskaty.helper.localization import use_chat_lang
+from misskaty.helper.media_cache import media_cache, media_key
 from misskaty.vars import COMMAND_HANDLER
 
+# Live page change, screenshot file_id only reused for a few minutes
+WEBSS_CACHE_TTL = 10 * 60
+
 __MODULE__ = "WebSS"
 __HELP__ = """
 /webss [URL] - Take A Screenshot Of A Webpage.
@@ -26,8 +31,20 @@ async def take_ss(_, m, strings):
     filename = f"webSS_{m.from_user.id}.png"
     msg = await m.reply(strings("wait_str"))
     try:
-        url = f"https://webss.yasirapi.eu.org/api?url={url}&width=1280&height=720"
-        await gather(*[m.reply_document(url, file_name=filename), m.reply_photo(url)])
+        ss_url = f"https://webss.yasirapi.eu.org/api?url={url}&width=1280&height=720"
+
+        async def generate():
+            return ss_url, ss_url
+
+        # key changed every WEBSS_CACHE_TTL so old capture not served
+        window = int(time.time() // WEBSS_CACHE_TTL)
+        await media_cache.send_many(
+            [
+                (media_key("webss", url, size="1280x720", kind="document", window=window), partial(m.reply_document, file_name=filename)),
+                (media_key("webss", url, size="1280x720", kind="photo", window=window), m.reply_photo),
+            ],
+            generate,
+        )
         await hapusPesan(msg)
     except Exception as e:
         await editPesan(msg, strings("ss_failed_str").format(err=str(e)))
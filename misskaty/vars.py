@@ -1,4 +1,4 @@
-import sys, os, requests
+import sys, os, requests, time
 from dotenv import load_dotenv
 from logging import getLogger
 from os import environ
@@ -6,11 +6,12 @@ from os import environ
 LOGGER = getLogger(__name__)
 
 CONFIG_FILE_URL = os.environ.get("CONFIG_FILE_URL", "")
+_config_start = time.perf_counter()
 try:
     if len(CONFIG_FILE_URL) == 0:
         raise TypeError
     try:
-        res = requests.get(CONFIG_FILE_URL)
+        res = requests.get(CONFIG_FILE_URL, timeout=10)
         if res.status_code == 200:
             with open("config.env", "wb+") as f:
                 f.write(res.content)
@@ -22,6 +23,7 @@ except:
     pass
 
 load_dotenv("config.env", override=True)
+CONFIG_LOAD_TIME = time.perf_counter() - _config_start
 
 
 def getConfig(name: str):
@@ -59,6 +61,69 @@ SUDO = list(
 SUPPORT_CHAT = environ.get("SUPPORT_CHAT", "YasirPediaChannel")
 NIGHTMODE = environ.get("NIGHTMODE", False)
 OPENAI_API = getConfig("OPENAI_API")
+# Max disk usage (MB) of downloads and temp folder before old files evicted
+SCRATCH_QUOTA = int(environ.get("SCRATCH_QUOTA", 2048)) * 1024 * 1024
+# Spam reputation check for new member
+SPAMWATCH_TOKEN = environ.get("SPAMWATCH_TOKEN", "XvfzE4AUNXkzCy0DnIVpFDlxZi79lt6EnwKgBj8Quuzms0OSdHvf1k6zSeyzZ_lz")
+# Local mirror of ban list (one user id per line, ex: CAS export.csv)
+SPAM_BANLIST_FILE = getConfig("SPAM_BANLIST_FILE")
+# Translation backend, "google" or "local" (no network, for testing)
+TRANSLATOR_BACKEND = environ.get("TRANSLATOR_BACKEND", "google")
+# Prometheus /metrics endpoint, disabled (0) unless port set, ex: 9090
+METRICS_HOST = environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(environ.get("METRICS_PORT", 0))
+# Fraction of update traced (0 disable tracing), trace slower than TRACE_SLOW_MS kept for /traces
+TRACE_SAMPLE_RATE = float(environ.get("TRACE_SAMPLE_RATE", 0))
+TRACE_SLOW_MS = float(environ.get("TRACE_SLOW_MS", 2000))
+TRACE_BUFFER = int(environ.get("TRACE_BUFFER", 50))
+# Record/replay HTTP response of shared httpx client ("record", "replay" or "auto"), empty to disable
+HTTP_FIXTURES = environ.get("HTTP_FIXTURES", "")
+HTTP_FIXTURES_DIR = environ.get("HTTP_FIXTURES_DIR", "benchmarks/fixtures/http")
+# Log file rotated at LOG_MAX_SIZE (MB) keeping LOG_BACKUPS old file, LOG_FORMAT "text" or "json"
+LOG_FILE = environ.get("LOG_FILE", "MissKatyLogs.txt")
+LOG_FORMAT = environ.get("LOG_FORMAT", "text")
+LOG_MAX_SIZE = int(float(environ.get("LOG_MAX_SIZE", 5)) * 1024 * 1024)
+LOG_BACKUPS = int(environ.get("LOG_BACKUPS", 3))
+LOG_QUEUE_SIZE = int(environ.get("LOG_QUEUE_SIZE", 10000))
+# Fraction of INFO/DEBUG record kept per logger, ex: "pyrogram.session=0.1 httpx=0.2"
+LOG_SAMPLE = environ.get("LOG_SAMPLE", "")
+# Handler error sent to LOG_CHANNEL as digest every ERROR_DIGEST_INTERVAL seconds, last ERROR_BUFFER traceback kept for /errors
+ERROR_DIGEST_INTERVAL = float(environ.get("ERROR_DIGEST_INTERVAL", 60))
+ERROR_BUFFER = int(environ.get("ERROR_BUFFER", 100))
+# Multi process mode, front process spawn SHARD_COUNT worker and route update by chat id.
+# SHARD_ID only set by front for worker process.
+SHARD_COUNT = int(environ.get("SHARD_COUNT", 1))
+SHARD_ID = int(environ["SHARD_ID"]) if environ.get("SHARD_ID") else None
+SHARD_SOCKET = environ.get("SHARD_SOCKET", "/tmp/misskaty-shard.sock")
+SHARD_QUEUE = int(environ.get("SHARD_QUEUE", 1000))
+# Leader shard run scheduler and cleanmode, lease expire after LEADER_TTL seconds without renew
+LEADER_TTL = int(environ.get("LEADER_TTL", 30))
+# "split" run userbot in its own process, bot reach it over USERBOT_SOCKET
+USERBOT_MODE = environ.get("USERBOT_MODE", "inline")
+USERBOT_SOCKET = environ.get("USERBOT_SOCKET", "/tmp/misskaty-userbot.sock")
+USERBOT_IPC_LIMIT = int(environ.get("USERBOT_IPC_LIMIT", 8))
+USERBOT_METRICS_PORT = int(environ.get("USERBOT_METRICS_PORT", 9089))
+# "userbot" only set for spawned userbot process
+PROCESS_ROLE = environ.get("PROCESS_ROLE", "bot")
+# Concurrent handler per client
+BOT_WORKERS = int(environ.get("BOT_WORKERS", min(32, (os.cpu_count() or 0) + 4)))
+# Only used by userbot process in split mode
+USERBOT_WORKERS = int(environ.get("USERBOT_WORKERS", 4))
+# In memory state saved for warm restart, snapshot older than SNAPSHOT_MAX_AGE seconds ignored
+SNAPSHOT_FILE = environ.get("SNAPSHOT_FILE", "misskaty_state.snapshot")
+SNAPSHOT_INTERVAL = float(environ.get("SNAPSHOT_INTERVAL", 300))
+SNAPSHOT_MAX_AGE = float(environ.get("SNAPSHOT_MAX_AGE", 86400))
+if PROCESS_ROLE == "userbot":
+    METRICS_PORT = USERBOT_METRICS_PORT if METRICS_PORT else 0
+    _log_name, _log_ext = os.path.splitext(LOG_FILE)
+    LOG_FILE = f"{_log_name}-userbot{_log_ext}"
+    SNAPSHOT_FILE = f"{SNAPSHOT_FILE}-userbot"
+if SHARD_ID is not None:
+    # every worker need own metrics port, log file and snapshot
+    METRICS_PORT = METRICS_PORT + 1 + SHARD_ID if METRICS_PORT else 0
+    _log_name, _log_ext = os.path.splitext(LOG_FILE)
+    LOG_FILE = f"{_log_name}-shard{SHARD_ID}{_log_ext}"
+    SNAPSHOT_FILE = f"{SNAPSHOT_FILE}-shard{SHARD_ID}"
 
 ## Config For AUtoForwarder
 # Forward From Chat ID
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+import types
+from io import BytesIO
+
+import pytest
+
+pytest.importorskip("pyrogram")
+pytest.importorskip("dotenv")
+
+from pyrogram import raw
+from pyrogram.raw.core import TLObject
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def sharding(monkeypatch):
+    # import sharding without misskaty/__init__ logging in and without MongoDB
+    package = types.ModuleType("misskaty")
+    package.__path__ = [os.path.join(ROOT, "misskaty")]
+    leader_db = types.ModuleType("database.leader_db")
+    leader_db.acquire_lease = leader_db.release_lease = None
+    monkeypatch.setitem(sys.modules, "misskaty", package)
+    monkeypatch.setitem(sys.modules, "database.leader_db", leader_db)
+    for name in ("misskaty.core", "misskaty.core.ipc", "misskaty.core.sharding"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    from misskaty.core import sharding
+
+    return sharding
+
+
+def test_raw_update_round_trip(sharding, tmp_path):
+    message = raw.types.Message(id=7, peer_id=raw.types.PeerUser(user_id=42), date=0, message="hello")
+    update = raw.types.UpdateNewMessage(message=message, pts=1, pts_count=1)
+    users = {42: raw.types.User(id=42, first_name="Katy")}
+
+    async def run():
+        fetched = []
+
+        async def fetch_peers(peers):
+            fetched.extend(peers)
+
+        client = types.SimpleNamespace(fetch_peers=fetch_peers, dispatcher=types.SimpleNamespace(updates_queue=asyncio.Queue()))
+        front = sharding.Front(client, count=1)
+        path = str(tmp_path / "shard.sock")
+        server = await asyncio.start_unix_server(front._connected, path)
+        front.put_nowait((update, users, {}))
+        front.put_nowait(None)
+
+        reader, writer = await sharding.ipc.connect(path)
+        await sharding.ipc.send(writer, 0)
+        task = asyncio.create_task(sharding.Worker(client, 0)._receive(reader))
+        try:
+            received = await asyncio.wait_for(client.dispatcher.updates_queue.get(), 5)
+        finally:
+            task.cancel()
+            writer.close()
+            server.close()
+        return received, fetched, front.stats()
+
+    (got, got_users, got_chats), fetched, stats = asyncio.run(run())
+    # read fill unset vector as empty list, compare with plain read
+    assert got == TLObject.read(BytesIO(update.write()))
+    assert got.message.message == "hello"
+    assert got_users[42].first_name == "Katy" and got_chats == {}
+    assert [x.id for x in fetched] == [42]
+    assert stats[0]["sent"] == 1 and stats[0]["queued"] == 0
@@ -5,17 +5,12 @@ from logging import getLogger
 from typing import Union
 
 import emoji
-from pyrogram.errors import (
-    FloodWait,
-    InputUserDeactivated,
-    PeerIdInvalid,
-    UserIsBlocked,
-)
+from pyrogram.errors import FloodWait
 from pyrogram.types import Message
 
-from database.afk_db import is_cleanmode_on
-from database.users_chats_db import db
+from database.afk_db import get_due_cleanmode, is_cleanmode_on, queue_cleanmode, remove_cleanmode
 from misskaty import app, cleanmode
+from misskaty.vars import SHARD_COUNT
 
 LOGGER = getLogger(__name__)
 BANNED = {}
@@ -24,6 +19,11 @@ loop = asyncio.get_event_loop()
 
 
 async def put_cleanmode(chat_id, message_id):
+    if SHARD_COUNT > 1:
+        # only leader shard clean, owner shard of the chat know cleanmode state
+        if await is_cleanmode_on(chat_id):
+            await queue_cleanmode(chat_id, message_id, datetime.now() + timedelta(minutes=1))
+        return
     if chat_id not in cleanmode:
         cleanmode[chat_id] = []
     time_now = datetime.now()
@@ -34,8 +34,27 @@ async def put_cleanmode(chat_id, message_id):
     cleanmode[chat_id].append(put)
 
 
+async def clean_queued():
+    due = await get_due_cleanmode(datetime.now())
+    for x in due:
+        try:
+            await app.delete_messages(x["chat_id"], x["msg_id"])
+        except FloodWait as e:
+            await asyncio.sleep(e.value)
+        except:
+            continue
+    if due:
+        await remove_cleanmode([x["_id"] for x in due])
+
+
 async def auto_clean():
     while not await asyncio.sleep(30):
+        if SHARD_COUNT > 1:
+            try:
+                await clean_queued()
+            except Exception as e:
+                LOGGER.warning(f"Cleanmode queue: {e}")
+            continue
         try:
             for chat_id in cleanmode:
                 if not await is_cleanmode_on(chat_id):
@@ -69,28 +88,6 @@ def demoji(teks):
     return emoji.emojize(f":{teks.replace(' ', '_').replace('-', '_')}:")
 
 
-async def broadcast_messages(user_id, message):
-    try:
-        await message.copy(chat_id=user_id)
-        return True, "Succes"
-    except FloodWait as e:
-        await asyncio.sleep(e.x)
-        return await broadcast_messages(user_id, message)
-    except InputUserDeactivated:
-        await db.delete_user(int(user_id))
-        LOGGER.info(f"{user_id}-Removed from Database, since deleted account.")
-        return False, "Deleted"
-    except UserIsBlocked:
-        LOGGER.info(f"{user_id} -Blocked the bot.")
-        return False, "Blocked"
-    except PeerIdInvalid:
-        await db.delete_user(int(user_id))
-        LOGGER.info(f"{user_id} - PeerIdInvalid")
-        return False, "Error"
-    except Exception:
-        return False, "Error"
-
-
 def get_size(size):
     """Get size in readable format"""
 